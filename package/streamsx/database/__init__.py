@@ -27,5 +27,19 @@ The mandatory JSON elements are "username", "password" and "jdbcurl"::
 
 __version__='1.6.0'
 
-__all__ = ['JDBCStatement', 'download_toolkit', 'configure_connection', 'run_statement']
-from streamsx.database._database import JDBCStatement, download_toolkit, configure_connection, run_statement
+__all__ = ['JDBCStatement', 'JDBCSink', 'Throttle', 'JDBCReferenceTable', 'JDBCBloomInsert', 'JDBCBulkLoad', 'JDBCShardedStatement', 'JDBCReadWriteSplit', 'JDBCTransaction', 'JDBCCall', 'JDBCLatencyTracker', 'Db2BatchStatement', 'JDBCLobWriter', 'JDBCLobReader', 'JDBCJsonQuery', 'JDBCRollup', 'download_toolkit', 'configure_connection', 'configure_connections', 'schema_from_table', 'estimate_vm_arg', 'run_statement']
+from streamsx.database._database import JDBCStatement, JDBCSink, Throttle, download_toolkit, configure_connection, configure_connections, run_statement
+from streamsx.database._reference import JDBCReferenceTable
+from streamsx.database._bloom import JDBCBloomInsert
+from streamsx.database._bulk import JDBCBulkLoad
+from streamsx.database._shard import JDBCShardedStatement
+from streamsx.database._routing import JDBCReadWriteSplit
+from streamsx.database._transaction import JDBCTransaction
+from streamsx.database._call import JDBCCall
+from streamsx.database._latency import JDBCLatencyTracker
+from streamsx.database._dbapi import Db2BatchStatement
+from streamsx.database._lob import JDBCLobWriter, JDBCLobReader
+from streamsx.database._json import JDBCJsonQuery
+from streamsx.database._rollup import JDBCRollup
+from streamsx.database._catalog import schema_from_table
+from streamsx.database._sizing import estimate_vm_arg
@@ -0,0 +1,117 @@
+# coding=utf-8
+# Licensed Materials - Property of IBM
+# Copyright IBM Corp. 2020
+
+import random
+import threading
+import time
+import streamsx.ec
+
+# SQL codes of the Db2 JDBC driver for communication failures and client reroutes
+_CONNECTION_SQL_CODES = (-4499, -4498, -30081, -30108, -1224)
+
+
+def _connection_failed(status):
+    """Returns ``True`` if the SQL status of a statement reports a connection failure."""
+    if not status:
+        return False
+    return status.get('sqlState', '').startswith('08') or status.get('sqlCode') in _CONNECTION_SQL_CODES
+
+
+class _Backoff(object):
+    """Exponential backoff with full jitter, the n-th delay is drawn uniformly from zero to ``min(maximum, initial * multiplier ** n)``."""
+    def __init__(self, initial, maximum, multiplier=2.0, rand=None):
+        self._initial = initial
+        self._maximum = maximum
+        self._multiplier = multiplier
+        self._rand = rand
+
+    def delay(self, attempt):
+        rand = random.random if self._rand is None else self._rand
+        return rand() * min(self._maximum, self._initial * self._multiplier ** attempt)
+
+
+class _ConnectionState(object):
+    """Connection state of a statement shared by the stage before and the stage after the statement operator."""
+    def __init__(self, backoff):
+        self._backoff = backoff
+        self._lock = threading.Lock()
+        self.failed_since = None
+        self.attempts = 0
+        self.retry_at = 0.0
+
+    def wait_time(self, now):
+        with self._lock:
+            if self.failed_since is None:
+                return 0.0
+            return max(0.0, self.retry_at - now)
+
+    def observe(self, failed, now):
+        """Records the result of a statement, returns the recovery time in seconds when a failed connection recovered."""
+        with self._lock:
+            if failed:
+                if self.failed_since is None:
+                    self.failed_since = now
+                    self.attempts = 0
+                self.retry_at = now + self._backoff.delay(self.attempts)
+                self.attempts += 1
+                return None
+            if self.failed_since is None:
+                return None
+            recovery = now - self.failed_since
+            self.failed_since = None
+            return recovery
+
+
+_STATES = {}
+_STATES_LOCK = threading.Lock()
+
+def _connection_state(name, backoff):
+    with _STATES_LOCK:
+        if name not in _STATES:
+            _STATES[name] = _ConnectionState(backoff)
+        return _STATES[name]
+
+
+class _BackoffGate(object):
+    """Holds back the tuples while the connection is failed until the next reconnection attempt is due."""
+    def __init__(self, name, backoff):
+        self._name = name
+        self._backoff = backoff
+
+    def __enter__(self):
+        self._state = _connection_state(self._name, self._backoff)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def __call__(self, tuple_):
+        wait = self._state.wait_time(time.monotonic())
+        if wait > 0:
+            streamsx.ec.shutdown().wait(wait)
+        return tuple_
+
+
+class _BackoffFeedback(object):
+    """Reports connection failures of the statements to the gate and the time to recover from a failure as metric."""
+    def __init__(self, name, backoff, status_attribute):
+        self._name = name
+        self._backoff = backoff
+        self._status_attribute = status_attribute
+
+    def __enter__(self):
+        self._state = _connection_state(self._name, self._backoff)
+        self._failures_metric = streamsx.ec.CustomMetric(self, name='nConnectionFailures', description='Number of statements failed with a connection failure')
+        self._recovery_metric = streamsx.ec.CustomMetric(self, name='recoveryTimeMillis', kind='Gauge', description='Time from the first connection failure to the first successful statement of the last failover in milliseconds')
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def __call__(self, tuple_):
+        failed = _connection_failed(tuple_[self._status_attribute])
+        if failed:
+            self._failures_metric += 1
+        recovery = self._state.observe(failed, time.monotonic())
+        if recovery is not None:
+            self._recovery_metric.value = int(recovery * 1000)
+        return tuple_
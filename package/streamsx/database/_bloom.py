@@ -0,0 +1,227 @@
+# coding=utf-8
+# Licensed Materials - Property of IBM
+# Copyright IBM Corp. 2020
+
+import hashlib
+import math
+import streamsx.ec
+import streamsx.topology.composite
+from streamsx.database._database import JDBCStatement, _CONNECTION_OPTIONS
+from streamsx.database._schema import _schema_attributes, _make_schema
+from streamsx.database._partition import _key_bytes
+from streamsx.database._tagged import _tagged_union, _untag
+
+_KEY_ROW = 1
+_NEW_KEY = 0
+_POSSIBLE_DUPLICATE = 1
+
+
+class _BloomFilter(object):
+    """Bloom filter with a fixed capacity, bits are set using double hashing."""
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.count = 0
+        self._size = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self._hashes = max(1, int(round(self._size / capacity * math.log(2))))
+        self._bits = bytearray((self._size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self._size for i in range(self._hashes)]
+
+    def __contains__(self, key):
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+
+class _ScalableBloomFilter(object):
+    """Scalable Bloom filter, a series of Bloom filters with growing capacity and tightening error rate.
+
+    The overall false positive rate stays below ``error_rate`` regardless of the number of keys added.
+    """
+    def __init__(self, capacity=100000, error_rate=0.001, growth=2, tightening=0.8):
+        self._growth = growth
+        self._tightening = tightening
+        self._filters = [_BloomFilter(capacity, error_rate * (1 - tightening))]
+
+    def __len__(self):
+        return sum(f.count for f in self._filters)
+
+    def __contains__(self, key):
+        return any(key in f for f in self._filters)
+
+    def add(self, key):
+        """Adds the key, returns ``False`` if the key is possibly contained already."""
+        if key in self:
+            return False
+        current = self._filters[-1]
+        if current.count >= current.capacity:
+            current = _BloomFilter(current.capacity * self._growth, current.error_rate * self._tightening)
+            self._filters.append(current)
+        current.add(key)
+        return True
+
+
+class _BloomRouter(object):
+    """Adds the keys of tagged key rows to the filter and tags each data tuple as new key or possible duplicate."""
+    def __init__(self, key_attributes, capacity, error_rate):
+        self._key_attributes = key_attributes
+        self._filter = _ScalableBloomFilter(capacity, error_rate)
+
+    def __enter__(self):
+        self._keys_metric = streamsx.ec.CustomMetric(self, name='nKeys', kind='Gauge', description='Number of keys added to the Bloom filter')
+        self._duplicates_metric = streamsx.ec.CustomMetric(self, name='nPossibleDuplicates', description='Number of tuples routed to the duplicate statement')
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def __call__(self, tagged):
+        tag, tuple_ = tagged
+        added = self._filter.add(_key_bytes(tuple_, self._key_attributes))
+        self._keys_metric.value = len(self._filter)
+        if tag == _KEY_ROW:
+            return None
+        if added:
+            return (_NEW_KEY, tuple_)
+        self._duplicates_metric += 1
+        return (_POSSIBLE_DUPLICATE, tuple_)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('_keys_metric', None)
+        state.pop('_duplicates_metric', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+
+def _route(tagged):
+    return tagged[0]
+
+
+class JDBCBloomInsert(streamsx.topology.composite.Map):
+    """
+    Composite map transformation that checks the existence of keys with a Bloom filter before inserting
+
+    A scalable Bloom filter holds the keys of the rows written to the table. Tuples with a key that is definitely not contained
+    in the filter are passed to the :attr:`insert` statement, for example a batched ``INSERT``.
+    Only tuples with a key that is possibly contained already are passed to the :attr:`duplicate` statement,
+    for example a ``MERGE`` statement or a statement checking the existence of the row.
+    Compared to inserting all tuples and relying on duplicate key failures, the number of failing statements is reduced to the false positives of the filter.
+
+    The filter is seeded with the keys of the existing rows at job start, queried with :attr:`seed_sql` or, if not set,
+    with ``SELECT <key> FROM <table>``. Tuples received before the seed query completed are treated as new keys.
+    The filter is part of the operator state and is saved when checkpointing is enabled for the topology,
+    for example with ``topology.checkpoint_period``. The seed query uses the credentials and the driver and connection options
+    of the :attr:`insert` statement.
+
+    The key attributes of the input stream and the key columns of the table must have the same names and types.
+
+    The two statements run independently. If a key is repeated while its first tuple is still waiting in a batch of the :attr:`insert` statement,
+    the repeated tuple can be written by the :attr:`duplicate` statement first and the batched insert fails with a duplicate key (SQLCODE -803).
+    A batched :attr:`insert` statement must therefore set :attr:`JDBCStatement.sql_failure_action`, for example to ``log`` to log the failed rows
+    and continue, with :attr:`JDBCStatement.sql_status_attr` to output the failed rows.
+    The number of keys and the number of possible duplicates are available as the custom metrics ``nKeys`` and ``nPossibleDuplicates``.
+
+    Example with insert and merge statement::
+
+        import streamsx.database as db
+
+        insert = db.JDBCStatement(credentials, batch_size=100, sql_failure_action='log')
+        insert.sql = 'INSERT INTO SAMPLE_DEMO (ID, NAME, AGE) VALUES (?, ?, ?)'
+        insert.sql_params = 'ID, NAME, AGE'
+        merge = db.JDBCStatement(credentials)
+        merge.sql = 'MERGE INTO SAMPLE_DEMO T USING (VALUES (?, ?, ?)) S (ID, NAME, AGE) ON T.ID = S.ID WHEN NOT MATCHED THEN INSERT VALUES (S.ID, S.NAME, S.AGE)'
+        merge.sql_params = 'ID, NAME, AGE'
+
+        res = sample_data.map(db.JDBCBloomInsert(insert, merge, key='ID', table='SAMPLE_DEMO'))
+
+    .. versionadded:: 1.7
+
+    Attributes
+    ----------
+    insert : JDBCStatement
+        Statement for tuples with a new key.
+    duplicate : JDBCStatement
+        Statement for tuples with a possibly existing key.
+    key : str
+        Comma separated names of the key attributes.
+    table : str
+        Name of the table, used for the seed query if :attr:`seed_sql` is not set.
+    options : kwargs
+        The additional optional parameters as variable keyword arguments.
+    """
+
+    def __init__(self, insert, duplicate, key, table=None, **options):
+        self.insert = insert
+        self.duplicate = duplicate
+        self.key = key
+        self.table = table
+        self.seed_sql = options.get('seed_sql')
+        self.capacity = options.get('capacity', 100000)
+        self.error_rate = options.get('error_rate', 0.001)
+
+    @property
+    def seed_sql(self):
+        """
+            str: Query returning the keys of the existing rows. The column names must match the key attributes.
+        """
+        return self._seed_sql
+
+    @seed_sql.setter
+    def seed_sql(self, value):
+        self._seed_sql = value
+
+    @property
+    def capacity(self):
+        """
+            int: Initial number of keys of the filter, the filter grows when the capacity is exceeded. The default value is 100000.
+        """
+        return self._capacity
+
+    @capacity.setter
+    def capacity(self, value):
+        self._capacity = value
+
+    @property
+    def error_rate(self):
+        """
+            float: Maximum false positive rate of the filter. The default value is 0.001.
+        """
+        return self._error_rate
+
+    @error_rate.setter
+    def error_rate(self, value):
+        self._error_rate = value
+
+    def populate(self, topology, stream, schema, name, **options):
+
+        key_attributes = [attr_name.strip() for attr_name in self.key.split(',')]
+        if self.seed_sql is None and self.table is None:
+            raise ValueError("Either seed_sql or table parameter must be set.")
+        seed_sql = self.seed_sql
+        if seed_sql is None:
+            seed_sql = 'SELECT ' + ', '.join(key_attributes) + ' FROM ' + self.table
+        if self.insert.batch_size is not None and self.insert.batch_size > 1 and self.insert.sql_failure_action is None:
+            raise ValueError("A batched insert statement requires the sql_failure_action parameter, a key repeated within a batch can fail the insert with a duplicate key.")
+        if schema is None:
+            schema = stream.oport.schema
+
+        key_schema = _make_schema([attr for attr in _schema_attributes(stream.oport.schema) if attr[1] in key_attributes])
+        seed = JDBCStatement(self.insert.credentials, **dict((option, getattr(self.insert, option)) for option in _CONNECTION_OPTIONS))
+        keys = topology.source([seed_sql], name='SeedQuery').as_string().map(seed, schema=key_schema, name='SeedKeys')
+
+        tagged = _tagged_union(self, stream, keys, _KEY_ROW)
+        routed = tagged.map(_BloomRouter(key_attributes, self.capacity, self.error_rate), name=name)
+        new_keys, duplicates = routed.split(2, _route, names=['NewKeys', 'PossibleDuplicates'])
+        inserted = new_keys.map(_untag, schema=stream.oport.schema).map(self.insert, schema=schema, name='Insert')
+        checked = duplicates.map(_untag, schema=stream.oport.schema).map(self.duplicate, schema=schema, name='Duplicate')
+        return inserted.union({checked})
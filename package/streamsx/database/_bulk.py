@@ -0,0 +1,281 @@
+# coding=utf-8
+# Licensed Materials - Property of IBM
+# Copyright IBM Corp. 2020
+
+import csv
+import os
+import time
+import uuid
+import streamsx.ec
+import streamsx.topology.composite
+from streamsx.topology.schema import StreamSchema
+from streamsx.database._database import JDBCStatement
+from streamsx.database._schema import _schema_attributes
+from streamsx.database._tagged import _tagged_with_ticks, _TICK
+from streamsx.database._throttle import _failed
+
+# status attribute of the load statement if the sql_status_attr option is not set
+_STATUS = '__jdbc_load_status'
+_STATUS_SCHEMA = 'tuple<int32 sqlCode, rstring sqlState, rstring sqlMessage>'
+
+class _FileSpooler(object):
+    """Writes tuples into rolling delimited files and emits one load statement for each finished file.
+
+    A file is finished when it exceeds the size limit or when its age exceeds the time limit.
+    Files are written with a temporary name and renamed when finished.
+    The open file is finished at shutdown. Files left in the directory by a previous run, finished or not and not marked as loaded,
+    are finished and their load statements are emitted with the first tuple or tick after the start.
+    """
+    def __init__(self, directory, prefix, attributes, delimiter, max_bytes, max_seconds, load_sql):
+        self._directory = directory
+        self._prefix = prefix
+        self._attributes = attributes
+        self._delimiter = delimiter
+        self._max_bytes = max_bytes
+        self._max_seconds = max_seconds
+        self._load_sql = load_sql
+        self._sequence = 0
+        self._file = None
+        self._recovered = []
+
+    def __enter__(self):
+        os.makedirs(self._directory, exist_ok=True)
+        self._files_metric = streamsx.ec.CustomMetric(self, name='nFilesStaged', description='Number of files finished for loading')
+        self._recover()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._file is not None:
+            # finished without a load statement, loaded after the restart
+            self._finish()
+
+    def __call__(self, tagged):
+        loads = self._recovered
+        self._recovered = []
+        tag, tuple_ = tagged
+        if tag == _TICK:
+            if self._file is not None and time.time() - self._opened >= self._max_seconds:
+                loads.append(self._finish())
+            return loads or None
+        if self._file is None:
+            self._open()
+        self._writer.writerow([tuple_[name] for name in self._attributes])
+        if self._max_bytes is not None and self._file.tell() >= self._max_bytes:
+            loads.append(self._finish())
+        return loads or None
+
+    def _recover(self):
+        # finishes the files of a previous run, a successfully loaded file is renamed or removed by _LoadedFiles
+        for name in sorted(os.listdir(self._directory)):
+            if not name.startswith(self._prefix + '_'):
+                continue
+            path = os.path.join(self._directory, name)
+            if name.endswith('.del.tmp'):
+                os.rename(path, path[:-len('.tmp')])
+                path = path[:-len('.tmp')]
+            elif not name.endswith('.del'):
+                continue
+            self._recovered.append(self._load(path))
+
+    def _open(self):
+        self._sequence += 1
+        # unique name, a restarted operator must not overwrite the files of a previous run
+        name = '{0}_{1}_{2}_{3}.del'.format(self._prefix, int(time.time()), self._sequence, uuid.uuid4().hex)
+        self._path = os.path.join(self._directory, name)
+        self._file = open(self._path + '.tmp', 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file, delimiter=self._delimiter, lineterminator='\n')
+        self._opened = time.time()
+
+    def _finish(self):
+        self._file.close()
+        self._file = None
+        os.rename(self._path + '.tmp', self._path)
+        self._files_metric += 1
+        return self._load(self._path)
+
+    def _load(self, path):
+        return {'string': self._load_sql.replace('{file}', path.replace("'", "''")), 'file': path}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for name in ('_files_metric', '_file', '_writer'):
+            state.pop(name, None)
+        state['_file'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+
+class _LoadedFiles(object):
+    """Marks the file of a successful load statement as loaded by appending ``.loaded`` to its name, or removes it.
+
+    The file of a failed load statement is kept and loaded again after a restart.
+    """
+    def __init__(self, status_attr, remove):
+        self._status_attr = status_attr
+        self._remove = remove
+
+    def __call__(self, tuple_):
+        if not _failed(tuple_[self._status_attr]):
+            path = tuple_['file']
+            try:
+                if self._remove:
+                    os.remove(path)
+                else:
+                    os.rename(path, path + '.loaded')
+            except FileNotFoundError:
+                pass
+        return tuple_
+
+
+def _always(tuple_):
+    return True
+
+
+class JDBCBulkLoad(streamsx.topology.composite.Map):
+    """
+    Composite map transformation that writes tuples into staged delimited files and loads each file with a bulk load statement
+
+    Tuples are appended to delimited files in the :attr:`directory`. A file is finished when its size exceeds :attr:`max_bytes`
+    or when it has been open for :attr:`max_seconds`. For each finished file the load statement is run with a :py:class:`JDBCStatement`,
+    so the rows are written with a single bulk operation instead of one statement per tuple.
+
+    The default load statement runs the Db2 ``LOAD`` command with ``CALL SYSPROC.ADMIN_CMD('LOAD FROM <file> OF DEL INSERT INTO <table> (<columns>)')``.
+    Another statement can be configured with :attr:`load_sql`, the placeholder ``{file}`` is replaced with the path of the file.
+    The database server must be able to read the files, for example the :attr:`directory` is a shared file system mounted on the database server.
+    After a successful load statement the file is renamed with the suffix ``.loaded``, or removed with :attr:`remove_loaded_files`.
+    Files without this suffix, left in the :attr:`directory` at shutdown, by a failed processing element or by a failed load statement,
+    are loaded after the restart.
+
+    The output stream contains the tuples emitted by the load statement for each file with the attributes ``string`` (the load statement) and ``file``,
+    an output schema must contain the ``file`` attribute.
+    A window punctuation follows the output of each file.
+
+    Example loading a stream into the table ``SAMPLE_DEMO`` with one file every 100 MB or 60 seconds::
+
+        import streamsx.database as db
+
+        load = db.JDBCBulkLoad(credentials, table='SAMPLE_DEMO', directory='/shared/staging')
+        load.max_bytes = 100 * 1024 * 1024
+        load.max_seconds = 60.0
+        res = sample_data.map(load)
+
+    .. versionadded:: 1.7
+
+    Attributes
+    ----------
+    credentials : dict|str
+        The credentials of the IBM cloud Db2 warehouse service as dict or configured external connection of kind "Db2 Warehouse" (Cloud Pak for Data only) as dict or the name of the application configuration.
+    table : str
+        Name of the table to load.
+    directory : str
+        Directory for the staged files.
+    options : kwargs
+        The additional optional parameters as variable keyword arguments, passed to the :py:class:`JDBCStatement` running the load statement.
+    """
+
+    def __init__(self, credentials, table, directory, **options):
+        self.credentials = credentials
+        self.table = table
+        self.directory = directory
+        self.columns = options.pop('columns', None)
+        self.delimiter = options.pop('delimiter', ',')
+        self.max_bytes = options.pop('max_bytes', 64 * 1024 * 1024)
+        self.max_seconds = options.pop('max_seconds', 60.0)
+        self.load_sql = options.pop('load_sql', None)
+        self.remove_loaded_files = options.pop('remove_loaded_files', False)
+        self.options = options
+
+    @property
+    def columns(self):
+        """
+            str: Comma separated names of the input stream attributes written to the files, in the order of the table columns. Defaults to all attributes of the input stream.
+        """
+        return self._columns
+
+    @columns.setter
+    def columns(self, value):
+        self._columns = value
+
+    @property
+    def delimiter(self):
+        """
+            str: Column delimiter of the staged files. The default value is ``,``.
+        """
+        return self._delimiter
+
+    @delimiter.setter
+    def delimiter(self, value):
+        self._delimiter = value
+
+    @property
+    def max_bytes(self):
+        """
+            int: Size in bytes at which a file is finished. The default value is 64 MB.
+        """
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, value):
+        self._max_bytes = value
+
+    @property
+    def max_seconds(self):
+        """
+            float: Time in seconds after which a file is finished. The default value is 60 seconds.
+        """
+        return self._max_seconds
+
+    @max_seconds.setter
+    def max_seconds(self, value):
+        self._max_seconds = value
+
+    @property
+    def load_sql(self):
+        """
+            str: Load statement run for each file, the placeholder ``{file}`` is replaced with the path of the file. Defaults to the Db2 ``LOAD`` command run with ``SYSPROC.ADMIN_CMD``.
+        """
+        return self._load_sql
+
+    @load_sql.setter
+    def load_sql(self, value):
+        self._load_sql = value
+
+    @property
+    def remove_loaded_files(self):
+        """
+            bool: Set to ``True`` to remove each file after its load statement was run successfully. Per default the loaded files are kept with the suffix ``.loaded``.
+        """
+        return self._remove_loaded_files
+
+    @remove_loaded_files.setter
+    def remove_loaded_files(self, value):
+        self._remove_loaded_files = value
+
+    def populate(self, topology, stream, schema, name, **options):
+
+        if self.columns is None:
+            attributes = [attr_name for _, attr_name in _schema_attributes(stream.oport.schema)]
+        else:
+            attributes = [attr_name.strip() for attr_name in self.columns.split(',')]
+        load_sql = self.load_sql
+        if load_sql is None:
+            modifier = '' if self.delimiter == ',' else ' MODIFIED BY COLDEL' + self.delimiter
+            load_sql = "CALL SYSPROC.ADMIN_CMD('LOAD FROM {file} OF DEL" + modifier + ' INSERT INTO ' + self.table + ' (' + ', '.join(attributes) + ")')"
+        if schema is None:
+            schema = StreamSchema('tuple<rstring string, rstring file>')
+        if 'file' not in [attr_name for _, attr_name in _schema_attributes(schema)]:
+            raise ValueError("The output schema must contain the file attribute.")
+
+        tagged = _tagged_with_ticks(self, stream, max(0.1, self.max_seconds / 10.0))
+        spooler = _FileSpooler(self.directory, self.table, attributes, self.delimiter, self.max_bytes, self.max_seconds, load_sql)
+        loads = tagged.flat_map(spooler, name='StageFiles').map(schema=StreamSchema('tuple<rstring string, rstring file>'))
+
+        statement = JDBCStatement(self.credentials, **self.options)
+        statement.sql_attribute = 'string'
+        if statement.sql_status_attr is None:
+            statement.sql_status_attr = _STATUS
+        status_schema = StreamSchema('tuple<rstring string, rstring file, ' + _STATUS_SCHEMA + ' ' + statement.sql_status_attr + '>')
+        res = loads.map(statement, schema=status_schema, name=name)
+        res = res.map(_LoadedFiles(statement.sql_status_attr, self.remove_loaded_files), schema=schema, name='LoadedFiles')
+        return res.punctor(_always, before=False)
@@ -0,0 +1,118 @@
+# coding=utf-8
+# Licensed Materials - Property of IBM
+# Copyright IBM Corp. 2020
+
+import streamsx.ec
+import streamsx.topology.composite
+from streamsx.database._database import JDBCStatement
+from streamsx.database._dbapi import _connect
+
+_MODES = ('IN', 'OUT', 'INOUT')
+
+
+def _parse_parameters(parameters):
+    """Returns the list of (mode, attribute name) pairs of a parameter list like ``IN ID, OUT STATUS``, the mode defaults to ``IN``."""
+    result = []
+    for parameter in parameters.split(','):
+        words = parameter.split()
+        if len(words) == 1:
+            words = ['IN'] + words
+        if len(words) != 2 or words[0].upper() not in _MODES:
+            raise ValueError('Invalid procedure parameter: ' + parameter.strip())
+        result.append((words[0].upper(), words[1]))
+    return result
+
+
+class _ProcedureCaller(object):
+    """Calls a stored procedure for each tuple with a DB-API connection and sets the OUT and INOUT parameter values as output attributes.
+
+    Each call is committed before its output tuple is returned.
+    """
+    def __init__(self, credentials, procedure, parameters):
+        self._credentials = credentials
+        self._procedure = procedure
+        self._parameters = parameters
+
+    def __enter__(self):
+        self._connection = _connect(self._credentials)
+        self._cursor = self._connection.cursor()
+        self._calls_metric = streamsx.ec.CustomMetric(self, name='nProcedureCalls', description='Number of procedure calls')
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._connection.close()
+
+    def __call__(self, tuple_):
+        args = [None if mode == 'OUT' else tuple_[name] for mode, name in self._parameters]
+        values = self._cursor.callproc(self._procedure, args)
+        self._connection.commit()
+        self._calls_metric += 1
+        result = dict(tuple_)
+        for (mode, name), value in zip(self._parameters, values):
+            if mode != 'IN':
+                result[name] = value
+        return result
+
+
+class JDBCCall(streamsx.topology.composite.Map):
+    """
+    Composite map transformation calling a stored procedure for each input tuple
+
+    The :attr:`parameters` list the procedure parameters in order, each with its mode ``IN``, ``OUT`` or ``INOUT`` and the name
+    of the stream attribute it is mapped to. ``IN`` and ``INOUT`` parameters are set from the input attributes,
+    ``OUT`` and ``INOUT`` parameter values are set to the output attributes with the same name.
+
+    A procedure with ``IN`` parameters only is called with the JDBC toolkit as ``CALL <procedure>(?, ...)``. With :attr:`batch_size` the calls are sent to the database in batches.
+
+    The JDBC toolkit does not return output parameters. A procedure with ``OUT`` or ``INOUT`` parameters is called with the `ibm_db <https://pypi.org/project/ibm-db/>`_ package
+    in a Python operator, the package is added to the application as a pip requirement. The procedure is called once for each tuple, the calls can not be batched,
+    and each call is committed before its output tuple is submitted.
+    This mode supports Db2 credentials with a ``jdbcurl`` and the name of an application configuration created by :py:func:`configure_connection`.
+    SSL is enabled with ``sslConnection=true`` in the ``jdbcurl``, the :py:class:`JDBCStatement` options, for example the driver, key store and trust store options or :attr:`batch_size`, are not supported.
+
+    Example calling a procedure with the output parameter ``STATUS``::
+
+        import streamsx.database as db
+
+        call = db.JDBCCall(credentials, 'ORDERS.PLACE_ORDER', 'IN ORDER_ID, IN CUSTOMER, OUT STATUS')
+        res = orders.map(call, schema=StreamSchema('tuple<int64 ORDER_ID, rstring CUSTOMER, int32 STATUS>'))
+
+    .. versionadded:: 1.7
+
+    Attributes
+    ----------
+    credentials : dict|str
+        The credentials of the IBM cloud Db2 warehouse service as dict or configured external connection of kind "Db2 Warehouse" (Cloud Pak for Data only) as dict or the name of the application configuration.
+    procedure : str
+        Name of the stored procedure.
+    parameters : str
+        Comma separated procedure parameters in order, each as ``[IN|OUT|INOUT] <attribute name>``. The mode defaults to ``IN``.
+    options : kwargs
+        The additional optional parameters as variable keyword arguments, passed to the :py:class:`JDBCStatement` calling a procedure with ``IN`` parameters only. Not supported for a procedure with ``OUT`` or ``INOUT`` parameters.
+    """
+
+    def __init__(self, credentials, procedure, parameters=None, **options):
+        self.credentials = credentials
+        self.procedure = procedure
+        self.parameters = parameters
+        self.options = options
+
+    def populate(self, topology, stream, schema, name, **options):
+
+        parameters = _parse_parameters(self.parameters) if self.parameters else []
+        if schema is None:
+            schema = stream.oport.schema
+
+        if all(mode == 'IN' for mode, _ in parameters):
+            statement = JDBCStatement(self.credentials, **self.options)
+            statement.sql = 'CALL ' + self.procedure + '(' + ', '.join('?' for _ in parameters) + ')'
+            statement.sql_params = ', '.join(attr_name for _, attr_name in parameters) if parameters else None
+            return stream.map(statement, schema=schema, name=name)
+
+        if self.options:
+            raise ValueError("Options " + ', '.join(sorted(self.options)) + " are not supported for a procedure with OUT or INOUT parameters.")
+        credentials = self.credentials
+        if isinstance(credentials, dict) and credentials.get('class') == 'external':
+            credentials = {'jdbcurl': credentials.get('url'), 'username': credentials.get('username'), 'password': credentials.get('password')}
+        topology.add_pip_package('ibm_db')
+        caller = _ProcedureCaller(credentials, self.procedure, parameters)
+        return stream.map(caller, schema=schema, name=name)
@@ -0,0 +1,257 @@
+# coding=utf-8
+# Licensed Materials - Property of IBM
+# Copyright IBM Corp. 2020
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+from tempfile import gettempdir
+from streamsx.database._schema import _make_schema
+from streamsx.database._dbapi import _connect
+
+# SPL types of the Db2 column types
+_DB2_TYPES = {
+    'SMALLINT': 'int16',
+    'INTEGER': 'int32',
+    'INT': 'int32',
+    'BIGINT': 'int64',
+    'REAL': 'float32',
+    'DOUBLE': 'float64',
+    'DOUBLE PRECISION': 'float64',
+    'FLOAT': 'float64',
+    'DECIMAL': 'decimal128',
+    'DEC': 'decimal128',
+    'NUMERIC': 'decimal128',
+    'DECFLOAT': 'decimal128',
+    'BOOLEAN': 'boolean',
+    'CHAR': 'rstring',
+    'CHARACTER': 'rstring',
+    'VARCHAR': 'rstring',
+    'CHARACTER VARYING': 'rstring',
+    'CHAR VARYING': 'rstring',
+    'LONG VARCHAR': 'rstring',
+    'CLOB': 'rstring',
+    'GRAPHIC': 'rstring',
+    'VARGRAPHIC': 'rstring',
+    'DBCLOB': 'rstring',
+    'NCHAR': 'rstring',
+    'NVARCHAR': 'rstring',
+    'NCLOB': 'rstring',
+    'XML': 'rstring',
+    'DATE': 'rstring',
+    'TIME': 'rstring',
+    'TIMESTAMP': 'timestamp',
+    'BINARY': 'blob',
+    'VARBINARY': 'blob',
+    'BLOB': 'blob',
+}
+
+_CONSTRAINTS = ('CONSTRAINT', 'PRIMARY', 'UNIQUE', 'FOREIGN', 'CHECK', 'PERIOD', 'LIKE')
+_CREATE_TABLE = re.compile(r'CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?((?:"[^"]+"|[\w$#@]+)(?:\s*\.\s*(?:"[^"]+"|[\w$#@]+))?)\s*\(', re.IGNORECASE)
+_IDENTIFIER = re.compile(r'[A-Za-z_][A-Za-z0-9_]*$')
+_TYPE_WORDS = re.compile(r'[A-Za-z]+')
+
+
+def _identifier(name):
+    # Db2 folds unquoted identifiers to upper case
+    name = name.strip()
+    if name.startswith('"'):
+        return name[1:-1]
+    return name.upper()
+
+
+def _spl_type(type_name, bit_data=False):
+    type_name = ' '.join(type_name.upper().split())
+    if type_name not in _DB2_TYPES:
+        raise ValueError('Unsupported column type: ' + type_name)
+    if bit_data and _DB2_TYPES[type_name] == 'rstring':
+        return 'blob'
+    return _DB2_TYPES[type_name]
+
+
+def _attribute(column_name, spl_type):
+    if not _IDENTIFIER.match(column_name):
+        raise ValueError('Column name ' + column_name + ' is not a valid attribute name.')
+    return (spl_type, column_name)
+
+
+def _split_top_level(text):
+    # splits at commas outside of parentheses and quotes
+    parts = []
+    depth = 0
+    quoted = None
+    start = 0
+    for i, c in enumerate(text):
+        if quoted is not None:
+            if c == quoted:
+                quoted = None
+        elif c in '"\'':
+            quoted = c
+        elif c == '(':
+            depth += 1
+        elif c == ')':
+            depth -= 1
+        elif c == ',' and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return [part.strip() for part in parts if part.strip()]
+
+
+def _column_definition(definition):
+    # returns the (SPL type, attribute name) pair of a column definition like ``NAME VARCHAR(20) NOT NULL``
+    match = re.match(r'("[^"]+"|[\w$#@]+)\s+(.*)', definition, re.DOTALL)
+    if match is None:
+        raise ValueError('Invalid column definition: ' + definition)
+    rest = match.group(2)
+    words = []
+    for word in _TYPE_WORDS.finditer(rest.split('(')[0]):
+        candidate = ' '.join(words + [word.group(0)]).upper()
+        if not any(t == candidate or t.startswith(candidate + ' ') for t in _DB2_TYPES):
+            break
+        words.append(word.group(0))
+    if not words:
+        raise ValueError('Unsupported column type in definition: ' + definition)
+    bit_data = re.search(r'\bFOR\s+BIT\s+DATA\b', rest, re.IGNORECASE) is not None
+    return _attribute(_identifier(match.group(1)), _spl_type(' '.join(words), bit_data))
+
+
+def _create_tables(ddl):
+    # yields the name parts and the column and constraint definitions of each CREATE TABLE statement in the DDL
+    for match in _CREATE_TABLE.finditer(ddl):
+        name = [_identifier(part) for part in match.group(1).split('.')]
+        depth = 1
+        end = match.end()
+        while depth > 0 and end < len(ddl):
+            if ddl[end] == '(':
+                depth += 1
+            elif ddl[end] == ')':
+                depth -= 1
+            end += 1
+        yield name, _split_top_level(ddl[match.end():end - 1])
+
+
+def _is_constraint(element):
+    return element.split()[0].upper() in _CONSTRAINTS
+
+
+def _parse_ddl(ddl, table=None):
+    """Returns the list of (SPL type, attribute name) pairs of the columns of the table created by a ``CREATE TABLE`` statement in the DDL.
+
+    The first table is used if ``table`` is ``None``, a table name without schema matches the table in any schema.
+    """
+    for name, elements in _create_tables(ddl):
+        if table is not None:
+            wanted = [_identifier(part) for part in table.split('.')]
+            if len(wanted) > len(name) or name[-len(wanted):] != wanted:
+                continue
+        return [_column_definition(e) for e in elements if not _is_constraint(e)]
+    raise ValueError('No CREATE TABLE statement' + ('' if table is None else ' for table ' + table) + ' found in DDL.')
+
+
+def _query_columns(connection, table):
+    # returns the (SPL type, attribute name) pairs of the columns of a table from the Db2 catalog
+    parts = [_identifier(part) for part in table.split('.')]
+    sql = 'SELECT COLNAME, TYPENAME, CODEPAGE FROM SYSCAT.COLUMNS WHERE TABNAME = ? AND TABSCHEMA = '
+    if len(parts) == 2:
+        sql += '? ORDER BY COLNO'
+        params = (parts[1], parts[0])
+    else:
+        sql += 'CURRENT SCHEMA ORDER BY COLNO'
+        params = (parts[0],)
+    cursor = connection.cursor()
+    try:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+    if not rows:
+        raise ValueError('Table ' + table + ' not found in the catalog.')
+    return [_attribute(column_name, _spl_type(type_name, type_name.upper() in ('CHARACTER', 'VARCHAR', 'LONG VARCHAR') and codepage == 0)) for column_name, type_name, codepage in rows]
+
+
+class _SchemaCache(object):
+    """Disk cache of the column attributes of tables, one JSON file per table and source of the columns."""
+    def __init__(self, directory):
+        self._directory = directory
+
+    def _path(self, table, source):
+        key = hashlib.sha256((str(table) + '\0' + source).encode('utf-8')).hexdigest()
+        return os.path.join(self._directory, key + '.json')
+
+    def get(self, table, source):
+        try:
+            with open(self._path(table, source)) as f:
+                return [tuple(attribute) for attribute in json.load(f)['attributes']]
+        except (IOError, OSError, ValueError, KeyError):
+            return None
+
+    def put(self, table, source, attributes):
+        os.makedirs(self._directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self._directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'table': table, 'attributes': attributes}, f)
+        os.replace(tmp, self._path(table, source))
+
+
+def schema_from_table(table=None, credentials=None, ddl=None, cache_dir=None, refresh=False):
+    """Creates the schema of a stream with one attribute for each column of a Db2 table.
+
+    The columns are read from the ``SYSCAT.COLUMNS`` catalog view of the database given by ``credentials`` or parsed from the
+    ``CREATE TABLE`` statement in the DDL text ``ddl``. The columns are cached on disk by table name and database or by table name and hash of the DDL,
+    so generating topologies for many tables queries the catalog once per table. Use ``refresh`` to read the columns of a changed table again.
+
+    The attribute names are the column names, the attribute types are mapped from the column types: ``SMALLINT``, ``INTEGER`` and ``BIGINT`` to ``int16``, ``int32`` and ``int64``,
+    ``REAL`` and ``DOUBLE`` to ``float32`` and ``float64``, ``DECIMAL``, ``NUMERIC`` and ``DECFLOAT`` to ``decimal128``, ``TIMESTAMP`` to ``timestamp``,
+    ``BLOB``, ``BINARY``, ``VARBINARY`` and character columns ``FOR BIT DATA`` to ``blob`` and all other character, date and time columns to ``rstring``.
+
+    Example creating the output schema of a query from the table DDL::
+
+        import streamsx.database as db
+
+        ddl = 'CREATE TABLE SAMPLE_DEMO (ID BIGINT NOT NULL, NAME VARCHAR(32), AGE INTEGER, PRIMARY KEY (ID))'
+        sample_schema = db.schema_from_table('SAMPLE_DEMO', ddl=ddl)
+        res = query.map(db.JDBCStatement(credentials), schema=sample_schema)
+
+    Example reading the columns from the catalog::
+
+        sample_schema = db.schema_from_table('SAMPLE.TAB1', credentials=credentials)
+
+    Args:
+        table(str): Name of the table, optionally qualified with the schema. With ``ddl`` the first table of the DDL is used if ``None``.
+        credentials(dict): The Db2 credentials as dict. The catalog is queried with the `ibm_db <https://pypi.org/project/ibm-db/>`_ package when the topology is built, so the name of an application configuration is not supported.
+        ddl(str): DDL text containing the ``CREATE TABLE`` statement of the table.
+        cache_dir(str): Directory of the cache. If ``None`` the directory ``streamsx.database.catalog`` in the system temporary directory is used.
+        refresh(bool): Set to ``True`` to ignore and replace cached columns.
+    Returns:
+        StreamSchema: Schema with one attribute for each column of the table.
+
+    .. versionadded:: 1.7
+    """
+    if (credentials is None) == (ddl is None):
+        raise ValueError("Either credentials or ddl parameter must be set.")
+    if ddl is None and table is None:
+        raise ValueError("Parameter table must be set to read the columns from the catalog.")
+    if credentials is not None and not isinstance(credentials, dict):
+        raise ValueError("Parameter credentials must be a dict, an application configuration can not be read when the topology is built.")
+    if cache_dir is None:
+        cache_dir = os.path.join(gettempdir(), 'streamsx.database.catalog')
+    if ddl is not None:
+        source = 'ddl:' + hashlib.sha256(ddl.encode('utf-8')).hexdigest()
+    else:
+        source = 'db:' + (credentials.get('jdbcurl') or credentials.get('url') or '')
+    cache = _SchemaCache(cache_dir)
+    attributes = None if refresh else cache.get(table, source)
+    if attributes is None:
+        if ddl is not None:
+            attributes = _parse_ddl(ddl, table)
+        else:
+            connection = _connect(credentials)
+            try:
+                attributes = _query_columns(connection, table)
+            finally:
+                connection.close()
+        cache.put(table, source, attributes)
+    return _make_schema(attributes)
@@ -6,17 +6,70 @@ import datetime
 import requests
 import os
 import json
+import logging
+import uuid
+import warnings
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from tempfile import gettempdir
 import streamsx.spl.op
 import streamsx.spl.types
 from streamsx.topology.schema import CommonSchema, StreamSchema
+from streamsx.topology.topology import Routing, Sink
 from streamsx.spl.types import rstring
 from streamsx.toolkits import download_toolkit
 from streamsx.spl import toolkit
 import streamsx.topology.composite
+from streamsx.database._schema import _schema_attributes, _make_schema
+from streamsx.database._tagged import _tagged_union
+from streamsx.database._spill import _SpillWriter, _SpillReplay
+from streamsx.database._throttle import _Throttle, _ThrottleFeedback, _STAMP
+from streamsx.database._partition import _PartitionHash
+from streamsx.database._backoff import _Backoff, _BackoffGate, _BackoffFeedback
+from streamsx.database._warmup import _WarmUpGate, _WarmUpStrip, _is_warm_up, _ready, _WARM_UP, _VALIDATION
+from streamsx.database._explain import _StandIn
+from streamsx.database._sizing import estimate_vm_arg
+from streamsx.database._toolkit_cache import _ToolkitCache, _VersionRange
 
 
 _TOOLKIT_NAME = 'com.ibm.streamsx.jdbc'
+_TOOLKIT_VERSIONS = '[1.9.0,3.0.0)'
+
+# rows of a result set assumed to be held by the JDBC driver at a time in the heap estimate of vm_arg 'auto'
+_FETCH_SIZE = 1000
+
+_logger = logging.getLogger(__name__)
+
+_STAMP_SCHEMA = StreamSchema('tuple<float64 ' + _STAMP + '>')
+_WARM_UP_SCHEMA = StreamSchema('tuple<boolean ' + _WARM_UP + '>')
+# output of the JDBC operator of a sink, the output port is required and left unconnected
+_SINK_SCHEMA = StreamSchema('tuple<boolean __jdbc_sink>')
+
+
+def _in_consistent_region(stream):
+    # True if an upstream operator starts a consistent region, an autonomous operator ends a region
+    pending = [stream.oport.operator]
+    seen = set()
+    while pending:
+        op = pending.pop()
+        if id(op) in seen or op.kind == '$Autonomous$':
+            continue
+        seen.add(id(op))
+        if op._consistent is not None:
+            return True
+        pending.extend(oport.operator for iport in op.inputPorts for oport in iport.outputPorts)
+    return False
+
+
+# options of the JDBCStatement selecting the driver and opening the connection,
+# statements derived from a user statement inherit these options only
+_CONNECTION_OPTIONS = ('vm_arg', 'jdbc_driver_class', 'jdbc_driver_lib', 'ssl_connection', 'truststore', 'truststore_password', 'truststore_type', 'keystore', 'keystore_password', 'keystore_type', 'plugin_name', 'security_mechanism', 'reconnection_policy', 'reconnection_bound', 'reconnection_interval')
+
+def _discard(tuple_):
+    pass
+
+# first stage of each shared throttle per topology, stages sharing a throttle are colocated
+_SHARED_THROTTLES = weakref.WeakKeyDictionary()
 
 def _add_driver_file_from_url(topology, url, filename):
     r = requests.get(url)
@@ -53,6 +106,44 @@ def _read_db2_credentials(credentials):
         raise TypeError(credentials)
     return jdbcurl, username, password
 
+def _reconnection_params(_op, policy, bound, interval):
+    if policy is not None:
+        _op.params['reconnectionPolicy'] = _op.expression(policy)
+    if bound is not None:
+        _op.params['reconnectionBound'] = bound
+    if interval is not None:
+        _op.params['reconnectionInterval'] = float(interval)
+
+def _connection_properties(credentials):
+    # returns the application configuration properties of the credentials
+    properties = {}
+    if credentials is None:
+        raise TypeError (credentials)
+    
+    if isinstance (credentials, dict):
+        if 'class' in credentials:
+            if credentials.get('class') == 'external': # CP4D external connection
+                if 'url' in credentials:
+                    db_json = {}
+                    db_json['jdbcurl'] = credentials.get('url')
+                    db_json['username'] = credentials.get('username')
+                    db_json['password'] = credentials.get('password')
+                    properties ['credentials'] = json.dumps (db_json)
+                else:
+                    raise TypeError(credentials)
+        else:
+            properties ['credentials'] = json.dumps (credentials)
+    else:
+        properties ['credentials'] = credentials
+    return properties
+
+
+def _unchanged(app_config, properties):
+    # an update sets the given properties only, other properties of the application configuration are kept
+    existing = app_config.properties or {}
+    return all(existing.get(key) == value for key, value in properties.items())
+
+
 def configure_connection (instance, name = 'database', credentials = None):
     """Configures IBM Streams for a certain connection.
 
@@ -84,41 +175,77 @@ def configure_connection (instance, name = 'database', credentials = None):
         credentials(str|dict): The service credentials, for example Db2 Warehouse service credentials.
     Returns:
         Name of the application configuration.
+
+    .. versionchanged:: 1.7 an existing application configuration is updated only if its properties differ
     """
 
     description = 'Database credentials'
-    properties = {}
-    if credentials is None:
-        raise TypeError (credentials)
-    
-    if isinstance (credentials, dict):
-        if 'class' in credentials:
-            if credentials.get('class') == 'external': # CP4D external connection
-                if 'url' in credentials:
-                    db_json = {}
-                    db_json['jdbcurl'] = credentials.get('url')
-                    db_json['username'] = credentials.get('username')
-                    db_json['password'] = credentials.get('password')
-                    properties ['credentials'] = json.dumps (db_json)
-                else:
-                    raise TypeError(credentials)
-        else:
-            properties ['credentials'] = json.dumps (credentials)
-    else:
-        properties ['credentials'] = credentials
-    
-    # check if application configuration exists
-    app_config = instance.get_application_configurations (name = name)
+    properties = _connection_properties(credentials)
+    # check if application configuration exists, the name filter is a regular expression
+    app_config = [c for c in instance.get_application_configurations (name = name) if c.name == name]
     if app_config:
-        print ('update application configuration: ' + name)
-        app_config[0].update (properties)
+        if _unchanged(app_config[0], properties):
+            print ('application configuration unchanged: ' + name)
+        else:
+            print ('update application configuration: ' + name)
+            app_config[0].update (properties)
     else:
         print ('create application configuration: ' + name)
         instance.create_application_configuration (name, properties, description)
     return name
 
 
-def download_toolkit(url=None, target_dir=None):
+def configure_connections(instances, configurations, description='Database credentials', max_workers=8):
+    """Configures IBM Streams for many connections on one or more instances.
+
+    Creates or updates an application configuration for each name and credentials in ``configurations`` on each instance.
+    The existing application configurations of an instance are retrieved with one request and compared with the properties,
+    only missing or changed configurations are written. The requests run concurrently in a pool of at most ``max_workers`` threads.
+
+    Example for rotating the credentials of several application configurations on two instances::
+
+        import streamsx.database as db
+
+        configurations = {'orders-db': orders_credentials, 'inventory-db': inventory_credentials}
+        result = db.configure_connections([instance1, instance2], configurations)
+        # {instance1.id: {'orders-db': 'updated', 'inventory-db': 'unchanged'}, instance2.id: {...}}
+
+    Args:
+        instances(streamsx.rest_primitives.Instance|list): IBM Streams instance object or list of instance objects.
+        configurations(dict): Credentials, as accepted by :py:func:`configure_connection`, by application configuration name.
+        description(str): Description of created application configurations.
+        max_workers(int): Maximum number of concurrent requests.
+    Returns:
+        dict: For each instance id the action by application configuration name, one of ``created``, ``updated`` or ``unchanged``.
+
+    .. versionadded:: 1.7
+    """
+    if not isinstance(instances, (list, tuple)):
+        instances = [instances]
+    properties = dict((name, _connection_properties(credentials)) for name, credentials in configurations.items())
+
+    def _write(instance, name, existing):
+        if existing is None:
+            instance.create_application_configuration(name, properties[name], description)
+            return 'created'
+        if _unchanged(existing, properties[name]):
+            return 'unchanged'
+        existing.update(properties[name])
+        return 'updated'
+
+    result = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        existing = executor.map(lambda instance: dict((c.name, c) for c in instance.get_application_configurations()), instances)
+        writes = []
+        for instance, configs in zip(instances, existing):
+            for name in properties:
+                writes.append((instance.id, name, executor.submit(_write, instance, name, configs.get(name))))
+        for instance_id, name, future in writes:
+            result.setdefault(instance_id, {})[name] = future.result()
+    return result
+
+
+def download_toolkit(url=None, target_dir=None, version=None, cache_dir=None, mirror_dir=None, offline=False, sha256=None):
     r"""Downloads the latest JDBC toolkit from GitHub.
 
     Example for updating the JDBC toolkit for your topology with the latest toolkit from GitHub::
@@ -142,18 +269,32 @@ def download_toolkit(url=None, target_dir=None):
         target_dir(str): the directory where the toolkit is unpacked to. If a relative path is given,
             the path is appended to the system temporary directory, for example to /tmp on Unix/Linux systems.
             If target_dir is ``None`` a location relative to the system temporary directory is chosen.
+            Can not be combined with the parameters of the toolkit cache.
+        version(str): Version or version range of the toolkit like ``[1.9.0,3.0.0)``, the highest version in the range is taken from the cache or downloaded.
+        cache_dir(str): Directory of the toolkit cache. Defaults to a directory in the system temporary directory if another parameter of the toolkit cache is set.
+        mirror_dir(str): Directory containing toolkit archives, searched before the GitHub releases.
+        offline(bool): Set to ``True`` to resolve the toolkit from the cache and the ``mirror_dir`` only.
+        sha256(str): SHA-256 checksum of the toolkit archive. A cached toolkit is taken only if it was unpacked from an archive with this checksum.
 
     Returns:
         str: the location of the downloaded toolkit
 
-    .. note:: This function requires an outgoing Internet connection
+    .. note:: This function requires an outgoing Internet connection unless the toolkit is cached or found in ``mirror_dir``
     .. versionadded:: 1.4
+    .. versionchanged:: 1.7 parameters ``version``, ``cache_dir``, ``mirror_dir``, ``offline`` and ``sha256``
     """
+    if version is not None or cache_dir is not None or mirror_dir is not None or offline or sha256 is not None:
+        if target_dir is not None:
+            raise ValueError("Parameter target_dir can not be combined with version, cache_dir, mirror_dir, offline or sha256, the toolkit is unpacked into the cache_dir.")
+        if cache_dir is None:
+            cache_dir = os.path.join(gettempdir(), 'streamsx.database.toolkits')
+        cache = _ToolkitCache(cache_dir, _TOOLKIT_NAME, 'streamsx.jdbc', mirror_dir=mirror_dir, offline=offline)
+        return cache.resolve(_VersionRange(version if version is not None else _TOOLKIT_VERSIONS), url=url, sha256=sha256)
     _toolkit_location = streamsx.toolkits.download_toolkit (toolkit_name=_TOOLKIT_NAME, url=url, target_dir=target_dir)
     return _toolkit_location
 
 
-def run_statement(stream, credentials, schema=None, sql=None, sql_attribute=None, sql_params=None, transaction_size=1, jdbc_driver_class='com.ibm.db2.jcc.DB2Driver', jdbc_driver_lib=None, ssl_connection=None, truststore=None, truststore_password=None, keystore=None, keystore_password=None, keystore_type=None, truststore_type=None, plugin_name=None, security_mechanism=None, vm_arg=None, name=None):
+def run_statement(stream, credentials, schema=None, sql=None, sql_attribute=None, sql_params=None, transaction_size=1, jdbc_driver_class='com.ibm.db2.jcc.DB2Driver', jdbc_driver_lib=None, ssl_connection=None, truststore=None, truststore_password=None, keystore=None, keystore_password=None, keystore_type=None, truststore_type=None, plugin_name=None, security_mechanism=None, vm_arg=None, reconnection_policy=None, reconnection_bound=None, reconnection_interval=None, sink=False, name=None):
     """Runs a SQL statement using DB2 client driver and JDBC database interface.
 
     The statement is called once for each input tuple received. Result sets that are produced by the statement are emitted as output stream tuples.
@@ -210,10 +351,14 @@ def run_statement(stream, credentials, schema=None, sql=None, sql_attribute=None
         plugin_name(str): Name of the security plugin.
         security_mechanism(int): Value of the security mechanism.
         vm_arg(str): Arbitrary JVM arguments can be passed to the Streams operator.
+        reconnection_policy(str): Policy in case of a connection failure, one of ``BoundedRetry``, ``NoRetry`` or ``InfiniteRetry``. The JDBC toolkit default is ``BoundedRetry``.
+        reconnection_bound(int): Number of reconnection attempts with the ``BoundedRetry`` policy.
+        reconnection_interval(float): Time in seconds between reconnection attempts.
+        sink(bool): Set to ``True`` to terminate the stream for statements without results, the ``schema`` is ignored.
         name(str): Sink name in the Streams context, defaults to a generated name.
 
     Returns:
-        :py:class:`topology_ref:streamsx.topology.topology.Stream`: Output Stream.
+        :py:class:`topology_ref:streamsx.topology.topology.Stream`: Output Stream, or :py:class:`topology_ref:streamsx.topology.topology.Sink` with ``sink``.
 
     .. deprecated:: 1.5.0
         Use the :py:class:`~JDBCStatement`.
@@ -228,6 +373,8 @@ def run_statement(stream, credentials, schema=None, sql=None, sql_attribute=None
     if jdbc_driver_lib is None and jdbc_driver_class != 'com.ibm.db2.jcc.DB2Driver':
         raise ValueError("Parameter jdbc_driver_lib must be specified containing the class from jdbc_driver_class parameter.")
 
+    if sink:
+        schema = _SINK_SCHEMA
     if schema is None:
         schema = stream.oport.schema
 
@@ -273,10 +420,58 @@ def run_statement(stream, credentials, schema=None, sql=None, sql_attribute=None
         _op.params['securityMechanism'] = _op.expression(security_mechanism)
     if plugin_name is not None:
         _op.params['pluginName'] = plugin_name
+    _reconnection_params(_op, reconnection_policy, reconnection_bound, reconnection_interval)
 
+    if sink:
+        return Sink(_op._op())
     return _op.outputs[0]
 
 
+class Throttle(object):
+    """
+    Adaptive rate limit for the statements run by :py:class:`JDBCStatement`
+
+    Tuples are passed to the statement at the rate of a token bucket. The rate is adapted with additive increase and multiplicative decrease (AIMD):
+    it is increased by ``increase`` tuples per second after each second without slow or failed statements and it is multiplied by ``decrease``
+    when the latency of a statement exceeded ``target_latency`` or a statement failed.
+    Failed statements are detected with the SQL status attribute configured with :attr:`JDBCStatement.sql_status_attr`.
+
+    Statements using throttles with the same ``name`` share one rate limit, for example to keep the load of several statements writing to the same database below a target.
+    Statements sharing a throttle are placed into the same processing element.
+    The current rate limit and the statement latency are available as the custom metrics ``throttleRate`` and ``statementLatencyMillis``.
+
+    Example limiting two statements to a shared rate adapted to a latency target of 200 milliseconds::
+
+        import streamsx.database as db
+
+        throttle = db.Throttle(name='db2wh', rate=500.0, target_latency=0.2)
+        inserts.throttle = throttle
+        updates.throttle = throttle
+
+    .. versionadded:: 1.7
+
+    Args:
+        rate(float): Initial rate in tuples per second.
+        name(str): Name of a throttle shared by statements. Each statement has its own throttle if not set.
+        min_rate(float): Minimum rate in tuples per second.
+        max_rate(float): Maximum rate in tuples per second.
+        target_latency(float): Target latency of a statement in seconds. Only failed statements decrease the rate if not set.
+        increase(float): Rate increase in tuples per second. Defaults to 5% of the initial rate.
+        decrease(float): Factor applied to the rate on congestion.
+    """
+    def __init__(self, rate=1000.0, name=None, min_rate=1.0, max_rate=1000000.0, target_latency=None, increase=None, decrease=0.5):
+        self.rate = rate
+        self.name = name
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.target_latency = target_latency
+        self.increase = increase if increase is not None else max(1.0, rate / 20.0)
+        self.decrease = decrease
+
+    def _config(self):
+        return (self.rate, self.min_rate, self.max_rate, self.target_latency, self.increase, self.decrease)
+
+
 class JDBCStatement(streamsx.topology.composite.Map):
     """
     Composite map transformation for JDBC statement
@@ -386,6 +581,26 @@ class JDBCStatement(streamsx.topology.composite.Map):
         self.commit_on_punct=None
         self.batch_on_punct=None
         self.batch_size=None
+        self.spill_directory=None
+        self.spill_threshold=10000
+        self.spill_segment_size=64*1024*1024
+        self.throttle=None
+        self.sql_status_attr=None
+        self.distribution_key=None
+        self.partition_count=None
+        self.partition_function=None
+        self.sql_failure_action=None
+        self.check_connection=None
+        self.warm_up=False
+        self.validation_sql='VALUES 1'
+        self.ready=None
+        self.reconnection_policy=None
+        self.reconnection_bound=None
+        self.reconnection_interval=None
+        self.reconnection_backoff=None
+        self.consistent_region=None
+        self.explain_ddl=None
+        self.output_attributes=None
         if 'vm_arg' in options:
             self.vm_arg = options.get('vm_arg')
         if 'jdbc_driver_class' in options:
@@ -424,11 +639,54 @@ class JDBCStatement(streamsx.topology.composite.Map):
             self.batch_on_punct = options.get('batch_on_punct')
         if 'batch_size' in options:
             self.batch_size = options.get('batch_size')
+        if 'spill_directory' in options:
+            self.spill_directory = options.get('spill_directory')
+        if 'spill_threshold' in options:
+            self.spill_threshold = options.get('spill_threshold')
+        if 'spill_segment_size' in options:
+            self.spill_segment_size = options.get('spill_segment_size')
+        if 'throttle' in options:
+            self.throttle = options.get('throttle')
+        if 'sql_status_attr' in options:
+            self.sql_status_attr = options.get('sql_status_attr')
+        if 'distribution_key' in options:
+            self.distribution_key = options.get('distribution_key')
+        if 'partition_count' in options:
+            self.partition_count = options.get('partition_count')
+        if 'partition_function' in options:
+            self.partition_function = options.get('partition_function')
+        if 'sql_failure_action' in options:
+            self.sql_failure_action = options.get('sql_failure_action')
+        if 'check_connection' in options:
+            self.check_connection = options.get('check_connection')
+        if 'warm_up' in options:
+            self.warm_up = options.get('warm_up')
+        if 'validation_sql' in options:
+            self.validation_sql = options.get('validation_sql')
+        if 'reconnection_policy' in options:
+            self.reconnection_policy = options.get('reconnection_policy')
+        if 'reconnection_bound' in options:
+            self.reconnection_bound = options.get('reconnection_bound')
+        if 'reconnection_interval' in options:
+            self.reconnection_interval = options.get('reconnection_interval')
+        if 'reconnection_backoff' in options:
+            self.reconnection_backoff = options.get('reconnection_backoff')
+        if 'consistent_region' in options:
+            self.consistent_region = options.get('consistent_region')
+        if 'explain_ddl' in options:
+            self.explain_ddl = options.get('explain_ddl')
+        if 'output_attributes' in options:
+            self.output_attributes = options.get('output_attributes')
 
     @property
     def vm_arg(self):
         """
-            str: Arbitrary JVM arguments can be passed to the Streams operator
+            str|list: Arbitrary JVM arguments can be passed to the Streams operator.
+            Set to ``auto`` to set the maximum heap size estimated by :py:func:`estimate_vm_arg` from the input schema, the :attr:`batch_size` and the :attr:`transaction_size`
+            and from the output schema for the rows of a result set fetched at a time,
+            the report of the estimate is logged at level ``INFO`` with the logger ``streamsx.database._database`` when the topology is built.
+
+            .. versionchanged:: 1.7 value ``auto``
         """
         return self._vm_arg
 
@@ -661,7 +919,348 @@ class JDBCStatement(streamsx.topology.composite.Map):
     def batch_size(self, value):
         self._batch_size = value
 
+    @property
+    def spill_directory(self):
+        """
+            str: Local directory for spilling tuples to disk when the database falls behind. Set this property to enable the spill buffer.
+
+            Tuples are passed to the statement through a queue that holds up to :attr:`spill_threshold` tuples in memory.
+            When the queue is full, for example during a database maintenance window, further tuples are appended to memory-mapped segment files in this directory
+            and are replayed in order when the database caught up, so the upstream operators are not blocked.
+            Segment files left by a restarted processing element are replayed first.
+            The number of spilled and replayed tuples and the backlog on disk are available as the custom metrics ``nSpilledTuples``, ``nReplayedTuples`` and ``nSpillBacklog``.
+
+            .. versionadded:: 1.7
+        """
+        return self._spill_directory
+
+    @spill_directory.setter
+    def spill_directory(self, value):
+        self._spill_directory = value
+
+    @property
+    def spill_threshold(self):
+        """
+            int: Number of tuples held in memory before tuples are spilled to disk. The default value is 10000.
+
+            .. versionadded:: 1.7
+        """
+        return self._spill_threshold
+
+    @spill_threshold.setter
+    def spill_threshold(self, value):
+        self._spill_threshold = value
+
+    @property
+    def spill_segment_size(self):
+        """
+            int: Size in bytes of the segment files of the spill buffer. The default value is 64 MB.
+
+            .. versionadded:: 1.7
+        """
+        return self._spill_segment_size
+
+    @spill_segment_size.setter
+    def spill_segment_size(self, value):
+        self._spill_segment_size = value
+
+    @property
+    def throttle(self):
+        """
+            Throttle: Adaptive rate limit for the statements, see :py:class:`Throttle`. The rate is not limited per default.
+
+            .. versionadded:: 1.7
+        """
+        return self._throttle
+
+    @throttle.setter
+    def throttle(self, value):
+        self._throttle = value
+
+    @property
+    def sql_status_attr(self):
+        """
+            str: Name of the output stream attribute containing the SQL status of the statement. The attribute type is ``tuple<int32 sqlCode, rstring sqlState, rstring sqlMessage>``.
+
+            .. versionadded:: 1.7
+        """
+        return self._sql_status_attr
+
+    @sql_status_attr.setter
+    def sql_status_attr(self, value):
+        self._sql_status_attr = value
+
+    @property
+    def output_attributes(self):
+        """
+            str|list: Comma separated names or list of names of the input stream attributes contained in the output stream if no output schema is given.
+            The output stream contains only these attributes, plus the :attr:`sql_status_attr` attribute if set, instead of all input attributes,
+            which reduces the size of the output tuples for wide input tuples.
+
+            .. versionadded:: 1.7
+        """
+        return self._output_attributes
+
+    @output_attributes.setter
+    def output_attributes(self, value):
+        self._output_attributes = value
+
+    @property
+    def sql_failure_action(self):
+        """
+            str: Action in case of a failed statement, one of ``log``, ``rollback`` or ``terminate``. With ``rollback`` the current transaction is rolled back. The JDBC toolkit default is ``log``.
+
+            .. versionadded:: 1.7
+        """
+        return self._sql_failure_action
+
+    @sql_failure_action.setter
+    def sql_failure_action(self, value):
+        self._sql_failure_action = value
+
+    @property
+    def reconnection_policy(self):
+        """
+            str: Policy in case of a connection failure, one of ``BoundedRetry``, ``NoRetry`` or ``InfiniteRetry``. The JDBC toolkit default is ``BoundedRetry``.
+
+            .. versionadded:: 1.7
+        """
+        return self._reconnection_policy
+
+    @reconnection_policy.setter
+    def reconnection_policy(self, value):
+        self._reconnection_policy = value
+
+    @property
+    def reconnection_bound(self):
+        """
+            int: Number of reconnection attempts with the ``BoundedRetry`` policy. The JDBC toolkit default is 5.
+
+            .. versionadded:: 1.7
+        """
+        return self._reconnection_bound
+
+    @reconnection_bound.setter
+    def reconnection_bound(self, value):
+        self._reconnection_bound = value
+
+    @property
+    def reconnection_interval(self):
+        """
+            float: Time in seconds between reconnection attempts. The JDBC toolkit default is 10 seconds. With :attr:`reconnection_backoff` it is the initial backoff interval.
+
+            .. versionadded:: 1.7
+        """
+        return self._reconnection_interval
+
+    @reconnection_interval.setter
+    def reconnection_interval(self, value):
+        self._reconnection_interval = value
+
+    @property
+    def reconnection_backoff(self):
+        """
+            float: Maximum backoff interval in seconds. When set, tuples are held back after a statement failed with a connection failure.
+            The interval until the next tuple is passed to the operator, which triggers the next reconnection attempt, grows exponentially from the :attr:`reconnection_interval`
+            up to this maximum and is randomized (full jitter), so that many operators do not reconnect at the same time.
+            Combine with a small :attr:`reconnection_bound`, for example 1, to leave the spacing of the attempts to the backoff.
+            Requires :attr:`sql_status_attr` to detect the connection failures. The number of connection failures and the time from the first failure to the first
+            successful statement of the last failover are available as the custom metrics ``nConnectionFailures`` and ``recoveryTimeMillis``.
+
+            .. versionadded:: 1.7
+        """
+        return self._reconnection_backoff
+
+    @reconnection_backoff.setter
+    def reconnection_backoff(self, value):
+        self._reconnection_backoff = value
+
+    @property
+    def consistent_region(self):
+        """
+            bool: Set to ``True`` to run the statements in the consistent region of the input stream.
+            The region is started by the caller with ``set_consistent`` on the stream of a source that can replay tuples after a reset, for example a Kafka consumer,
+            the input stream must be part of this region. The operator commits its transaction when the region is drained and rolls back on reset, so the :attr:`transaction_size` is not applied and a transaction contains
+            all tuples of a checkpoint period. Set :attr:`batch_size` to send the statements in large batches. Can not be combined with :attr:`spill_directory`, :attr:`throttle`,
+            :attr:`reconnection_backoff`, :attr:`warm_up` and :attr:`commit_on_punct`, which hold tuples or state outside of the checkpoints.
+
+            .. versionadded:: 1.7
+        """
+        return self._consistent_region
+
+    @consistent_region.setter
+    def consistent_region(self, value):
+        self._consistent_region = value
+
+    @property
+    def explain_ddl(self):
+        """
+            str: DDL script with the ``CREATE TABLE`` and ``CREATE INDEX`` statements of the tables used by the :attr:`sql` statement.
+            When set, the tables and indexes are created in an in-memory sqlite database when the topology is built and the query plan of the statement is checked.
+            A warning is issued if the statement scans all rows of a table, if a column compared with a parameter marker has no index starting with the column,
+            or if the statement can not be explained. A ``MERGE`` statement, which sqlite does not support, is checked for an index on the columns of its ``ON`` clause only. The sqlite query planner is a stand-in for the planner of the database, it finds missing indexes but not all slow plans.
+
+            .. versionadded:: 1.7
+        """
+        return self._explain_ddl
+
+    @explain_ddl.setter
+    def explain_ddl(self, value):
+        self._explain_ddl = value
+
+    @property
+    def check_connection(self):
+        """
+            bool: Set to ``True`` to let the operator check its connection periodically and reconnect a broken connection before the next tuple arrives.
+
+            .. versionadded:: 1.7
+        """
+        return self._check_connection
+
+    @check_connection.setter
+    def check_connection(self, value):
+        self._check_connection = value
+
+    @property
+    def warm_up(self):
+        """
+            bool: Set to ``True`` to run the :attr:`validation_sql` statement on the connection of the operator before the first input tuple.
+            Input tuples received before the validation statement completed are held back, so the first input tuple does not pay for loading the driver classes and setting up the connection.
+            Once the validation statement completed, a tuple is submitted to the :attr:`ready` stream.
+            At most 10000 input tuples are held back. The JDBC operator is placed in the processing element of the warm-up, the validation statement is run again after a restart.
+            Requires the statement to be given with :attr:`sql_attribute`, a statement given with :attr:`sql` is prepared when the operator starts.
+
+            .. versionadded:: 1.7
+        """
+        return self._warm_up
+
+    @warm_up.setter
+    def warm_up(self, value):
+        self._warm_up = value
+
+    @property
+    def validation_sql(self):
+        """
+            str: Statement run to warm up the connection, see :attr:`warm_up`. The default value is ``VALUES 1``.
+
+            .. versionadded:: 1.7
+        """
+        return self._validation_sql
+
+    @validation_sql.setter
+    def validation_sql(self, value):
+        self._validation_sql = value
+
+    @property
+    def ready(self):
+        """
+            Stream: Stream of type ``CommonSchema.String`` with a single tuple submitted when the connection is warmed up, set when the composite is added to a topology with :attr:`warm_up` enabled.
+
+            .. versionadded:: 1.7
+        """
+        return self._ready
+
+    @ready.setter
+    def ready(self, value):
+        self._ready = value
+
+    def _warmed_up(self, topology, stream):
+        # runs the validation statement on the connection of the operator ahead of the input tuples
+        # the statement source restarts with the gate and the JDBC operator, the validation statement is run after each restart
+        validation = topology.source([self.validation_sql], name='ValidationStatement')
+        tagged = _tagged_union(self, stream, validation, _VALIDATION)
+        gated = tagged.flat_map(_WarmUpGate(self.sql_attribute), name='WarmUp')
+        return gated.map(schema=stream.oport.schema.extend(_WARM_UP_SCHEMA)).colocate([validation, gated])
+
+    @property
+    def distribution_key(self):
+        """
+            str: Comma separated names of the input stream attributes matching the distribution key columns of a partitioned table. When set together with :attr:`partition_count`, the statement runs in a parallel region with one channel per database partition and each tuple is routed to the channel selected by the :attr:`partition_function`.
+            The batches of a channel contain the rows of a single database partition only if the :attr:`partition_function` mimics the partitioning hash of the database,
+            the default CRC-32 hash only groups the rows by their key values. The channels run the statement in parallel with one connection each,
+            they do not change how the database routes the rows: every connection is served by its coordinator partition, which forwards the rows of other partitions,
+            so the traffic between the database partitions is not reduced.
+
+            .. versionadded:: 1.7
+        """
+        return self._distribution_key
+
+    @distribution_key.setter
+    def distribution_key(self, value):
+        self._distribution_key = value
+
+    @property
+    def partition_count(self):
+        """
+            int: Number of database partitions of the table, the width of the parallel region for the :attr:`distribution_key`.
+
+            .. versionadded:: 1.7
+        """
+        return self._partition_count
+
+    @partition_count.setter
+    def partition_count(self, value):
+        self._partition_count = value
+
+    @property
+    def partition_function(self):
+        """
+            callable: Function returning the database partition number for a tuple of the :attr:`distribution_key` values, to mimic the hashing of the database. The partition selects the channel modulo :attr:`partition_count`. Defaults to a CRC-32 hash of the key values, which does not match the partitioning hash of Db2.
+
+            .. versionadded:: 1.7
+        """
+        return self._partition_function
+
+    @partition_function.setter
+    def partition_function(self, value):
+        self._partition_function = value
+
+    def _partitioned(self, stream):
+        # starts a parallel region with one channel per database partition
+        key_attributes = [attr_name.strip() for attr_name in self.distribution_key.split(',')]
+        partition_hash = _PartitionHash(key_attributes, self.partition_count, self.partition_function)
+        return stream.parallel(self.partition_count, routing=Routing.HASH_PARTITIONED, func=partition_hash, name='Partitions')
+
+    def _projected_schema(self, input_schema):
+        # output schema with the output attributes of the input schema and the SQL status attribute
+        names = self.output_attributes
+        if isinstance(names, str):
+            names = [attr_name.strip() for attr_name in names.split(',')]
+        types = dict((attr_name, attr_type) for attr_type, attr_name in _schema_attributes(input_schema))
+        attributes = []
+        for attr_name in names:
+            if attr_name not in types:
+                raise ValueError("Parameter output_attributes contains the attribute " + attr_name + " that is not an attribute of the input stream.")
+            attributes.append((types[attr_name], attr_name))
+        if self.sql_status_attr is not None and self.sql_status_attr not in names:
+            attributes.append(('tuple<int32 sqlCode, rstring sqlState, rstring sqlMessage>', self.sql_status_attr))
+        return _make_schema(attributes)
+
+    def _throttled(self, topology, stream):
+        # limits the rate of the stream and stamps each tuple for the latency feedback
+        throttle_name = self.throttle.name if self.throttle.name is not None else 'throttle_' + uuid.uuid4().hex
+        throttled = stream.map(_Throttle(throttle_name, self.throttle._config()), schema=stream.oport.schema.extend(_STAMP_SCHEMA), name='Throttle')
+        if self.throttle.name is not None:
+            shared = _SHARED_THROTTLES.setdefault(topology, {})
+            if throttle_name in shared:
+                throttled.colocate(shared[throttle_name])
+            else:
+                shared[throttle_name] = throttled
+        return throttled, throttle_name
+
+    def _spill(self, topology, stream, name):
+        # decouples the stream from the statement with a spill queue shared by a sink and a source in the same PE
+        queue_name = name if name is not None else 'spill_' + uuid.uuid4().hex
+        args = (self.spill_directory, queue_name, self.spill_threshold, self.spill_segment_size)
+        writer = stream.for_each(_SpillWriter(*args), name='SpillWriter')
+        replayed = topology.source(_SpillReplay(*args), name='SpillReplay')
+        writer.colocate(replayed)
+        return replayed.map(schema=stream.oport.schema)
+
     def populate(self, topology, stream, schema, name, **options):
+        return self._populate(topology, stream, schema, name, False)
+
+    def _populate(self, topology, stream, schema, name, sink):
 
         if self.sql_attribute is None and self.sql is None:
             if stream.oport.schema == CommonSchema.String:
@@ -672,6 +1271,10 @@ class JDBCStatement(streamsx.topology.composite.Map):
         if self.jdbc_driver_lib is None and self.jdbc_driver_class != 'com.ibm.db2.jcc.DB2Driver':
             raise ValueError("Parameter jdbc_driver_lib must be specified containing the class from jdbc_driver_class parameter.")
 
+        if self.output_attributes is not None:
+            if schema is not None:
+                raise ValueError("Parameter output_attributes can not be combined with an output schema.")
+            schema = self._projected_schema(stream.oport.schema)
         if schema is None:
             schema = stream.oport.schema # output schema is the same as input schema
 
@@ -685,9 +1288,61 @@ class JDBCStatement(streamsx.topology.composite.Map):
             app_config_name = self.credentials
 
         if self.commit_on_punct is not None or self.batch_on_punct is not None: # Parameters haven been introduced in toolkit version 1.9.0
-            toolkit.add_toolkit_dependency(topology, 'com.ibm.streamsx.jdbc', '[1.9.0,3.0.0)')
-
-        _op = _JDBCRun(stream=stream, schema=schema, appConfigName=app_config_name, jdbcUrl=jdbcurl, jdbcUser=username, jdbcPassword=password, transactionSize=self.transaction_size, commitOnPunct=self.commit_on_punct, batchOnPunct=self.batch_on_punct, batchSize=self.batch_size, vmArg=self.vm_arg, name=name)
+            toolkit.add_toolkit_dependency(topology, 'com.ibm.streamsx.jdbc', _TOOLKIT_VERSIONS)
+
+        if (self.distribution_key is None) != (self.partition_count is None):
+            raise ValueError("Parameters distribution_key and partition_count must be set both for the partition-aware routing.")
+
+        if self.reconnection_backoff is not None and self.sql_status_attr is None:
+            raise ValueError("Parameter reconnection_backoff requires the sql_status_attr parameter.")
+        if self.warm_up and self.sql_attribute is None:
+            raise ValueError("Parameter warm_up requires the sql_attribute parameter, a statement given with sql is prepared when the operator starts.")
+        if self.warm_up and self.distribution_key is not None:
+            raise ValueError("Parameter warm_up can not be combined with the distribution_key parameter.")
+
+        vm_arg = self.vm_arg
+        if vm_arg == 'auto':
+            vm_arg, report = estimate_vm_arg(stream.oport.schema, batch_size=self.batch_size, transaction_size=self.transaction_size, fetch_size=_FETCH_SIZE, result_schema=schema)
+            _logger.info('JVM heap estimate of %s:\n%s', name if name is not None else 'JDBCStatement', report)
+
+        if self.explain_ddl is not None:
+            if self.sql is None:
+                raise ValueError("Parameter explain_ddl requires the sql parameter.")
+            for message in _StandIn(self.explain_ddl).explain(self.sql):
+                # reported at the stream method called with the composite: _populate, populate, Composite._add, Stream.map or for_each
+                warnings.warn(message, stacklevel=5)
+
+        transaction_size = self.transaction_size
+        if self.consistent_region:
+            if self.spill_directory is not None or self.throttle is not None or self.reconnection_backoff is not None or self.warm_up or self.commit_on_punct is not None:
+                raise ValueError("Parameter consistent_region can not be combined with spill_directory, throttle, reconnection_backoff, warm_up or commit_on_punct.")
+            if not _in_consistent_region(stream):
+                raise ValueError("Parameter consistent_region requires an input stream in a consistent region, call set_consistent on the stream of a source that replays tuples.")
+            transaction_size = None # committed on drain
+
+        if self.spill_directory is not None:
+            stream = self._spill(topology, stream, name)
+        if self.distribution_key is not None:
+            self.group = False # parallel markers can not be grouped visually
+            stream = self._partitioned(stream)
+
+        output_schema = schema
+        if self.warm_up:
+            stream = self._warmed_up(topology, stream)
+            warmed_up = stream
+            schema = schema.extend(_WARM_UP_SCHEMA)
+
+        run_schema = schema
+        if self.throttle is not None:
+            stream, throttle_name = self._throttled(topology, stream)
+            schema = schema.extend(_STAMP_SCHEMA)
+
+        if self.reconnection_backoff is not None:
+            backoff_name = 'backoff_' + uuid.uuid4().hex
+            backoff = _Backoff(self.reconnection_interval if self.reconnection_interval is not None else 1.0, self.reconnection_backoff)
+            stream = stream.map(_BackoffGate(backoff_name, backoff), schema=stream.oport.schema, name='ReconnectionBackoff')
+
+        _op = _JDBCRun(stream=stream, schema=schema, appConfigName=app_config_name, jdbcUrl=jdbcurl, jdbcUser=username, jdbcPassword=password, transactionSize=transaction_size, commitOnPunct=self.commit_on_punct, batchOnPunct=self.batch_on_punct, batchSize=self.batch_size, checkConnection=self.check_connection, sqlStatusAttr=self.sql_status_attr, vmArg=vm_arg, name=name)
 
         if self.sql_attribute is not None:
             _op.params['statementAttr'] = _op.attribute(stream, self.sql_attribute)
@@ -723,8 +1378,70 @@ class JDBCStatement(streamsx.topology.composite.Map):
             _op.params['securityMechanism'] = _op.expression(self.security_mechanism)
         if self.plugin_name is not None:
             _op.params['pluginName'] = self.plugin_name
+        if self.sql_failure_action is not None:
+            _op.params['sqlFailureAction'] = _op.expression(self.sql_failure_action)
+        _reconnection_params(_op, self.reconnection_policy, self.reconnection_bound, self.reconnection_interval)
+
+        result = _op.outputs[0]
+        if self.warm_up:
+            result.colocate(warmed_up)
+        if self.reconnection_backoff is not None:
+            result = result.map(_BackoffFeedback(backoff_name, backoff, self.sql_status_attr), schema=schema, name='ReconnectionMonitor').colocate(stream)
+
+        output_attribute = 'string' if output_schema == CommonSchema.String else None
+        if self.throttle is not None:
+            feedback = _ThrottleFeedback(throttle_name, self.throttle._config(), self.sql_status_attr, None if self.warm_up else output_attribute)
+            result = result.map(feedback, schema=run_schema, name='ThrottleFeedback').colocate(stream)
+
+        if self.warm_up:
+            result, validated = result.split(2, _is_warm_up, names=['Results', 'Validated'])
+            self.ready = validated.map(_ready, schema=CommonSchema.String, name='Ready')
+            result = result.map(_WarmUpStrip(output_attribute), schema=output_schema)
+
+        if sink:
+            if result is _op.outputs[0]:
+                return Sink(_op._op())
+            return result.for_each(_discard, name='Discard')
+        if self.distribution_key is not None:
+            return result.end_parallel()
+        return result
+
+
+class JDBCSink(streamsx.topology.composite.ForEach, JDBCStatement):
+    """
+    Composite sink running a SQL statement for each input tuple without output stream
+
+    Takes the same credentials and options as :py:class:`JDBCStatement`, use it for statements without results, for example inserts.
+    The JDBC toolkit operator requires an output port, it is created with a single attribute and is not connected to other operators,
+    so the input tuples are not copied to an output stream. With :attr:`sql_status_attr` the output contains the SQL status only.
+    The options :attr:`throttle`, :attr:`reconnection_backoff` and :attr:`warm_up` process the output tuples, with these options the output is terminated in a Python sink.
+    The option :attr:`output_attributes` does not apply.
+
+    Example inserting the tuples of a stream::
 
-        return _op.outputs[0]
+        import streamsx.database as db
+
+        insert = db.JDBCSink(credentials, sql='INSERT INTO SAMPLE_DEMO (ID, NAME, AGE) VALUES (? , ?, ?)', sql_params='ID, NAME, AGE')
+        sample_data.for_each(insert, name='INSERT')
+
+    .. versionadded:: 1.7
+
+    Attributes
+    ----------
+    credentials : dict|str
+        The credentials of the IBM cloud Db2 warehouse service as dict or configured external connection of kind "Db2 Warehouse" (Cloud Pak for Data only) as dict or the name of the application configuration.
+    options : kwargs
+        The additional optional parameters as variable keyword arguments.
+    """
+
+    def populate(self, topology, stream, name, **options):
+        if self.output_attributes is not None:
+            raise ValueError("Parameter output_attributes does not apply to JDBCSink.")
+        if self.sql_status_attr is not None:
+            schema = _make_schema([('tuple<int32 sqlCode, rstring sqlState, rstring sqlMessage>', self.sql_status_attr)])
+        else:
+            schema = _SINK_SCHEMA
+        return self._populate(topology, stream, schema, name, True)
 
 
 class _JDBCRun(streamsx.spl.op.Invoke):
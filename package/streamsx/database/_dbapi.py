@@ -0,0 +1,188 @@
+# coding=utf-8
+# Licensed Materials - Property of IBM
+# Copyright IBM Corp. 2020
+
+import json
+import operator
+import re
+import time
+import streamsx.ec
+import streamsx.topology.composite
+from streamsx.database._schema import _schema_attributes
+from streamsx.database._tagged import _tagged_with_ticks, _TICK
+
+_JDBC_URL = re.compile(r'jdbc:db2://(?P<host>[^:/]+)(?::(?P<port>\d+))?/(?P<database>[^:;]+)(?::(?P<properties>.*))?', re.IGNORECASE)
+
+
+def _db2_dsn(jdbcurl, username, password):
+    """Converts a Db2 JDBC URL and the user credentials to a CLI connection string."""
+    match = _JDBC_URL.match(jdbcurl)
+    if match is None:
+        raise ValueError('Unsupported JDBC URL: ' + jdbcurl)
+    dsn = 'DATABASE={0};HOSTNAME={1};PORT={2};PROTOCOL=TCPIP;UID={3};PWD={4};'.format(match.group('database'), match.group('host'), match.group('port') or '50000', username, password)
+    properties = (match.group('properties') or '').lower()
+    if 'sslconnection=true' in properties:
+        dsn += 'SECURITY=SSL;'
+    return dsn
+
+
+def _connect(credentials):
+    """Opens a DB-API connection with auto-commit disabled, the credentials are a dict or the name of an application configuration."""
+    import ibm_db_dbi
+    if not isinstance(credentials, dict):
+        credentials = json.loads(streamsx.ec.get_application_configuration(credentials)['credentials'])
+    jdbcurl = credentials.get('jdbcurl', credentials.get('url'))
+    connection = ibm_db_dbi.connect(_db2_dsn(jdbcurl, credentials.get('username'), credentials.get('password')))
+    connection.set_autocommit(False)
+    return connection
+
+
+def _driver_error():
+    """Returns the base class of the exceptions raised by the DB-API driver for database errors."""
+    import ibm_db_dbi
+    return ibm_db_dbi.Error
+
+
+def _row_getter(params):
+    """Returns a function returning the tuple of the parameter values of a stream tuple, built by ``operator.itemgetter``."""
+    if len(params) == 1:
+        name = params[0]
+        return lambda tuple_: (tuple_[name],)
+    return operator.itemgetter(*params)
+
+
+class _BatchWriter(object):
+    """Runs a statement for batches of tuples with one ``executemany`` call and commits each batch.
+
+    The batch is a list of parameter rows, one tuple per stream tuple. The driver binds the rows as parameter arrays.
+    A batch is written when it is full or when it is older than ``max_seconds`` at a tick.
+    A batch failing in ``executemany`` or commit is rolled back before the connection is closed.
+    """
+    def __init__(self, credentials, sql, params, batch_size, max_seconds):
+        self._credentials = credentials
+        self._sql = sql
+        self._row = _row_getter(params)
+        self._batch_size = batch_size
+        self._max_seconds = max_seconds
+
+    def __enter__(self):
+        self._connection = _connect(self._credentials)
+        self._cursor = self._connection.cursor()
+        self._rows = []
+        self._started = None
+        self._failed = False
+        self._batches_metric = streamsx.ec.CustomMetric(self, name='nBatches', description='Number of batches written')
+        self._rows_metric = streamsx.ec.CustomMetric(self, name='nRowsWritten', description='Number of rows written')
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                self._write()
+        finally:
+            if self._failed:
+                self._connection.rollback()
+            self._connection.close()
+
+    def __call__(self, tagged):
+        tag, tuple_ = tagged
+        if tag == _TICK:
+            if self._started is not None and time.time() - self._started >= self._max_seconds:
+                self._write()
+            return
+        if self._started is None:
+            self._started = time.time()
+        self._rows.append(self._row(tuple_))
+        if len(self._rows) >= self._batch_size:
+            self._write()
+
+    def _write(self):
+        if not self._rows:
+            return
+        self._failed = True
+        self._cursor.executemany(self._sql, self._rows)
+        self._connection.commit()
+        self._failed = False
+        self._rows_metric += len(self._rows)
+        self._batches_metric += 1
+        self._rows = []
+        self._started = None
+
+
+class Db2BatchStatement(streamsx.topology.composite.ForEach):
+    """
+    Composite sink running a statement for micro-batches of tuples with the Python Db2 driver
+
+    The :attr:`sql_params` attributes of each input tuple are collected as a parameter row of the batch, a plain list of row tuples.
+    A batch is passed to the driver with a single ``executemany`` call, which binds the rows as parameter arrays and sends the batch in one round trip,
+    and is committed. A batch is written when it contains :attr:`batch_size` tuples or when it is older than :attr:`max_seconds`.
+    A failing batch is rolled back and the operator fails.
+
+    The statement is run with the `ibm_db <https://pypi.org/project/ibm-db/>`_ package, the package is added to the application as a pip requirement.
+    Db2 credentials with a ``jdbcurl`` and the name of an application configuration created by :py:func:`configure_connection` are supported.
+    The number of batches and rows written are available as the custom metrics ``nBatches`` and ``nRowsWritten``.
+
+    Example inserting batches of 5000 rows::
+
+        import streamsx.database as db
+
+        insert = db.Db2BatchStatement(credentials, 'INSERT INTO SAMPLE_DEMO (ID, NAME, AGE) VALUES (?, ?, ?)', 'ID, NAME, AGE', batch_size=5000)
+        sample_data.for_each(insert)
+
+    .. versionadded:: 1.7
+
+    Attributes
+    ----------
+    credentials : dict|str
+        The credentials of the IBM cloud Db2 warehouse service as dict or configured external connection of kind "Db2 Warehouse" (Cloud Pak for Data only) as dict or the name of the application configuration.
+    sql : str
+        String containing the SQL statement with parameter markers.
+    sql_params : str
+        Comma separated names of the input stream attributes used as statement parameters.
+    options : kwargs
+        The additional optional parameters as variable keyword arguments.
+    """
+
+    def __init__(self, credentials, sql, sql_params, **options):
+        self.credentials = credentials
+        self.sql = sql
+        self.sql_params = sql_params
+        self.batch_size = options.get('batch_size', 1000)
+        self.max_seconds = options.get('max_seconds', 1.0)
+
+    @property
+    def batch_size(self):
+        """
+            int: Number of tuples of a batch. The default value is 1000.
+        """
+        return self._batch_size
+
+    @batch_size.setter
+    def batch_size(self, value):
+        self._batch_size = value
+
+    @property
+    def max_seconds(self):
+        """
+            float: Time in seconds after which an incomplete batch is written. The default value is 1 second.
+        """
+        return self._max_seconds
+
+    @max_seconds.setter
+    def max_seconds(self, value):
+        self._max_seconds = value
+
+    def populate(self, topology, stream, name, **options):
+
+        params = [attr_name.strip() for attr_name in self.sql_params.split(',')]
+        types = dict((attr_name, attr_type) for attr_type, attr_name in _schema_attributes(stream.oport.schema))
+        for attr_name in params:
+            if attr_name not in types:
+                raise ValueError("Parameter sql_params contains the attribute " + attr_name + " that is not an attribute of the input stream.")
+        credentials = self.credentials
+        if isinstance(credentials, dict) and credentials.get('class') == 'external':
+            credentials = {'jdbcurl': credentials.get('url'), 'username': credentials.get('username'), 'password': credentials.get('password')}
+
+        topology.add_pip_package('ibm_db')
+        tagged = _tagged_with_ticks(self, stream, max(0.1, self.max_seconds / 10.0))
+        writer = _BatchWriter(credentials, self.sql, params, self.batch_size, self.max_seconds)
+        return tagged.for_each(writer, name=name)
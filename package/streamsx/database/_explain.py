@@ -0,0 +1,149 @@
+# coding=utf-8
+# Licensed Materials - Property of IBM
+# Copyright IBM Corp. 2020
+
+import re
+import sqlite3
+from streamsx.database._catalog import _create_tables, _is_constraint, _identifier
+
+_NAME = r'(?:"[^"]+"|[\w$#@]+)'
+_QUALIFIED_NAME = _NAME + r'(?:\s*\.\s*' + _NAME + r')?'
+_CREATE_INDEX = re.compile(r'CREATE\s+(?:UNIQUE\s+)?INDEX\s+(' + _QUALIFIED_NAME + r')\s+ON\s+(' + _QUALIFIED_NAME + r')\s*\(([^)]*)\)', re.IGNORECASE)
+_KEY = re.compile(r'\b(?:PRIMARY\s+KEY|UNIQUE)\s*\(([^)]*)\)', re.IGNORECASE)
+_COLUMN_KEY = re.compile(r'\bPRIMARY\s+KEY\b|\bUNIQUE\b', re.IGNORECASE)
+_TABLE_REFERENCE = re.compile(r'\b(?:FROM|JOIN|UPDATE|INTO)\s+(' + _QUALIFIED_NAME + r')', re.IGNORECASE)
+_WHERE = re.compile(r'\bWHERE\b', re.IGNORECASE)
+# sqlite has no MERGE, the target table and the ON clause are checked instead of the query plan
+_MERGE = re.compile(r'MERGE\s+INTO\s+(' + _QUALIFIED_NAME + r')(?:\s+(?:AS\s+)?(' + _NAME + r'))?\s+USING\b.*?\bON\b(.*?)\bWHEN\b', re.IGNORECASE | re.DOTALL)
+_QUALIFIED_COLUMN = re.compile(r'(' + _NAME + r')\s*\.\s*(' + _NAME + r')')
+# column compared with a parameter marker, optionally qualified with a table or correlation name
+_PREDICATE = re.compile(r'(?:' + _NAME + r'\s*\.\s*)?(' + _NAME + r')\s*(?:=|<>|!=|<=|>=|<|>|\bLIKE\b|\bIN\s*\(|\bBETWEEN\b)\s*\?', re.IGNORECASE)
+# Db2 clauses without equivalent in sqlite
+_FETCH_FIRST = re.compile(r'\bFETCH\s+FIRST\s+(\d+)\s+ROWS?\s+ONLY\b', re.IGNORECASE)
+_ISOLATION = re.compile(r'\bWITH\s+(?:UR|CS|RS|RR)\s*$', re.IGNORECASE)
+
+
+def _names(name):
+    return [_identifier(part) for part in name.split('.')]
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _statements(script):
+    # splits a script at semicolons outside of quotes
+    statements = []
+    quoted = None
+    start = 0
+    for i, c in enumerate(script):
+        if quoted is not None:
+            if c == quoted:
+                quoted = None
+        elif c in '"\'':
+            quoted = c
+        elif c == ';':
+            statements.append(script[start:i])
+            start = i + 1
+    statements.append(script[start:])
+    return [statement.strip() for statement in statements if statement.strip()]
+
+
+def _markers(sql):
+    # number of parameter markers outside of quotes
+    count = 0
+    quoted = None
+    for c in sql:
+        if quoted is not None:
+            if c == quoted:
+                quoted = None
+        elif c in '"\'':
+            quoted = c
+        elif c == '?':
+            count += 1
+    return count
+
+
+class _StandIn(object):
+    """In-memory sqlite database with the tables and indexes of a Db2 DDL script, column types and options are not created."""
+    def __init__(self, ddl):
+        self.connection = sqlite3.connect(':memory:')
+        self.columns = {}
+        self.indexes = {}
+        self._schemas = set()
+        for statement in _statements(ddl):
+            index = _CREATE_INDEX.match(statement)
+            if index is not None:
+                columns = [_identifier(column.split()[0]) for column in index.group(3).split(',')]
+                self._create_index(_names(index.group(2)), _names(index.group(1))[-1], columns)
+            else:
+                for name, elements in _create_tables(statement):
+                    self._create_table(name, elements)
+
+    def _qualified(self, name):
+        if len(name) == 2 and name[0] not in self._schemas:
+            self.connection.execute('ATTACH DATABASE \':memory:\' AS ' + _quote(name[0]))
+            self._schemas.add(name[0])
+        return '.'.join(_quote(part) for part in name)
+
+    def _create_table(self, name, elements):
+        columns = []
+        keys = []
+        for element in elements:
+            if _is_constraint(element):
+                key = _KEY.search(element)
+                if key is not None:
+                    keys.append([_identifier(column) for column in key.group(1).split(',')])
+            else:
+                column = _identifier(re.match(_NAME, element).group(0))
+                columns.append(column)
+                if _COLUMN_KEY.search(element):
+                    keys.append([column])
+        self.connection.execute('CREATE TABLE ' + self._qualified(name) + ' (' + ', '.join(_quote(column) for column in columns) + ')')
+        self.columns[name[-1]] = columns
+        for i, key in enumerate(keys):
+            self._create_index(name, name[-1] + '_KEY' + str(i), key)
+
+    def _create_index(self, table, index_name, columns):
+        index = self._qualified(table[:-1] + [index_name])
+        self.connection.execute('CREATE INDEX ' + index + ' ON ' + _quote(table[-1]) + ' (' + ', '.join(_quote(column) for column in columns) + ')')
+        self.indexes.setdefault(table[-1], []).append(columns)
+
+    def explain(self, sql):
+        """Returns the warnings for the query plan of the statement."""
+        sql = _ISOLATION.sub('', _FETCH_FIRST.sub(r'LIMIT \1', sql.strip())).strip()
+        merge = _MERGE.match(sql)
+        if merge is not None:
+            return self._explain_merge(merge, sql)
+        result = []
+        try:
+            plan = self.connection.execute('EXPLAIN QUERY PLAN ' + sql, (None,) * _markers(sql)).fetchall()
+        except sqlite3.Error as e:
+            result.append('Statement can not be explained with the DDL: ' + str(e) + ': ' + sql)
+            plan = []
+        for row in plan:
+            detail = row[-1]
+            if detail.startswith('SCAN ') and not detail.startswith('SCAN CONSTANT ROW'):
+                result.append('Statement scans all rows (' + detail + '): ' + sql)
+        tables = sorted(set(_names(name)[-1] for name in _TABLE_REFERENCE.findall(sql)))
+        where = _WHERE.split(sql, 1)
+        predicates = _PREDICATE.findall(where[1]) if len(where) == 2 else []
+        for column in sorted(set(_identifier(name) for name in predicates)):
+            for table in tables:
+                if self._unindexed(table, column):
+                    result.append('No index on the predicate column ' + column + ' of table ' + table + ': ' + sql)
+        return result
+
+    def _unindexed(self, table, column):
+        return column in self.columns.get(table, []) and not any(index[0] == column for index in self.indexes.get(table, []))
+
+    def _explain_merge(self, merge, sql):
+        # the rows of the target table are matched with the columns of the ON clause
+        table = _names(merge.group(1))[-1]
+        if table not in self.columns:
+            return ['Statement can not be explained with the DDL: no such table: ' + table + ': ' + sql]
+        qualifiers = set([table] + ([_identifier(merge.group(2))] if merge.group(2) is not None else []))
+        columns = sorted(set(_identifier(column) for qualifier, column in _QUALIFIED_COLUMN.findall(merge.group(3)) if _identifier(qualifier) in qualifiers))
+        if columns and all(self._unindexed(table, column) for column in columns):
+            return ['No index on the merge columns ' + ', '.join(columns) + ' of table ' + table + ': ' + sql]
+        return []
@@ -0,0 +1,231 @@
+# coding=utf-8
+# Licensed Materials - Property of IBM
+# Copyright IBM Corp. 2020
+
+import base64
+import datetime
+import decimal
+import logging
+import streamsx.ec
+import streamsx.topology.composite
+from streamsx.topology.schema import CommonSchema
+from streamsx.database._dbapi import _connect, _driver_error
+
+_logger = logging.getLogger(__name__)
+
+# key of the rows of a page tuple
+_ROWS = 'rows'
+
+
+def _json_value(value):
+    # converts a DB-API column value to a JSON value, decimals to numbers, times to ISO 8601 strings and binary values to base64 strings,
+    # decimals that are not integers and are not represented exactly by a float are converted to strings
+    if isinstance(value, decimal.Decimal):
+        if not value.is_finite():
+            return str(value)
+        if value == value.to_integral_value():
+            return int(value)
+        number = float(value)
+        return number if decimal.Decimal(repr(number)) == value else str(value)
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return base64.b64encode(bytes(value)).decode('ascii')
+    return value
+
+
+def _json_rows(cursor, fetch_size):
+    # yields the rows of the result set as dicts with the column names as keys
+    names = [column[0] for column in cursor.description]
+    while True:
+        rows = cursor.fetchmany(fetch_size)
+        if not rows:
+            return
+        for row in rows:
+            yield dict((name, _json_value(value)) for name, value in zip(names, row))
+
+
+class _JsonQuery(object):
+    """Runs a query for each tuple with a DB-API connection and returns the result rows as JSON objects, one per row or packed into pages of ``page_size`` rows."""
+    def __init__(self, credentials, sql, sql_attribute, sql_params, page_size, fetch_size):
+        self._credentials = credentials
+        self._sql = sql
+        self._sql_attribute = sql_attribute
+        self._sql_params = sql_params
+        self._page_size = page_size
+        self._fetch_size = fetch_size
+
+    def __enter__(self):
+        self._connection = _connect(self._credentials)
+        self._error = _driver_error()
+        self._rows_metric = streamsx.ec.CustomMetric(self, name='nRowsFetched', description='Number of result rows fetched')
+        self._failed_metric = streamsx.ec.CustomMetric(self, name='nFailedQueries', description='Number of queries failed and skipped')
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._connection.close()
+
+    def __call__(self, tuple_):
+        if self._sql is not None:
+            sql = self._sql
+        else:
+            sql = tuple_ if isinstance(tuple_, str) else tuple_[self._sql_attribute]
+        cursor = self._connection.cursor()
+        try:
+            cursor.execute(sql, tuple(tuple_[name] for name in self._sql_params))
+        except self._error as e:
+            self._fail(cursor, sql, e)
+            return None
+        rows = self._fetch(cursor, sql)
+        return self._rows(rows) if self._page_size is None else self._pages(rows)
+
+    def _fetch(self, cursor, sql):
+        # yields the result rows and ends the query, the rows fetched before a failure are kept
+        try:
+            for row in _json_rows(cursor, self._fetch_size):
+                yield row
+        except self._error as e:
+            self._fail(cursor, sql, e)
+            return
+        cursor.close()
+        # ends the read transaction to release the locks of the query
+        self._connection.commit()
+
+    def _fail(self, cursor, sql, error):
+        # a failing query is rolled back and skipped, the operator continues with the next tuple
+        cursor.close()
+        self._connection.rollback()
+        self._failed_metric += 1
+        _logger.error('Query failed and skipped: %s: %s', sql, error)
+
+    def _rows(self, rows):
+        for row in rows:
+            self._rows_metric += 1
+            yield row
+
+    def _pages(self, rows):
+        page = []
+        for row in rows:
+            page.append(row)
+            if len(page) == self._page_size:
+                self._rows_metric += len(page)
+                yield {_ROWS: page}
+                page = []
+        if page:
+            self._rows_metric += len(page)
+            yield {_ROWS: page}
+
+
+class JDBCJsonQuery(streamsx.topology.composite.Map):
+    """
+    Composite map transformation running a query for each input tuple and returning the result rows as JSON
+
+    Each result row is returned as a tuple of :py:const:`~streamsx.topology.schema.CommonSchema.Json` with the column names as keys,
+    so no output schema matching the columns of the query is required. With :attr:`page_size` the rows are packed into pages,
+    each page is a JSON tuple with the key ``rows`` and the list of up to :attr:`page_size` rows as value, which reduces the number of tuples
+    for large result sets. ``DECIMAL`` and ``DECFLOAT`` values are converted to numbers, or to strings if they are neither integers nor represented exactly by a float,
+    for example ``NaN`` or values with more significant digits than a float. Date and time values are converted to ISO 8601 strings and binary values to base64 strings.
+    A failing query is rolled back and skipped, the error is logged and counted in the custom metric ``nFailedQueries``.
+
+    The query is run with the `ibm_db <https://pypi.org/project/ibm-db/>`_ package, the package is added to the application as a pip requirement.
+    Db2 credentials with a ``jdbcurl`` and the name of an application configuration created by :py:func:`configure_connection` are supported.
+    The number of rows fetched is available as the custom metric ``nRowsFetched``.
+
+    Example running ad-hoc queries given as strings and returning pages of 500 rows::
+
+        import streamsx.database as db
+
+        queries = topo.source(['SELECT * FROM SAMPLE.TAB1']).as_string()
+        pages = queries.map(db.JDBCJsonQuery(credentials, page_size=500))
+
+    Example querying the orders of each customer of the input stream::
+
+        query = db.JDBCJsonQuery(credentials, sql='SELECT * FROM ORDERS WHERE CUSTOMER = ?', sql_params='CUSTOMER')
+        orders = customers.map(query)
+
+    .. versionadded:: 1.7
+
+    Attributes
+    ----------
+    credentials : dict|str
+        The credentials of the IBM cloud Db2 warehouse service as dict or configured external connection of kind "Db2 Warehouse" (Cloud Pak for Data only) as dict or the name of the application configuration.
+    options : kwargs
+        The additional optional parameters as variable keyword arguments.
+    """
+
+    def __init__(self, credentials, **options):
+        self.credentials = credentials
+        self.sql = options.get('sql')
+        self.sql_attribute = options.get('sql_attribute')
+        self.sql_params = options.get('sql_params')
+        self.page_size = options.get('page_size')
+        self.fetch_size = options.get('fetch_size', 1000)
+
+    @property
+    def sql(self):
+        """
+            str: String containing the query with parameter markers.
+        """
+        return self._sql
+
+    @sql.setter
+    def sql(self, value):
+        self._sql = value
+
+    @property
+    def sql_attribute(self):
+        """
+            str: Name of the input stream attribute containing the query. Defaults to the string of an input stream of :py:const:`~streamsx.topology.schema.CommonSchema.String`.
+        """
+        return self._sql_attribute
+
+    @sql_attribute.setter
+    def sql_attribute(self, value):
+        self._sql_attribute = value
+
+    @property
+    def sql_params(self):
+        """
+            str: Comma separated names of the input stream attributes used as query parameters.
+        """
+        return self._sql_params
+
+    @sql_params.setter
+    def sql_params(self, value):
+        self._sql_params = value
+
+    @property
+    def page_size(self):
+        """
+            int: Number of rows packed into one page tuple. If ``None`` each row is returned as a tuple.
+        """
+        return self._page_size
+
+    @page_size.setter
+    def page_size(self, value):
+        self._page_size = value
+
+    @property
+    def fetch_size(self):
+        """
+            int: Number of rows fetched from the database at a time. The default value is 1000.
+        """
+        return self._fetch_size
+
+    @fetch_size.setter
+    def fetch_size(self, value):
+        self._fetch_size = value
+
+    def populate(self, topology, stream, schema, name, **options):
+
+        if self.sql_attribute is None and self.sql is None and stream.oport.schema != CommonSchema.String:
+            raise ValueError("Either sql_attribute or sql parameter must be set.")
+        if schema is not None and schema != CommonSchema.Json:
+            raise ValueError("The output schema of JDBCJsonQuery is CommonSchema.Json.")
+        params = [attr_name.strip() for attr_name in self.sql_params.split(',')] if self.sql_params else []
+        credentials = self.credentials
+        if isinstance(credentials, dict) and credentials.get('class') == 'external':
+            credentials = {'jdbcurl': credentials.get('url'), 'username': credentials.get('username'), 'password': credentials.get('password')}
+
+        topology.add_pip_package('ibm_db')
+        query = _JsonQuery(credentials, self.sql, self.sql_attribute, params, self.page_size, self.fetch_size)
+        return stream.flat_map(query, name=name).as_json()
@@ -0,0 +1,175 @@
+# coding=utf-8
+# Licensed Materials - Property of IBM
+# Copyright IBM Corp. 2020
+
+import copy
+import math
+import time
+import streamsx.ec
+import streamsx.topology.composite
+from streamsx.topology.schema import CommonSchema, StreamSchema
+
+# attribute added to the tuples passed to the statement to measure the end-to-end latency
+_ARRIVAL = '__jdbc_arrival'
+_ARRIVAL_SCHEMA = StreamSchema('tuple<float64 ' + _ARRIVAL + '>')
+
+_PUBLISH_PERIOD = 1.0
+
+
+class _QuantileSketch(object):
+    """Streaming quantile sketch with logarithmic buckets (DDSketch).
+
+    A value is counted in the bucket ``ceil(log(value) / log(gamma))``, quantiles are returned with a relative error of at most ``relative_accuracy``.
+    """
+    def __init__(self, relative_accuracy=0.01, min_value=1e-9):
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._min_value = min_value
+        self.clear()
+
+    def clear(self):
+        self._buckets = {}
+        self.count = 0
+
+    def add(self, value):
+        key = int(math.ceil(math.log(max(value, self._min_value)) / self._log_gamma))
+        self._buckets[key] = self._buckets.get(key, 0) + 1
+        self.count += 1
+
+    def quantile(self, q):
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self._buckets):
+            seen += self._buckets[key]
+            if seen > rank:
+                break
+        return 2 * self._gamma ** key / (self._gamma + 1)
+
+
+def _arrival(tuple_):
+    result = dict(tuple_) if isinstance(tuple_, dict) else {'string': tuple_}
+    result[_ARRIVAL] = time.time()
+    return result
+
+
+class _LatencyRecorder(object):
+    """Removes the arrival time of the output tuples and publishes quantiles of the latencies as custom metrics."""
+    def __init__(self, quantiles, relative_accuracy, window, output_attribute):
+        self._quantiles = quantiles
+        self._relative_accuracy = relative_accuracy
+        self._window = window
+        self._output_attribute = output_attribute
+
+    def __enter__(self):
+        self._sketch = _QuantileSketch(self._relative_accuracy)
+        self._metrics = [(q, streamsx.ec.CustomMetric(self, name='latencyP{0:g}Micros'.format(q * 100), kind='Gauge', description='{0:g}th percentile of the statement latency in microseconds'.format(q * 100))) for q in self._quantiles]
+        self._samples_metric = streamsx.ec.CustomMetric(self, name='nLatencySamples', kind='Gauge', description='Number of latencies in the sketch')
+        self._published = time.time()
+        self._cleared = self._published
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def __call__(self, tuple_):
+        now = time.time()
+        self._sketch.add(now - tuple_.pop(_ARRIVAL))
+        if now - self._published >= _PUBLISH_PERIOD:
+            self._publish()
+            self._published = now
+            if self._window is not None and now - self._cleared >= self._window:
+                self._sketch.clear()
+                self._cleared = now
+        return tuple_ if self._output_attribute is None else tuple_[self._output_attribute]
+
+    def _publish(self):
+        for q, metric in self._metrics:
+            metric.value = int(self._sketch.quantile(q) * 1000000)
+        self._samples_metric.value = self._sketch.count
+
+
+class JDBCLatencyTracker(streamsx.topology.composite.Map):
+    """
+    Composite map transformation measuring the end-to-end latency of a :py:class:`JDBCStatement`
+
+    Each input tuple is stamped with its arrival time before it is passed to the :attr:`statement`. The arrival time is passed through
+    the statement operator to its output tuples, where the latency is recorded in a streaming quantile sketch and the time stamp is removed.
+    The latency includes the time tuples wait in buffers of the statement, for example for the spill queue, the throttle or the batch.
+    A statement emitting several output tuples for one input tuple, for example a query, records one latency for each output tuple.
+
+    The quantiles of the latency are available as custom metrics ``latencyP<percentile>Micros``, for example ``latencyP99Micros``, updated every second.
+    The quantiles are computed with a relative error of at most :attr:`relative_accuracy`. Without :attr:`window` the quantiles cover all tuples since the job started.
+
+    Example measuring the latency of inserts::
+
+        import streamsx.database as db
+
+        insert = db.JDBCStatement(credentials, batch_size=100)
+        insert.sql = 'INSERT INTO SAMPLE_DEMO (ID, NAME, AGE) VALUES (?, ?, ?)'
+        insert.sql_params = 'ID, NAME, AGE'
+        res = sample_data.map(db.JDBCLatencyTracker(insert, window=60.0))
+
+    .. versionadded:: 1.7
+
+    Attributes
+    ----------
+    statement : JDBCStatement
+        The statement to measure.
+    options : kwargs
+        The additional optional parameters as variable keyword arguments.
+    """
+
+    def __init__(self, statement, **options):
+        self.statement = statement
+        self.quantiles = options.get('quantiles', [0.5, 0.95, 0.99])
+        self.relative_accuracy = options.get('relative_accuracy', 0.01)
+        self.window = options.get('window')
+
+    @property
+    def quantiles(self):
+        """
+            list: Quantiles published as custom metrics. The default value is ``[0.5, 0.95, 0.99]``.
+        """
+        return self._quantiles
+
+    @quantiles.setter
+    def quantiles(self, value):
+        self._quantiles = value
+
+    @property
+    def relative_accuracy(self):
+        """
+            float: Maximum relative error of the quantiles. The default value is 0.01.
+        """
+        return self._relative_accuracy
+
+    @relative_accuracy.setter
+    def relative_accuracy(self, value):
+        self._relative_accuracy = value
+
+    @property
+    def window(self):
+        """
+            float: Time in seconds after which the sketch is cleared, so that the quantiles follow changes of the latency.
+        """
+        return self._window
+
+    @window.setter
+    def window(self, value):
+        self._window = value
+
+    def populate(self, topology, stream, schema, name, **options):
+
+        if schema is None:
+            schema = stream.oport.schema
+        output_attribute = 'string' if schema == CommonSchema.String else None
+
+        statement = self.statement
+        if statement.sql_attribute is None and statement.sql is None and stream.oport.schema == CommonSchema.String:
+            statement = copy.copy(statement)
+            statement.sql_attribute = 'string'
+        stamped = stream.map(_arrival, schema=stream.oport.schema.extend(_ARRIVAL_SCHEMA), name='Arrival')
+        results = stamped.map(statement, schema=schema.extend(_ARRIVAL_SCHEMA), name=name)
+        recorder = _LatencyRecorder(self.quantiles, self.relative_accuracy, self.window, output_attribute)
+        return results.map(recorder, schema=schema, name='Latency')
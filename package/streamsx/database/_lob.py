@@ -0,0 +1,282 @@
+# coding=utf-8
+# Licensed Materials - Property of IBM
+# Copyright IBM Corp. 2020
+
+import streamsx.ec
+import streamsx.topology.composite
+from streamsx.database._database import JDBCStatement
+from streamsx.database._dbapi import _connect
+from streamsx.database._schema import _schema_attributes, _make_schema
+
+# attributes of the chunk tuples, upper case to match the column names of the chunk queries
+_OFFSET = 'LOB_OFFSET'
+_CHUNK = 'LOB_CHUNK'
+_LENGTH = 'LOB_LENGTH'
+
+
+class _LobWriter(object):
+    """Writes the large object of each tuple, given as value or as path of a file, into the column of the row with the key of the tuple.
+
+    A file is bound as file parameter of the ``UPDATE`` statement, the driver streams the file into the column without reading it into memory.
+    The length of the object written is queried in the same transaction, then the transaction is committed.
+    """
+    def __init__(self, credentials, update_sql, length_sql, key_attributes, lob_attribute, file_attribute):
+        self._credentials = credentials
+        self._update_sql = update_sql
+        self._length_sql = length_sql
+        self._key_attributes = key_attributes
+        self._lob_attribute = lob_attribute
+        self._file_attribute = file_attribute
+
+    def __enter__(self):
+        import ibm_db
+        self._ibm_db = ibm_db
+        self._connection = _connect(self._credentials)
+        self._update = ibm_db.prepare(self._connection.conn_handler, self._update_sql)
+        self._cursor = self._connection.cursor()
+        self._lobs_metric = streamsx.ec.CustomMetric(self, name='nLobsWritten', description='Number of large objects written')
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self._connection.rollback()
+        self._connection.close()
+
+    def __call__(self, tuple_):
+        ibm_db = self._ibm_db
+        if self._file_attribute is not None:
+            ibm_db.bind_param(self._update, 1, tuple_[self._file_attribute], ibm_db.PARAM_FILE)
+        else:
+            ibm_db.bind_param(self._update, 1, tuple_[self._lob_attribute], ibm_db.SQL_PARAM_INPUT)
+        key = tuple(tuple_[name] for name in self._key_attributes)
+        for number, value in enumerate(key, 2):
+            ibm_db.bind_param(self._update, number, value, ibm_db.SQL_PARAM_INPUT)
+        ibm_db.execute(self._update)
+        self._cursor.execute(self._length_sql, key)
+        row = self._cursor.fetchone()
+        self._connection.commit()
+        self._lobs_metric += 1
+        result = dict(zip(self._key_attributes, key))
+        result[_LENGTH] = row[0] if row is not None and row[0] is not None else 0
+        return result
+
+
+class _LobChunkRequests(object):
+    """Splits the length of the large object of each tuple into the positions and lengths of the chunks to query."""
+    def __init__(self, key_attributes, chunk_size):
+        self._key_attributes = key_attributes
+        self._chunk_size = chunk_size
+
+    def __call__(self, tuple_):
+        key = dict((name, tuple_[name]) for name in self._key_attributes)
+        return self._requests(key, tuple_[_LENGTH] or 0)
+
+    def _requests(self, key, length):
+        for offset in range(0, length, self._chunk_size):
+            request = dict(key)
+            request[_OFFSET] = offset
+            request[_LENGTH] = min(self._chunk_size, length - offset)
+            yield request
+
+
+class _LobComposite(streamsx.topology.composite.Map):
+    # common parameters of the large object composites
+
+    def __init__(self, credentials, table, column, key, **options):
+        self.credentials = credentials
+        self.table = table
+        self.column = column
+        self.key = key
+        self.lob_type = options.pop('lob_type', 'BLOB')
+        self.options = options
+
+    @property
+    def lob_type(self):
+        """
+            str: Type of the column, ``BLOB`` or ``CLOB``. The default value is ``BLOB``. The values of a ``BLOB`` column are ``blob`` values and the sizes are counted in bytes, the values of a ``CLOB`` column are ``rstring`` values and the sizes are counted in characters.
+        """
+        return self._lob_type
+
+    @lob_type.setter
+    def lob_type(self, value):
+        self._lob_type = value
+
+    def _key_attributes(self, stream):
+        key_names = [attr_name.strip() for attr_name in self.key.split(',')]
+        key_attributes = [attr for attr in _schema_attributes(stream.oport.schema) if attr[1] in key_names]
+        if len(key_attributes) != len(key_names):
+            raise ValueError("Parameter key must contain attributes of the input stream.")
+        return key_attributes
+
+    def _text(self):
+        if self.lob_type.upper() not in ('BLOB', 'CLOB'):
+            raise ValueError("Parameter lob_type must be BLOB or CLOB.")
+        return self.lob_type.upper() == 'CLOB'
+
+    def _where(self, key_attributes):
+        return ' WHERE ' + ' AND '.join(attr_name + ' = ?' for _, attr_name in key_attributes)
+
+    def _length_sql(self, text, key_attributes):
+        if text:
+            return 'SELECT CHARACTER_LENGTH(' + self.column + ', CODEUNITS32) AS ' + _LENGTH + ' FROM ' + self.table + self._where(key_attributes)
+        return 'SELECT LENGTH(' + self.column + ') AS ' + _LENGTH + ' FROM ' + self.table + self._where(key_attributes)
+
+
+class JDBCLobWriter(_LobComposite):
+    """
+    Composite map transformation writing large objects into a ``BLOB`` or ``CLOB`` column
+
+    The large object of each input tuple is given by the :attr:`lob_attribute` containing the value or by the :attr:`file_attribute` containing the path of a file.
+    The object is written into the column of the existing row with the key of the tuple with one ``UPDATE`` statement.
+    A file is bound as file parameter, the driver streams the file into the column without reading it into memory,
+    so the memory used does not depend on the size of the files. A value given with :attr:`lob_attribute` is part of the input tuple,
+    the whole value is held in memory.
+
+    The objects are written with the `ibm_db <https://pypi.org/project/ibm-db/>`_ package, the package is added to the application as a pip requirement.
+    Db2 credentials with a ``jdbcurl`` and the name of an application configuration created by :py:func:`configure_connection` are supported.
+    The files must be readable on the host of the operator. The number of objects written is available as the custom metric ``nLobsWritten``.
+
+    The output stream contains one tuple for each large object after it was committed, with the key attributes and the attribute ``LOB_LENGTH``, the length of the object written.
+
+    Example writing files into the ``BLOB`` column ``CONTENT`` of the table ``DOCUMENTS``::
+
+        import streamsx.database as db
+
+        writer = db.JDBCLobWriter(credentials, table='DOCUMENTS', column='CONTENT', key='DOC_ID', file_attribute='PATH')
+        res = documents.map(writer)
+
+    .. versionadded:: 1.7
+
+    Attributes
+    ----------
+    credentials : dict|str
+        The credentials of the IBM cloud Db2 warehouse service as dict or configured external connection of kind "Db2 Warehouse" (Cloud Pak for Data only) as dict or the name of the application configuration.
+    table : str
+        Name of the table.
+    column : str
+        Name of the large object column.
+    key : str
+        Comma separated names of the input stream attributes matching the key columns of the table.
+    options : kwargs
+        The additional optional parameters as variable keyword arguments.
+    """
+
+    def __init__(self, credentials, table, column, key, **options):
+        self.lob_attribute = options.pop('lob_attribute', None)
+        self.file_attribute = options.pop('file_attribute', None)
+        super(JDBCLobWriter, self).__init__(credentials, table, column, key, **options)
+
+    @property
+    def lob_attribute(self):
+        """
+            str: Name of the ``blob`` or ``rstring`` input stream attribute containing the large object. The whole value is held in memory, use :attr:`file_attribute` for objects larger than the memory available.
+        """
+        return self._lob_attribute
+
+    @lob_attribute.setter
+    def lob_attribute(self, value):
+        self._lob_attribute = value
+
+    @property
+    def file_attribute(self):
+        """
+            str: Name of the ``rstring`` input stream attribute containing the path of the file with the large object. The file is streamed into the column, files for ``CLOB`` columns are read in the code page of the database client.
+        """
+        return self._file_attribute
+
+    @file_attribute.setter
+    def file_attribute(self, value):
+        self._file_attribute = value
+
+    def populate(self, topology, stream, schema, name, **options):
+
+        if (self.lob_attribute is None) == (self.file_attribute is None):
+            raise ValueError("Either lob_attribute or file_attribute parameter must be set.")
+        if self.options:
+            raise ValueError("Options " + ', '.join(sorted(self.options)) + " are not supported by JDBCLobWriter.")
+        text = self._text()
+        key_attributes = self._key_attributes(stream)
+        if schema is None:
+            schema = _make_schema(key_attributes + [('int64', _LENGTH)])
+        credentials = self.credentials
+        if isinstance(credentials, dict) and credentials.get('class') == 'external':
+            credentials = {'jdbcurl': credentials.get('url'), 'username': credentials.get('username'), 'password': credentials.get('password')}
+
+        update_sql = 'UPDATE ' + self.table + ' SET ' + self.column + ' = ?' + self._where(key_attributes)
+        topology.add_pip_package('ibm_db')
+        writer = _LobWriter(credentials, update_sql, self._length_sql(text, key_attributes), [attr_name for _, attr_name in key_attributes], self.lob_attribute, self.file_attribute)
+        return stream.map(writer, schema=schema, name=name)
+
+
+class JDBCLobReader(_LobComposite):
+    """
+    Composite map transformation reading large objects in chunks from a ``BLOB`` or ``CLOB`` column
+
+    For each input tuple the length of the large object in the row with the key of the tuple is queried, then the object is queried in chunks of :attr:`chunk_size`,
+    each with a separate query. The memory used is bounded by the chunk size regardless of the size of the objects.
+
+    The output stream contains one tuple for each chunk with the key attributes, the attribute ``LOB_OFFSET`` with the position of the chunk
+    starting at 0 and the attribute ``LOB_CHUNK`` with the chunk of type ``blob`` for a ``BLOB`` column or ``rstring`` for a ``CLOB`` column.
+
+    Example reading the ``BLOB`` column ``CONTENT`` of the table ``DOCUMENTS``::
+
+        import streamsx.database as db
+
+        reader = db.JDBCLobReader(credentials, table='DOCUMENTS', column='CONTENT', key='DOC_ID')
+        chunks = document_ids.map(reader)
+
+    .. versionadded:: 1.7
+
+    Attributes
+    ----------
+    credentials : dict|str
+        The credentials of the IBM cloud Db2 warehouse service as dict or configured external connection of kind "Db2 Warehouse" (Cloud Pak for Data only) as dict or the name of the application configuration.
+    table : str
+        Name of the table.
+    column : str
+        Name of the large object column.
+    key : str
+        Comma separated names of the input stream attributes matching the key columns of the table.
+    options : kwargs
+        The additional optional parameters as variable keyword arguments, passed to the :py:class:`JDBCStatement` running the queries.
+    """
+
+    def __init__(self, credentials, table, column, key, **options):
+        self.chunk_size = options.pop('chunk_size', 1024 * 1024)
+        super(JDBCLobReader, self).__init__(credentials, table, column, key, **options)
+
+    @property
+    def chunk_size(self):
+        """
+            int: Size of a chunk in bytes or characters. The default value is 1 MB.
+        """
+        return self._chunk_size
+
+    @chunk_size.setter
+    def chunk_size(self, value):
+        self._chunk_size = value
+
+    def _statement(self, sql, sql_params):
+        statement = JDBCStatement(self.credentials, **self.options)
+        statement.sql = sql
+        statement.sql_params = sql_params
+        return statement
+
+    def populate(self, topology, stream, schema, name, **options):
+
+        text = self._text()
+        key_attributes = self._key_attributes(stream)
+        key_params = ', '.join(attr_name for _, attr_name in key_attributes)
+        chunk_type = 'rstring' if text else 'blob'
+        if schema is None:
+            schema = _make_schema(key_attributes + [('int64', _OFFSET), (chunk_type, _CHUNK)])
+
+        where = self._where(key_attributes)
+        if text:
+            chunk_sql = 'SELECT SUBSTRING(' + self.column + ', CAST(? AS INTEGER) + 1, CAST(? AS INTEGER), CODEUNITS32) AS ' + _CHUNK + ' FROM ' + self.table + where
+        else:
+            chunk_sql = 'SELECT SUBSTR(' + self.column + ', CAST(? AS INTEGER) + 1, CAST(? AS INTEGER)) AS ' + _CHUNK + ' FROM ' + self.table + where
+
+        lengths = stream.map(self._statement(self._length_sql(text, key_attributes), key_params), schema=_make_schema(key_attributes + [('int64', _LENGTH)]), name='LobLength')
+        requests = lengths.flat_map(_LobChunkRequests([attr_name for _, attr_name in key_attributes], self.chunk_size), name='LobChunks')
+        requests = requests.map(schema=_make_schema(key_attributes + [('int64', _OFFSET), ('int64', _LENGTH)]))
+        return requests.map(self._statement(chunk_sql, ', '.join([_OFFSET, _LENGTH, key_params])), schema=schema, name=name)
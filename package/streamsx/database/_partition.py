@@ -0,0 +1,22 @@
+# coding=utf-8
+# Licensed Materials - Property of IBM
+# Copyright IBM Corp. 2020
+
+import zlib
+
+
+def _key_bytes(tuple_, key_attributes):
+    return repr(tuple(tuple_[name] for name in key_attributes)).encode('utf-8')
+
+
+class _PartitionHash(object):
+    """Hash function of a parallel region returning the database partition of a tuple, the partition selects the channel."""
+    def __init__(self, key_attributes, partition_count, partition_function):
+        self._key_attributes = key_attributes
+        self._partition_count = partition_count
+        self._partition_function = partition_function
+
+    def __call__(self, tuple_):
+        if self._partition_function is not None:
+            return self._partition_function(tuple(tuple_[name] for name in self._key_attributes)) % self._partition_count
+        return zlib.crc32(_key_bytes(tuple_, self._key_attributes)) % self._partition_count
@@ -0,0 +1,268 @@
+# coding=utf-8
+# Licensed Materials - Property of IBM
+# Copyright IBM Corp. 2020
+
+import array
+import threading
+import uuid
+import streamsx.ec
+import streamsx.topology.composite
+from streamsx.topology.schema import StreamSchema
+from streamsx.spl.types import Timestamp
+from streamsx.database._database import JDBCStatement
+from streamsx.database._schema import _ARRAY_TYPECODES, _schema_attributes, _make_schema
+from streamsx.database._tagged import _tagged_union
+
+_REFERENCE_ROW = 1
+# attribute of the refresh requests with the change time after which rows are queried
+_SINCE = '__jdbc_since'
+_SINCE_SCHEMA = StreamSchema('tuple<timestamp ' + _SINCE + '>')
+
+
+class _ColumnTable(object):
+    """In-memory table with one array per column and a hash index on the key column.
+
+    Rows are never removed, an update of an existing key overwrites the row in place.
+    """
+    def __init__(self, key, columns):
+        self._key = key
+        self._names = [name for _, name in columns]
+        self._booleans = set(name for spl_type, name in columns if spl_type == 'boolean')
+        self._columns = {}
+        for spl_type, name in columns:
+            typecode = _ARRAY_TYPECODES.get(spl_type)
+            self._columns[name] = array.array(typecode) if typecode is not None else []
+        self._index = {}
+
+    def __len__(self):
+        return len(self._index)
+
+    def upsert(self, row):
+        idx = self._index.get(row[self._key])
+        if idx is None:
+            self._index[row[self._key]] = len(self._index)
+            for name in self._names:
+                self._columns[name].append(self._value(name, row.get(name)))
+        else:
+            for name in self._names:
+                self._columns[name][idx] = self._value(name, row.get(name))
+
+    def get(self, key):
+        idx = self._index.get(key)
+        if idx is None:
+            return None
+        row = {}
+        for name in self._names:
+            value = self._columns[name][idx]
+            row[name] = bool(value) if name in self._booleans else value
+        return row
+
+    def _value(self, name, value):
+        if value is None and isinstance(self._columns[name], array.array):
+            return 0
+        return value
+
+
+class _ChangeMark(object):
+    """Largest change time of the reference rows received."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = None
+
+    def advance(self, value):
+        with self._lock:
+            if value is not None and (self.value is None or value > self.value):
+                self.value = value
+
+
+_CHANGE_MARKS = {}
+_CHANGE_MARKS_LOCK = threading.Lock()
+
+def _change_mark(name):
+    # the refresh requests and the join share the mark, both must run in the same processing element
+    with _CHANGE_MARKS_LOCK:
+        if name not in _CHANGE_MARKS:
+            _CHANGE_MARKS[name] = _ChangeMark()
+        return _CHANGE_MARKS[name]
+
+
+class _RefreshRequests(object):
+    """Source emitting a request for the rows changed after the largest change time received every refresh period.
+
+    Before a row with a change time was received, the rows changed since the epoch are requested.
+    """
+    def __init__(self, name, refresh_period):
+        self._name = name
+        self._refresh_period = refresh_period
+
+    def __call__(self):
+        mark = _change_mark(self._name)
+        while not streamsx.ec.shutdown().wait(self._refresh_period):
+            since = mark.value
+            yield {_SINCE: since if since is not None else Timestamp(0, 0)}
+
+
+class _ReferenceJoin(object):
+    """Maintains the reference table from tagged reference rows and enriches tagged data tuples."""
+    def __init__(self, key, lookup_key, columns, change_column=None, name=None):
+        self._key = key
+        self._lookup_key = lookup_key
+        self._columns = columns
+        self._change_column = change_column
+        self._name = name
+        self._table = _ColumnTable(key, columns)
+
+    def __enter__(self):
+        self._change_mark = _change_mark(self._name) if self._change_column is not None else None
+        self._rows_metric = streamsx.ec.CustomMetric(self, name='nReferenceRows', kind='Gauge', description='Number of rows in the reference table')
+        self._misses_metric = streamsx.ec.CustomMetric(self, name='nLookupMisses', description='Number of tuples without a matching reference row')
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def __call__(self, tagged):
+        tag, tuple_ = tagged
+        if tag == _REFERENCE_ROW:
+            self._table.upsert(tuple_)
+            if self._change_mark is not None:
+                self._change_mark.advance(tuple_[self._change_column])
+            self._rows_metric.value = len(self._table)
+            return None
+        row = self._table.get(tuple_[self._lookup_key])
+        if row is None:
+            self._misses_metric += 1
+            return tuple_
+        result = dict(tuple_)
+        result.update(row)
+        return result
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('_rows_metric', None)
+        state.pop('_misses_metric', None)
+        state.pop('_change_mark', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+
+class JDBCReferenceTable(streamsx.topology.composite.Map):
+    """
+    Composite map transformation that joins a stream with a reference table held in memory
+
+    The whole table is loaded with a single query when the job starts and is held in an indexed in-memory table
+    using one array per column. Each input tuple is enriched with the row matching its :attr:`lookup_key` attribute,
+    the lookup is a local hash lookup without a database round trip.
+
+    When :attr:`change_column` and :attr:`refresh_period` are set, the table is refreshed incrementally: every refresh period
+    the rows with a change time after the largest change time received so far are queried and merged into the in-memory table by key,
+    so a delayed refresh does not miss changes and the time of the Streams hosts is not compared with the time of the database.
+    The change column is a ``TIMESTAMP`` column of the table, for example a Db2 ``ROW CHANGE TIMESTAMP`` column.
+    Rows deleted from the database table are not removed from the in-memory table.
+
+    Tuples without a matching row, for example tuples received before the initial load completed, are emitted with default values for the reference attributes.
+    The number of reference rows and of lookups without match are available as the custom metrics ``nReferenceRows`` and ``nLookupMisses``.
+
+    Example enriching a stream of orders with the customer name from the ``CUSTOMERS`` table::
+
+        import streamsx.database as db
+
+        customer_schema = StreamSchema('tuple<int64 CUSTOMER_ID, rstring NAME>')
+        ref = db.JDBCReferenceTable(credentials, table='CUSTOMERS', key='CUSTOMER_ID', reference_schema=customer_schema)
+        ref.change_column = 'LAST_UPDATE'
+        ref.refresh_period = 300.0
+        enriched = orders.map(ref)
+
+    .. versionadded:: 1.7
+
+    Attributes
+    ----------
+    credentials : dict|str
+        The credentials of the IBM cloud Db2 warehouse service as dict or configured external connection of kind "Db2 Warehouse" (Cloud Pak for Data only) as dict or the name of the application configuration.
+    table : str
+        Name of the reference table.
+    key : str
+        Name of the key column of the reference table.
+    reference_schema : StreamSchema
+        Schema of the reference rows, each attribute maps to a column of the table using the same name.
+    options : kwargs
+        The additional optional parameters as variable keyword arguments, passed to the :py:class:`JDBCStatement` loading the table.
+    """
+
+    def __init__(self, credentials, table, key, reference_schema, **options):
+        self.credentials = credentials
+        self.table = table
+        self.key = key
+        self.reference_schema = reference_schema
+        self.lookup_key = options.pop('lookup_key', None)
+        self.change_column = options.pop('change_column', None)
+        self.refresh_period = options.pop('refresh_period', None)
+        self.options = options
+
+    @property
+    def lookup_key(self):
+        """
+            str: Name of the input stream attribute matched against the :attr:`key` column. Defaults to the name of the key column.
+        """
+        return self._lookup_key
+
+    @lookup_key.setter
+    def lookup_key(self, value):
+        self._lookup_key = value
+
+    @property
+    def change_column(self):
+        """
+            str: Name of the ``TIMESTAMP`` column containing the time of the last change of a row. Required for the incremental refresh, the column is queried in addition to the :attr:`reference_schema` columns.
+        """
+        return self._change_column
+
+    @change_column.setter
+    def change_column(self, value):
+        self._change_column = value
+
+    @property
+    def refresh_period(self):
+        """
+            float: Period in seconds of the incremental refresh. The table is loaded once only, if not set.
+        """
+        return self._refresh_period
+
+    @refresh_period.setter
+    def refresh_period(self, value):
+        self._refresh_period = value
+
+    def populate(self, topology, stream, schema, name, **options):
+
+        if (self.change_column is None) != (self.refresh_period is None):
+            raise ValueError("Parameters change_column and refresh_period must be set both for the incremental refresh.")
+
+        columns = _schema_attributes(self.reference_schema)
+        lookup_key = self.key if self.lookup_key is None else self.lookup_key
+        if schema is None:
+            input_attributes = _schema_attributes(stream.oport.schema)
+            input_names = [attr_name for _, attr_name in input_attributes]
+            schema = _make_schema(input_attributes + [attr for attr in columns if attr[1] not in input_names])
+
+        row_schema = self.reference_schema
+        if self.change_column is not None and self.change_column not in [attr_name for _, attr_name in columns]:
+            row_schema = _make_schema(columns + [('timestamp', self.change_column)])
+        select = 'SELECT ' + ', '.join(attr_name for _, attr_name in _schema_attributes(row_schema)) + ' FROM ' + self.table
+
+        load = topology.source([select], name='LoadQuery').as_string()
+        rows = load.map(JDBCStatement(self.credentials, **self.options), schema=row_schema, name='ReferenceRows')
+        mark_name = None
+        if self.refresh_period is not None:
+            mark_name = 'reference_' + uuid.uuid4().hex
+            requests = topology.source(_RefreshRequests(mark_name, self.refresh_period), name='RefreshRequests')
+            refresh = JDBCStatement(self.credentials, **self.options)
+            refresh.sql = select + ' WHERE ' + self.change_column + ' > ?'
+            refresh.sql_attribute = None
+            refresh.sql_params = _SINCE
+            rows = rows.union({requests.map(schema=_SINCE_SCHEMA).map(refresh, schema=row_schema, name='ChangedRows')})
+
+        joined = _tagged_union(self, stream, rows, _REFERENCE_ROW).map(_ReferenceJoin(self.key, lookup_key, columns, self.change_column, mark_name), schema=schema, name=name)
+        if self.refresh_period is not None:
+            requests.colocate(joined)
+        return joined
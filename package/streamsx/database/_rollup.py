@@ -0,0 +1,303 @@
+# coding=utf-8
+# Licensed Materials - Property of IBM
+# Copyright IBM Corp. 2020
+
+import re
+import time
+import streamsx.ec
+import streamsx.topology.composite
+from streamsx.topology.schema import StreamSchema
+from streamsx.spl.types import Timestamp
+from streamsx.database._database import JDBCStatement
+from streamsx.database._schema import _schema_attributes, _make_schema
+from streamsx.database._tagged import _tagged_with_ticks, _TICK
+
+_FUNCTIONS = ('SUM', 'COUNT', 'MIN', 'MAX')
+_AGGREGATE = re.compile(r'^(SUM|COUNT|MIN|MAX)\s*\(\s*(\*|\w+)\s*\)\s+AS\s+(\w+)$', re.IGNORECASE)
+# attribute marking the last row of a flush, a punctuation follows the row
+_LAST = '__rollup_last'
+
+
+def _parse_aggregates(aggregates):
+    """Returns the list of (function, input attribute name, column name) triples of aggregates like ``SUM(VALUE) AS TOTAL, COUNT(*) AS N``."""
+    result = []
+    for aggregate in aggregates.split(','):
+        match = _AGGREGATE.match(aggregate.strip())
+        if match is None:
+            raise ValueError('Invalid aggregate: ' + aggregate.strip())
+        function, attr_name, column = match.group(1).upper(), match.group(2), match.group(3)
+        if attr_name == '*':
+            if function != 'COUNT':
+                raise ValueError('Invalid aggregate: ' + aggregate.strip())
+            attr_name = None
+        result.append((function, attr_name, column))
+    return result
+
+
+def _time(value):
+    # seconds since the epoch of a timestamp or of a number
+    return value.time() if hasattr(value, 'time') else float(value)
+
+
+class _Rollup(object):
+    """Aggregates tuples by group key and time bucket and returns one row per group when the bucket is closed.
+
+    A bucket is closed when the clock passes its end, the clock is the time of the tuples with ``time_attribute`` or the system time.
+    With ``time_attribute`` the clock is advanced by the time passed since the last tuple if no tuple was received for the bucket period.
+    Tuples of closed buckets are dropped, or returned as rows of their own with ``merge``.
+    The last row of the rows returned at a time has the attribute ``__rollup_last`` set.
+    """
+    def __init__(self, key_attributes, aggregates, bucket_seconds, time_attribute, bucket_attribute, merge):
+        self._key_attributes = key_attributes
+        self._aggregates = aggregates
+        self._bucket_seconds = bucket_seconds
+        self._time_attribute = time_attribute
+        self._bucket_attribute = bucket_attribute
+        self._merge = merge
+
+    def __enter__(self):
+        self._buckets = {}
+        self._clock = 0.0
+        self._received_clock = 0.0
+        self._received = time.time()
+        self._tuples_metric = streamsx.ec.CustomMetric(self, name='nTuplesAggregated', description='Number of tuples aggregated')
+        self._rows_metric = streamsx.ec.CustomMetric(self, name='nRollupRows', description='Number of aggregated rows')
+        self._late_metric = streamsx.ec.CustomMetric(self, name='nLateTuplesDropped', description='Number of tuples dropped because their bucket was written')
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def __call__(self, tagged):
+        tag, tuple_ = tagged
+        now = time.time()
+        if tag == _TICK:
+            if self._time_attribute is None:
+                self._clock = now
+            elif now - self._received >= self._bucket_seconds:
+                # the clock of the tuple times continues with the idle time
+                self._clock = max(self._clock, self._received_clock + now - self._received)
+            return self._flush()
+        timestamp = now if self._time_attribute is None else _time(tuple_[self._time_attribute])
+        bucket = timestamp - timestamp % self._bucket_seconds
+        if bucket + self._bucket_seconds <= self._clock and not self._merge:
+            # the row of the bucket is already inserted
+            self._late_metric += 1
+            return []
+        self._received = now
+        self._clock = max(self._clock, timestamp)
+        self._received_clock = self._clock
+        self._add(tuple_, bucket)
+        return self._flush()
+
+    def _add(self, tuple_, bucket):
+        groups = self._buckets.setdefault(bucket, {})
+        key = tuple(tuple_[name] for name in self._key_attributes)
+        values = groups.get(key)
+        if values is None:
+            values = [0 if function == 'COUNT' else None for function, _, _ in self._aggregates]
+            groups[key] = values
+        for i, (function, attr_name, _) in enumerate(self._aggregates):
+            value = tuple_[attr_name] if attr_name is not None else True
+            if value is None:
+                continue
+            if function == 'COUNT':
+                values[i] += 1
+            elif values[i] is None:
+                values[i] = value
+            elif function == 'SUM':
+                values[i] += value
+            elif function == 'MIN':
+                values[i] = min(values[i], value)
+            else:
+                values[i] = max(values[i], value)
+        self._tuples_metric += 1
+
+    def _flush(self):
+        closed = sorted(bucket for bucket in self._buckets if bucket + self._bucket_seconds <= self._clock)
+        rows = []
+        for bucket in closed:
+            start = Timestamp.from_time(bucket)
+            for key, values in self._buckets.pop(bucket).items():
+                row = dict(zip(self._key_attributes, key))
+                row[self._bucket_attribute] = start
+                for (_, _, column), value in zip(self._aggregates, values):
+                    row[column] = value
+                row[_LAST] = False
+                rows.append(row)
+        if rows:
+            rows[-1][_LAST] = True
+            self._rows_metric += len(rows)
+        return rows
+
+
+def _is_last_row(tuple_):
+    return tuple_[_LAST]
+
+
+# Db2 types of the parameter markers of the rollup MERGE statement
+_DB2_CASTS = {'int8': 'SMALLINT', 'int16': 'SMALLINT', 'int32': 'INTEGER', 'int64': 'BIGINT', 'uint8': 'SMALLINT', 'uint16': 'INTEGER', 'uint32': 'BIGINT',
+    'float32': 'REAL', 'float64': 'DOUBLE', 'decimal32': 'DECFLOAT(16)', 'decimal64': 'DECFLOAT(16)', 'decimal128': 'DECFLOAT(34)',
+    'boolean': 'BOOLEAN', 'timestamp': 'TIMESTAMP', 'rstring': 'VARCHAR(32672)', 'ustring': 'VARGRAPHIC(16336)'}
+
+
+class JDBCRollup(streamsx.topology.composite.Map):
+    """
+    Composite map transformation aggregating tuples by group and time bucket before writing them to a table
+
+    The input tuples are aggregated in memory by the :attr:`key` attributes and by time buckets of :attr:`bucket_seconds`,
+    with the :attr:`aggregates` ``SUM``, ``COUNT``, ``MIN`` and ``MAX``. When a bucket is closed one row is written for each group of the bucket,
+    so the number of rows written is reduced by the number of tuples per group and bucket.
+    The rows contain the key attributes, the start of the bucket in the timestamp column :attr:`bucket_attribute` and one column for each aggregate.
+
+    A bucket is closed when the time of the tuples given by :attr:`time_attribute`, or the system time, passes its end.
+    With :attr:`time_attribute`, when no tuple was received for :attr:`bucket_seconds`, the time of the last tuple is advanced by the time passed since it was received,
+    which closes the bucket of the last tuple.
+    Open buckets are not written when the job is stopped.
+
+    The rows are inserted with a :py:class:`JDBCStatement` with ``INSERT``, or with ``MERGE`` when :attr:`merge` is set, which adds the aggregates
+    of a row to an existing row with the same key and bucket. With ``INSERT`` tuples arriving after their bucket was written are dropped
+    and counted in the custom metric ``nLateTuplesDropped``, with ``MERGE`` they are written as rows of their own and added to the existing rows.
+    The rows closed at a time are followed by a window punctuation. The statement sends them in one batch and commits them on the punctuation, the options
+    ``batch_on_punct`` and ``commit_on_punct`` are set and ``batch_size`` defaults to 1000.
+    The number of tuples aggregated and of rows written are available as the custom metrics ``nTuplesAggregated`` and ``nRollupRows``.
+
+    Example writing the sum and the count of the metric values per host and minute::
+
+        import streamsx.database as db
+
+        rollup = db.JDBCRollup(credentials, table='METRICS_1M', key='HOST', aggregates='SUM(VALUE) AS TOTAL, COUNT(*) AS SAMPLES', bucket_seconds=60)
+        res = metrics.map(rollup)
+
+    .. versionadded:: 1.7
+
+    Attributes
+    ----------
+    credentials : dict|str
+        The credentials of the IBM cloud Db2 warehouse service as dict or configured external connection of kind "Db2 Warehouse" (Cloud Pak for Data only) as dict or the name of the application configuration.
+    table : str
+        Name of the table.
+    key : str
+        Comma separated names of the input stream attributes to group by, matching the key columns of the table.
+    aggregates : str
+        Comma separated aggregates like ``SUM(VALUE) AS TOTAL``, the function is one of ``SUM``, ``COUNT``, ``MIN`` and ``MAX`` applied to an input stream attribute or ``COUNT(*)``,
+        the name after ``AS`` is the table column.
+    options : kwargs
+        The additional optional parameters as variable keyword arguments, passed to the :py:class:`JDBCStatement` writing the rows.
+    """
+
+    def __init__(self, credentials, table, key, aggregates, **options):
+        self.credentials = credentials
+        self.table = table
+        self.key = key
+        self.aggregates = aggregates
+        self.bucket_seconds = options.pop('bucket_seconds', 60.0)
+        self.time_attribute = options.pop('time_attribute', None)
+        self.bucket_attribute = options.pop('bucket_attribute', 'BUCKET')
+        self.merge = options.pop('merge', False)
+        self.options = options
+
+    @property
+    def bucket_seconds(self):
+        """
+            float: Length of the time buckets in seconds. The default value is 60 seconds.
+        """
+        return self._bucket_seconds
+
+    @bucket_seconds.setter
+    def bucket_seconds(self, value):
+        self._bucket_seconds = value
+
+    @property
+    def time_attribute(self):
+        """
+            str: Name of the input stream attribute of type ``timestamp`` or with the seconds since the epoch determining the bucket of a tuple. The system time is used per default.
+        """
+        return self._time_attribute
+
+    @time_attribute.setter
+    def time_attribute(self, value):
+        self._time_attribute = value
+
+    @property
+    def bucket_attribute(self):
+        """
+            str: Name of the timestamp column with the start of the bucket. The default value is ``BUCKET``.
+        """
+        return self._bucket_attribute
+
+    @bucket_attribute.setter
+    def bucket_attribute(self, value):
+        self._bucket_attribute = value
+
+    @property
+    def merge(self):
+        """
+            bool: Set to ``True`` to merge the rows into the table, the aggregates are added to the row with the same key and bucket if it exists. Rows are inserted per default.
+        """
+        return self._merge
+
+    @merge.setter
+    def merge(self, value):
+        self._merge = value
+
+    def _merge_sql(self, columns, types, key_columns, aggregates):
+        source = ', '.join('CAST(? AS ' + _DB2_CASTS[types[column]] + ')' for column in columns)
+        on = ' AND '.join('T.' + column + ' = S.' + column for column in key_columns)
+        combine = {'SUM': 'T.{0} + S.{0}', 'COUNT': 'T.{0} + S.{0}', 'MIN': 'LEAST(T.{0}, S.{0})', 'MAX': 'GREATEST(T.{0}, S.{0})'}
+        update = ', '.join('T.' + column + ' = COALESCE(' + combine[function].format(column) + ', T.' + column + ', S.' + column + ')' for function, _, column in aggregates)
+        return ('MERGE INTO ' + self.table + ' AS T USING (VALUES (' + source + ')) AS S (' + ', '.join(columns) + ') ON ' + on +
+            ' WHEN MATCHED THEN UPDATE SET ' + update +
+            ' WHEN NOT MATCHED THEN INSERT (' + ', '.join(columns) + ') VALUES (' + ', '.join('S.' + column for column in columns) + ')')
+
+    def populate(self, topology, stream, schema, name, **options):
+
+        key_attributes = [attr_name.strip() for attr_name in self.key.split(',')]
+        aggregates = _parse_aggregates(self.aggregates)
+        input_types = dict((attr_name, attr_type) for attr_type, attr_name in _schema_attributes(stream.oport.schema))
+        attributes = []
+        for attr_name in key_attributes:
+            if attr_name not in input_types:
+                raise ValueError("Parameter key contains the attribute " + attr_name + " that is not an attribute of the input stream.")
+            attributes.append((input_types[attr_name], attr_name))
+        attributes.append(('timestamp', self.bucket_attribute))
+        for function, attr_name, column in aggregates:
+            if attr_name is not None and attr_name not in input_types:
+                raise ValueError("Parameter aggregates contains the attribute " + attr_name + " that is not an attribute of the input stream.")
+            if function == 'COUNT':
+                attributes.append(('int64', column))
+            elif function == 'SUM':
+                attr_type = input_types[attr_name]
+                if attr_type.startswith('float'):
+                    attributes.append(('float64', column))
+                elif attr_type.startswith('decimal'):
+                    attributes.append(('decimal128', column))
+                elif attr_type.startswith('int') or attr_type.startswith('uint'):
+                    attributes.append(('int64', column))
+                else:
+                    raise ValueError("The SUM aggregate of the attribute " + attr_name + " requires a numeric attribute.")
+            else:
+                attributes.append((input_types[attr_name], column))
+        row_schema = _make_schema(attributes)
+        if schema is None:
+            schema = row_schema
+
+        columns = [attr_name for _, attr_name in attributes]
+        if self.merge:
+            sql = self._merge_sql(columns, dict((attr_name, attr_type) for attr_type, attr_name in attributes), key_attributes + [self.bucket_attribute], aggregates)
+        else:
+            sql = 'INSERT INTO ' + self.table + ' (' + ', '.join(columns) + ') VALUES (' + ', '.join('?' for _ in columns) + ')'
+
+        tagged = _tagged_with_ticks(self, stream, max(0.1, min(1.0, self.bucket_seconds / 10.0)))
+        rollup = _Rollup(key_attributes, aggregates, self.bucket_seconds, self.time_attribute, self.bucket_attribute, self.merge)
+        rows = tagged.flat_map(rollup, name='Rollup').map(schema=row_schema.extend(StreamSchema('tuple<boolean ' + _LAST + '>')))
+        rows = rows.punctor(_is_last_row, before=False)
+
+        statement = JDBCStatement(self.credentials, **self.options)
+        statement.sql = sql
+        statement.sql_params = ', '.join(columns)
+        statement.transaction_size = None
+        statement.commit_on_punct = True
+        statement.batch_on_punct = True
+        if statement.batch_size is None:
+            statement.batch_size = 1000
+        return rows.map(statement, schema=schema, name=name)
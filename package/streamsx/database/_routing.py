@@ -0,0 +1,159 @@
+# coding=utf-8
+# Licensed Materials - Property of IBM
+# Copyright IBM Corp. 2020
+
+import re
+import streamsx.ec
+import streamsx.topology.composite
+from streamsx.topology.schema import CommonSchema
+from streamsx.database._database import JDBCStatement
+
+_PRIMARY = 0
+
+# leading white space, comments and parentheses skipped before the first keyword of a statement
+_PREFIX = re.compile(r'(?:\s+|--[^\n]*(?:\n|$)|/\*.*?\*/|\()*', re.DOTALL)
+_READ_KEYWORD = re.compile(r'(?:SELECT|WITH|VALUES)\b', re.IGNORECASE)
+# queries that lock rows or change data must run on the primary database
+_WRITE_CLAUSES = ('FOR UPDATE', 'FINAL TABLE', 'NEW TABLE', 'OLD TABLE')
+
+
+def _is_read(sql):
+    """Returns ``True`` if the statement is a query that can run on a replica."""
+    if not _READ_KEYWORD.match(sql, _PREFIX.match(sql).end()):
+        return False
+    upper = sql.upper()
+    return not any(clause in upper for clause in _WRITE_CLAUSES)
+
+
+class _StatementRouter(object):
+    """Split function routing writes to the primary (port 0) and queries round-robin to the replicas (ports 1..n)."""
+    def __init__(self, sql_attribute, replicas):
+        self._sql_attribute = sql_attribute
+        self._replicas = replicas
+        self._next = 0
+
+    def __enter__(self):
+        self._reads_metric = streamsx.ec.CustomMetric(self, name='nReadStatements', description='Number of statements routed to the replicas')
+        self._writes_metric = streamsx.ec.CustomMetric(self, name='nWriteStatements', description='Number of statements routed to the primary')
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def __call__(self, tuple_):
+        sql = tuple_ if isinstance(tuple_, str) else tuple_[self._sql_attribute]
+        if not _is_read(sql):
+            self._writes_metric += 1
+            return _PRIMARY
+        self._reads_metric += 1
+        self._next = (self._next + 1) % self._replicas
+        return 1 + self._next
+
+
+class _RoundRobin(object):
+    """Split function distributing the tuples round-robin."""
+    def __init__(self):
+        self._next = 0
+
+    def __call__(self, tuple_):
+        self._next += 1
+        return self._next
+
+
+class JDBCReadWriteSplit(streamsx.topology.composite.Map):
+    """
+    Composite map transformation routing queries to replica databases and all other statements to the primary database
+
+    A statement is a query when it starts with ``SELECT``, ``WITH`` or ``VALUES`` and does not lock or change rows
+    (``FOR UPDATE``, ``FINAL TABLE``, ``NEW TABLE`` or ``OLD TABLE``). Queries are distributed round-robin across the replicas,
+    taking the read load off the primary database. All other statements are run on the primary database.
+
+    A statement given with :attr:`sql` is classified when the topology is built. Statements contained in the :attr:`sql_attribute`
+    of the input tuples are classified for each tuple by their first keyword. The number of statements routed to the replicas and to the primary
+    are available as the custom metrics ``nReadStatements`` and ``nWriteStatements``.
+
+    Replicas may lag behind the primary, queries reading rows just written by the application may not see them.
+
+    Example running the statements of a stream on a primary database and two replicas::
+
+        import streamsx.database as db
+
+        split = db.JDBCReadWriteSplit(primary_credentials, [replica_credentials_1, replica_credentials_2])
+        res = statements.map(split, schema=result_schema)
+
+    .. versionadded:: 1.7
+
+    Attributes
+    ----------
+    primary : dict|str
+        The credentials of the primary database as dict or the name of the application configuration.
+    replicas : list
+        The credentials of the replica databases, each entry is a dict or the name of an application configuration.
+    options : kwargs
+        The additional optional parameters as variable keyword arguments, passed to the :py:class:`JDBCStatement` of each database.
+    """
+
+    def __init__(self, primary, replicas, **options):
+        self.primary = primary
+        self.replicas = replicas
+        self.sql = options.pop('sql', None)
+        self.sql_attribute = options.pop('sql_attribute', None)
+        self.options = options
+
+    @property
+    def sql(self):
+        """
+            str: String containing the SQL statement, classified when the topology is built.
+        """
+        return self._sql
+
+    @sql.setter
+    def sql(self, value):
+        self._sql = value
+
+    @property
+    def sql_attribute(self):
+        """
+            str: Name of the input stream attribute containing the SQL statement, classified for each tuple. Not required for input streams of type ``CommonSchema.String``.
+        """
+        return self._sql_attribute
+
+    @sql_attribute.setter
+    def sql_attribute(self, value):
+        self._sql_attribute = value
+
+    def _statement(self, credentials):
+        statement = JDBCStatement(credentials, **self.options)
+        statement.sql = self.sql
+        statement.sql_attribute = self.sql_attribute
+        return statement
+
+    def populate(self, topology, stream, schema, name, **options):
+
+        if not self.replicas:
+            raise ValueError("Parameter replicas must contain the credentials of at least one replica.")
+        sql_attribute = self.sql_attribute
+        if self.sql is None and sql_attribute is None:
+            if stream.oport.schema == CommonSchema.String:
+                sql_attribute = 'string'
+            else:
+                raise ValueError("Either sql_attribute or sql parameter must be set.")
+        if schema is None:
+            schema = stream.oport.schema
+
+        replica_names = ['Replica' + str(index) for index in range(len(self.replicas))]
+        if self.sql is not None:
+            if not _is_read(self.sql):
+                return stream.map(self._statement(self.primary), schema=schema, name=name)
+            names = replica_names
+            streams = stream.split(len(self.replicas), _RoundRobin(), names=names, name=name)
+            credentials = self.replicas
+        else:
+            names = ['Primary'] + replica_names
+            streams = stream.split(len(names), _StatementRouter(sql_attribute, len(self.replicas)), names=names, name=name)
+            credentials = [self.primary] + list(self.replicas)
+
+        results = [s.map(self._statement(c), schema=schema, name=n) for s, c, n in zip(streams, credentials, names)]
+        if len(results) == 1:
+            return results[0]
+        self.group = False # union markers can not be grouped visually
+        return results[0].union(set(results[1:]))
@@ -0,0 +1,47 @@
+# coding=utf-8
+# Licensed Materials - Property of IBM
+# Copyright IBM Corp. 2020
+
+from streamsx.topology.schema import CommonSchema, StreamSchema
+
+# array type codes of the SPL types that are stored in compact arrays,
+# all other types are stored in lists
+_ARRAY_TYPECODES = {
+    'boolean': 'b',
+    'int8': 'b',
+    'int16': 'h',
+    'int32': 'i',
+    'int64': 'q',
+    'uint8': 'B',
+    'uint16': 'H',
+    'uint32': 'I',
+    'uint64': 'Q',
+    'float32': 'f',
+    'float64': 'd',
+}
+
+
+def _schema_attributes(schema):
+    # returns the list of (SPL type, attribute name) pairs of a structured schema
+    if isinstance(schema, CommonSchema):
+        schema = schema.value
+    if schema._spl_type:
+        raise TypeError(schema)
+    attributes = []
+    depth = 0
+    start = len('tuple<')
+    body = schema.schema()
+    for i in range(start, len(body)):
+        if body[i] in '<[':
+            depth += 1
+        elif body[i] in '>]' and depth > 0:
+            depth -= 1
+        elif body[i] in ',>' and depth == 0:
+            attr_type, attr_name = body[start:i].strip().rsplit(None, 1)
+            attributes.append((attr_type.strip(), attr_name))
+            start = i + 1
+    return attributes
+
+
+def _make_schema(attributes):
+    return StreamSchema('tuple<' + ', '.join(t + ' ' + n for t, n in attributes) + '>')
@@ -0,0 +1,193 @@
+# coding=utf-8
+# Licensed Materials - Property of IBM
+# Copyright IBM Corp. 2020
+
+import bisect
+import hashlib
+import zlib
+import streamsx.ec
+import streamsx.topology.composite
+from streamsx.database._database import JDBCStatement
+from streamsx.database._partition import _key_bytes
+
+
+def _hash64(data):
+    return int.from_bytes(hashlib.md5(data).digest()[:8], 'little')
+
+
+class _HashRing(object):
+    """Consistent hash ring, each shard is placed on the ring with a number of virtual nodes derived from its name.
+
+    Adding a shard moves only the keys of the ring segments taken over by the new shard.
+    """
+    def __init__(self, shard_names, virtual_nodes):
+        points = []
+        for index, shard_name in enumerate(shard_names):
+            for node in range(virtual_nodes):
+                points.append((_hash64('{0}#{1}'.format(shard_name, node).encode('utf-8')), index))
+        points.sort()
+        self._points = [point for point, _ in points]
+        self._shards = [index for _, index in points]
+
+    def shard(self, key):
+        pos = bisect.bisect(self._points, _hash64(key))
+        return self._shards[pos % len(self._points)]
+
+
+class _ShardRouter(object):
+    """Split function returning the shard of a tuple by a stable hash of its key attributes and reporting the shard skew."""
+    def __init__(self, key_attributes, shard_names, virtual_nodes):
+        self._key_attributes = key_attributes
+        self._shard_names = shard_names
+        self._ring = _HashRing(shard_names, virtual_nodes) if virtual_nodes else None
+
+    def __enter__(self):
+        self._counts = [0] * len(self._shard_names)
+        self._shard_metrics = [streamsx.ec.CustomMetric(self, name='nTuplesShard_' + str(shard_name), description='Number of tuples routed to the shard ' + str(shard_name)) for shard_name in self._shard_names]
+        self._skew_metric = streamsx.ec.CustomMetric(self, name='shardSkewPercent', kind='Gauge', description='Percentage the number of tuples of the largest shard exceeds the average')
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def shard(self, tuple_):
+        key = _key_bytes(tuple_, self._key_attributes)
+        if self._ring is not None:
+            return self._ring.shard(key)
+        return zlib.crc32(key) % len(self._shard_names)
+
+    def __call__(self, tuple_):
+        index = self.shard(tuple_)
+        self._counts[index] += 1
+        self._shard_metrics[index] += 1
+        mean = sum(self._counts) / len(self._counts)
+        self._skew_metric.value = int((max(self._counts) - mean) * 100 / mean)
+        return index
+
+
+class JDBCShardedStatement(streamsx.topology.composite.Map):
+    """
+    Composite map transformation for JDBC statements on data sharded across multiple databases
+
+    Each database is given by an entry of the :attr:`credentials` list and is accessed with its own :py:class:`JDBCStatement`.
+    Each tuple is routed to one shard by a stable hash of its :attr:`key` attributes, so the tuples with the same key are always written to the same database
+    and the statements of the shards run concurrently.
+
+    Per default the shard is the hash value modulo the number of shards. With :attr:`consistent_hashing` the shards are placed on a consistent hash ring
+    using :attr:`virtual_nodes` points per shard derived from the :attr:`shard_names`. Adding a shard then moves only the keys taken over by the new shard
+    instead of nearly all keys.
+
+    The number of tuples routed to each shard and the skew of the shards are available as the custom metrics ``nTuplesShard_<shard name>``
+    and ``shardSkewPercent``, the percentage the number of tuples of the largest shard exceeds the average.
+
+    Example inserting into three databases with the key ``ID``::
+
+        import streamsx.database as db
+
+        sharded = db.JDBCShardedStatement([credentials_1, credentials_2, credentials_3], key='ID', consistent_hashing=True)
+        sharded.sql = 'INSERT INTO SAMPLE_DEMO (ID, NAME, AGE) VALUES (? , ?, ?)'
+        sharded.sql_params = 'ID, NAME, AGE'
+        res = sample_data.map(sharded)
+
+    .. versionadded:: 1.7
+
+    Attributes
+    ----------
+    credentials : list
+        The credentials of the databases of the shards, each entry is a dict or the name of an application configuration as for the :py:class:`JDBCStatement`.
+    key : str
+        Comma separated names of the input stream attributes used as shard key.
+    options : kwargs
+        The additional optional parameters as variable keyword arguments, passed to the :py:class:`JDBCStatement` of each shard.
+    """
+
+    def __init__(self, credentials, key, **options):
+        self.credentials = credentials
+        self.key = key
+        self.shard_names = options.pop('shard_names', None)
+        self.consistent_hashing = options.pop('consistent_hashing', False)
+        self.virtual_nodes = options.pop('virtual_nodes', 100)
+        self.sql = options.pop('sql', None)
+        self.sql_params = options.pop('sql_params', None)
+        self.options = options
+
+    @property
+    def sql(self):
+        """
+            str: String containing the SQL statement run on each shard.
+        """
+        return self._sql
+
+    @sql.setter
+    def sql(self, value):
+        self._sql = value
+
+    @property
+    def sql_params(self):
+        """
+            str: Comma separated names of the input stream attributes used as statement parameters.
+        """
+        return self._sql_params
+
+    @sql_params.setter
+    def sql_params(self, value):
+        self._sql_params = value
+
+    @property
+    def shard_names(self):
+        """
+            list: Names of the shards, one for each entry of :attr:`credentials`. The names determine the positions on the consistent hash ring and must not change when shards are added. Defaults to ``shard0``, ``shard1``, ...
+        """
+        return self._shard_names
+
+    @shard_names.setter
+    def shard_names(self, value):
+        self._shard_names = value
+
+    @property
+    def consistent_hashing(self):
+        """
+            bool: Set to ``True`` to route the tuples with a consistent hash ring. The hash value modulo the number of shards is used per default.
+        """
+        return self._consistent_hashing
+
+    @consistent_hashing.setter
+    def consistent_hashing(self, value):
+        self._consistent_hashing = value
+
+    @property
+    def virtual_nodes(self):
+        """
+            int: Number of points of each shard on the consistent hash ring. The default value is 100.
+        """
+        return self._virtual_nodes
+
+    @virtual_nodes.setter
+    def virtual_nodes(self, value):
+        self._virtual_nodes = value
+
+    def populate(self, topology, stream, schema, name, **options):
+
+        if not self.credentials:
+            raise ValueError("Parameter credentials must contain the credentials of at least one shard.")
+        shard_names = self.shard_names
+        if shard_names is None:
+            shard_names = ['shard' + str(index) for index in range(len(self.credentials))]
+        if len(shard_names) != len(self.credentials):
+            raise ValueError("Parameter shard_names must contain one name for each entry of credentials.")
+        if schema is None:
+            schema = stream.oport.schema
+
+        key_attributes = [attr_name.strip() for attr_name in self.key.split(',')]
+        router = _ShardRouter(key_attributes, shard_names, self.virtual_nodes if self.consistent_hashing else None)
+        shards = stream.split(len(shard_names), router, names=shard_names, name=name)
+
+        results = []
+        for shard_name, credentials, shard in zip(shard_names, self.credentials, shards):
+            statement = JDBCStatement(credentials, **self.options)
+            statement.sql = self.sql
+            statement.sql_params = self.sql_params
+            results.append(shard.map(statement, schema=schema, name=shard_name))
+        if len(results) == 1:
+            return results[0]
+        self.group = False # union markers can not be grouped visually
+        return results[0].union(set(results[1:]))
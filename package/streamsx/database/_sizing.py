@@ -0,0 +1,102 @@
+# coding=utf-8
+# Licensed Materials - Property of IBM
+# Copyright IBM Corp. 2020
+
+import re
+from streamsx.topology.schema import CommonSchema
+from streamsx.database._schema import _schema_attributes
+
+# heap used by the JVM, the operator and the JDBC driver without tuples
+_BASE_MB = 128
+# bytes of a Java tuple object without attributes
+_TUPLE_BYTES = 64
+# copies of a buffered row: the tuple, the statement parameters of the batch and the driver buffer
+_ROW_COPIES = 3
+# free heap for the copying collector of the generational garbage collection policy
+_GC_HEADROOM = 2.0
+_HEAP_ALIGNMENT_MB = 64
+
+_FIXED_BYTES = {
+    'boolean': 16, 'int8': 16, 'int16': 16, 'int32': 16, 'int64': 24, 'uint8': 16, 'uint16': 16, 'uint32': 16, 'uint64': 24,
+    'float32': 16, 'float64': 24, 'decimal32': 64, 'decimal64': 64, 'decimal128': 80, 'timestamp': 40,
+}
+_BOUNDED = re.compile(r'(rstring|ustring|blob)\[(\d+)\]$')
+
+
+def _attribute_bytes(spl_type, string_length):
+    """Returns the estimated heap bytes of an attribute value, strings and blobs of unbounded length have ``string_length`` characters or bytes."""
+    if spl_type in _FIXED_BYTES:
+        return _FIXED_BYTES[spl_type]
+    bounded = _BOUNDED.match(spl_type)
+    length = int(bounded.group(2)) if bounded else string_length
+    base_type = bounded.group(1) if bounded else spl_type
+    if base_type in ('rstring', 'ustring'):
+        return 48 + 2 * length
+    if base_type == 'blob':
+        return 32 + length
+    # collections and nested tuples
+    return 64 + 4 * string_length
+
+
+def _row_bytes(attributes, string_length):
+    return _TUPLE_BYTES + sum(_attribute_bytes(spl_type, string_length) for spl_type, _ in attributes)
+
+
+def _estimate(attributes, batch_size, transaction_size, fetch_size, string_length, result_attributes):
+    """Returns the estimated maximum heap size in MB and the lines of the report explaining the estimate."""
+    row_bytes = _row_bytes(attributes, string_length)
+    result_row_bytes = _row_bytes(result_attributes, string_length)
+    batch_rows = batch_size or 1
+    fetch_rows = fetch_size or 0
+    buffered = max(row_bytes * batch_rows, result_row_bytes * fetch_rows) * _ROW_COPIES
+    heap_mb = _BASE_MB + buffered * _GC_HEADROOM / (1024 * 1024)
+    heap_mb = int(-(-heap_mb // _HEAP_ALIGNMENT_MB) * _HEAP_ALIGNMENT_MB)
+    report = [
+        'row width: {0} bytes for {1} attributes, unbounded strings and blobs estimated with {2} characters'.format(row_bytes, len(attributes), string_length),
+        'result row width: {0} bytes for {1} attributes'.format(result_row_bytes, len(result_attributes)),
+        'buffered rows: {0} rows of a batch (batch_size {1}) or {2} result rows (fetch_size {3}), {4} copies each: {5:.1f} MB'.format(batch_rows, batch_size, fetch_rows, fetch_size, _ROW_COPIES, buffered / (1024.0 * 1024.0)),
+        'transaction_size {0}: uncommitted rows are held by the database, not in the heap'.format(transaction_size),
+        'heap: {0} MB base + {1:g} x buffered rows for garbage collection, aligned to {2} MB: {3} MB'.format(_BASE_MB, _GC_HEADROOM, _HEAP_ALIGNMENT_MB, heap_mb),
+    ]
+    return heap_mb, report
+
+
+def _attributes(schema):
+    if schema == CommonSchema.String:
+        return [('rstring', 'string')]
+    return _schema_attributes(schema)
+
+
+def estimate_vm_arg(schema, batch_size=None, transaction_size=1, fetch_size=None, string_length=64, result_schema=None):
+    """Estimates the maximum heap size of the JVM running the JDBC operator.
+
+    The heap is estimated from the row widths of the schemas and the number of rows held in memory at a time,
+    the rows of a batch of the ``schema`` or the rows of a result set of the ``result_schema`` fetched at a time, plus a base size for the JVM and the JDBC driver and headroom for the garbage collection.
+    Strings and blobs without length bound are estimated with ``string_length`` characters or bytes, use a bounded type like ``rstring[20]`` in the schema for a better estimate.
+
+    Example setting the JVM arguments of a statement inserting batches of 10000 rows::
+
+        import streamsx.database as db
+
+        vm_arg, report = db.estimate_vm_arg(sample_schema, batch_size=10000)
+        print(report)
+        res = sample_data.map(db.JDBCStatement(credentials, batch_size=10000, vm_arg=vm_arg))
+
+    Args:
+        schema(StreamSchema): Schema of the tuples passed to or returned by the statement.
+        batch_size(int): Number of rows of a batch.
+        transaction_size(int): Number of rows of a transaction.
+        fetch_size(int): Number of rows of a result set held in memory.
+        string_length(int): Estimated length of strings and blobs without length bound.
+        result_schema(StreamSchema): Schema of the result rows of a query. If ``None`` the result rows are estimated with the ``schema``.
+    Returns:
+        tuple: The JVM arguments as list, ``-Xmx`` with the estimated heap size and the generational garbage collection policy, and the report explaining the estimate as str.
+
+    .. versionadded:: 1.7
+    """
+    attributes = _attributes(schema)
+    result_attributes = attributes if result_schema is None else _attributes(result_schema)
+    heap_mb, report = _estimate(attributes, batch_size, transaction_size, fetch_size, string_length, result_attributes)
+    vm_arg = ['-Xmx' + str(heap_mb) + 'm', '-Xgcpolicy:gencon']
+    report.append('vm_arg: ' + ' '.join(vm_arg))
+    return vm_arg, '\n'.join(report)
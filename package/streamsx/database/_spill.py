@@ -0,0 +1,197 @@
+# coding=utf-8
+# Licensed Materials - Property of IBM
+# Copyright IBM Corp. 2020
+
+import collections
+import mmap
+import os
+import pickle
+import struct
+import threading
+import streamsx.ec
+
+_LENGTH = struct.Struct('<I')
+
+
+class _SegmentLog(object):
+    """Append only log of pickled records in memory-mapped segment files of fixed size.
+
+    Each record is stored with its length, a zero length marks the end of the records of a segment.
+    The header of a segment holds the offset of the next record to read, it is updated with each read.
+    Segments are removed when all their records have been read. Segments found in the directory
+    when the log is created are read first from their read offset, this replays the records spilled
+    and not yet read before a restart.
+    """
+    def __init__(self, directory, segment_size):
+        self._directory = directory
+        self._segment_size = segment_size
+        os.makedirs(directory, exist_ok=True)
+        self._segments = collections.deque()
+        for name in sorted(n for n in os.listdir(directory) if n.endswith('.log')):
+            self._segments.append(self._map(int(name[:-4])))
+        self._next_segment = self._segments[-1][0] + 1 if self._segments else 0
+        self._write = None
+        self.pending = sum(self._count(segment) for segment in self._segments)
+
+    def _path(self, number):
+        return os.path.join(self._directory, '{0:012d}.log'.format(number))
+
+    def _map(self, number, size=None):
+        with open(self._path(number), 'r+b' if size is None else 'w+b') as f:
+            if size is not None:
+                f.truncate(size)
+            data = mmap.mmap(f.fileno(), 0)
+            if size is not None:
+                _LENGTH.pack_into(data, 0, _LENGTH.size) # read offset of the first record
+            return (number, data)
+
+    def _count(self, segment):
+        count = 0
+        data = segment[1]
+        offset = _LENGTH.unpack_from(data, 0)[0]
+        while offset + _LENGTH.size <= len(data):
+            length = _LENGTH.unpack_from(data, offset)[0]
+            if length == 0:
+                break
+            count += 1
+            offset += _LENGTH.size + length
+        return count
+
+    def append(self, obj):
+        record = pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+        size = _LENGTH.size + len(record)
+        if self._write is None or self._write_offset + size > len(self._write[1]):
+            self._write = self._map(self._next_segment, max(_LENGTH.size + size, self._segment_size))
+            self._next_segment += 1
+            self._segments.append(self._write)
+            self._write_offset = _LENGTH.size
+        data = self._write[1]
+        data[self._write_offset + _LENGTH.size:self._write_offset + size] = record
+        _LENGTH.pack_into(data, self._write_offset, len(record))
+        self._write_offset += size
+        self.pending += 1
+
+    def read(self):
+        while self.pending:
+            number, data = self._segments[0]
+            offset = _LENGTH.unpack_from(data, 0)[0]
+            if offset + _LENGTH.size <= len(data):
+                length = _LENGTH.unpack_from(data, offset)[0]
+                if length != 0:
+                    start = offset + _LENGTH.size
+                    _LENGTH.pack_into(data, 0, start + length)
+                    self.pending -= 1
+                    return pickle.loads(data[start:start + length])
+            # all records of the first segment are read
+            self._remove(self._segments.popleft())
+        return None
+
+    def clear(self):
+        while self._segments:
+            self._remove(self._segments.popleft())
+        self.pending = 0
+
+    def _remove(self, segment):
+        if self._write is segment:
+            self._write = None
+        segment[1].close()
+        os.remove(self._path(segment[0]))
+
+
+class _SpillQueue(object):
+    """Queue holding up to ``threshold`` tuples in memory and spilling further tuples to a segment log.
+
+    Once spilling started all tuples are appended to the log until it is replayed completely, to keep the order of the tuples.
+    """
+    def __init__(self, directory, threshold, segment_size):
+        self._threshold = threshold
+        self._memory = collections.deque()
+        self._log = _SegmentLog(directory, segment_size)
+        self._condition = threading.Condition()
+
+    @property
+    def backlog(self):
+        return self._log.pending
+
+    def put(self, tuple_):
+        """Adds a tuple, returns ``True`` if the tuple is spilled to the log."""
+        with self._condition:
+            spill = self._log.pending > 0 or len(self._memory) >= self._threshold
+            if spill:
+                self._log.append(tuple_)
+            else:
+                self._memory.append(tuple_)
+            self._condition.notify()
+            return spill
+
+    def get(self, timeout):
+        """Returns a pair of the next tuple and if it is replayed from the log, or ``(None, False)`` after the timeout."""
+        with self._condition:
+            if not self._memory and not self._log.pending:
+                self._condition.wait(timeout)
+            if self._memory:
+                return self._memory.popleft(), False
+            if self._log.pending:
+                tuple_ = self._log.read()
+                if not self._log.pending:
+                    self._log.clear()
+                return tuple_, True
+            return None, False
+
+
+_QUEUES = {}
+_QUEUES_LOCK = threading.Lock()
+
+def _spill_queue(directory, name, threshold, segment_size):
+    # the writer and the replay source share the queue, both must run in the same processing element
+    path = os.path.join(directory, name)
+    with _QUEUES_LOCK:
+        if path not in _QUEUES:
+            _QUEUES[path] = _SpillQueue(path, threshold, segment_size)
+        return _QUEUES[path]
+
+
+class _SpillWriter(object):
+    """Sink adding each tuple to the spill queue, never blocks on the database."""
+    def __init__(self, directory, name, threshold, segment_size):
+        self._args = (directory, name, threshold, segment_size)
+
+    def __enter__(self):
+        self._queue = _spill_queue(*self._args)
+        self._spilled_metric = streamsx.ec.CustomMetric(self, name='nSpilledTuples', description='Number of tuples spilled to disk')
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def __call__(self, tuple_):
+        if self._queue.put(tuple_):
+            self._spilled_metric += 1
+
+
+class _SpillReplay(object):
+    """Source submitting the tuples of the spill queue in order, blocks when the database falls behind."""
+    def __init__(self, directory, name, threshold, segment_size):
+        self._args = (directory, name, threshold, segment_size)
+
+    def __enter__(self):
+        self._queue = _spill_queue(*self._args)
+        self._replayed_metric = streamsx.ec.CustomMetric(self, name='nReplayedTuples', description='Number of tuples replayed from disk')
+        self._backlog_metric = streamsx.ec.CustomMetric(self, name='nSpillBacklog', kind='Gauge', description='Number of tuples on disk waiting for replay')
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def __call__(self):
+        return self
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if streamsx.ec.shutdown().is_set():
+            raise StopIteration()
+        tuple_, replayed = self._queue.get(1.0)
+        if replayed:
+            self._replayed_metric += 1
+        self._backlog_metric.value = self._queue.backlog
+        return tuple_
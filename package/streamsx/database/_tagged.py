@@ -0,0 +1,45 @@
+# coding=utf-8
+# Licensed Materials - Property of IBM
+# Copyright IBM Corp. 2020
+
+import time
+import streamsx.ec
+
+# tag of the tuples of the input stream of a tagged union, the other streams use tag 1
+_DATA_TUPLE = 0
+_TICK = 1
+
+
+class _Tag(object):
+    """Wraps each tuple into a ``(tag, tuple)`` pair to merge streams of different schemas."""
+    def __init__(self, tag):
+        self._tag = tag
+
+    def __call__(self, tuple_):
+        return (self._tag, tuple_)
+
+
+def _untag(tagged):
+    return tagged[1]
+
+
+class _Ticks(object):
+    """Source emitting a tick every period to let time based limits expire without input tuples."""
+    def __init__(self, period):
+        self._period = period
+
+    def __call__(self):
+        while not streamsx.ec.shutdown().wait(self._period):
+            yield time.time()
+
+
+def _tagged_union(composite, stream, other, tag):
+    # merges the tuples of the stream tagged as data tuples with the tuples of the other stream tagged with tag
+    composite.group = False # union markers can not be grouped visually
+    return stream.map(_Tag(_DATA_TUPLE)).union({other.map(_Tag(tag))})
+
+
+def _tagged_with_ticks(composite, stream, period):
+    # merges the tuples of the stream tagged as data tuples with ticks emitted every period
+    ticks = stream.topology.source(_Ticks(period), name='Ticks')
+    return _tagged_union(composite, stream, ticks, _TICK)
@@ -0,0 +1,118 @@
+# coding=utf-8
+# Licensed Materials - Property of IBM
+# Copyright IBM Corp. 2020
+
+import threading
+import time
+import streamsx.ec
+
+# attribute added to the tuples passed to the statement to measure the statement latency
+_STAMP = '__jdbc_ts'
+
+
+def _failed(status):
+    # a negative SQL code of the SQL status attribute indicates a failed statement
+    return bool(status) and status['sqlCode'] < 0
+
+
+class _Governor(object):
+    """Token bucket with a rate adapted by additive increase and multiplicative decrease (AIMD).
+
+    The rate is increased after each adjustment interval without slow or failed statements
+    and is decreased once per adjustment interval when the latency exceeds the target or a statement failed.
+    """
+    def __init__(self, rate, min_rate, max_rate, target_latency, increase, decrease, interval=1.0):
+        self.rate = float(rate)
+        self._min_rate = float(min_rate)
+        self._max_rate = float(max_rate)
+        self._target_latency = target_latency
+        self._increase = increase
+        self._decrease = decrease
+        self._interval = interval
+        self._tokens = 1.0
+        self._last = time.monotonic()
+        self._adjusted = self._last
+        self._congested = False
+        self._lock = threading.Lock()
+
+    def acquire(self, now=None):
+        """Takes a token, returns the time in seconds to wait before the tuple may be passed."""
+        with self._lock:
+            now = time.monotonic() if now is None else now
+            self._tokens = min(max(1.0, self.rate), self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1.0
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def observe(self, latency, failed, now=None):
+        """Adapts the rate to the latency of a statement and whether it failed."""
+        with self._lock:
+            now = time.monotonic() if now is None else now
+            if failed or (self._target_latency is not None and latency > self._target_latency):
+                self._congested = True
+            if now - self._adjusted < self._interval:
+                return
+            if self._congested:
+                self.rate = max(self._min_rate, self.rate * self._decrease)
+            else:
+                self.rate = min(self._max_rate, self.rate + self._increase)
+            self._congested = False
+            self._adjusted = now
+
+
+_GOVERNORS = {}
+_GOVERNORS_LOCK = threading.Lock()
+
+def _governor(name, config):
+    with _GOVERNORS_LOCK:
+        if name not in _GOVERNORS:
+            _GOVERNORS[name] = _Governor(*config)
+        return _GOVERNORS[name]
+
+
+class _Throttle(object):
+    """Passes tuples at the rate of the governor and adds the time stamp used to measure the latency."""
+    def __init__(self, name, config):
+        self._name = name
+        self._config = config
+
+    def __enter__(self):
+        self._governor = _governor(self._name, self._config)
+        self._rate_metric = streamsx.ec.CustomMetric(self, name='throttleRate', kind='Gauge', description='Current rate limit in tuples per second')
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def __call__(self, tuple_):
+        wait = self._governor.acquire()
+        if wait > 0:
+            time.sleep(wait)
+        self._rate_metric.value = self._governor.rate
+        result = dict(tuple_) if isinstance(tuple_, dict) else {'string': tuple_}
+        result[_STAMP] = time.time()
+        return result
+
+
+class _ThrottleFeedback(object):
+    """Reports the latency and failure of each statement to the governor and removes the time stamp."""
+    def __init__(self, name, config, status_attribute, output_attribute):
+        self._name = name
+        self._config = config
+        self._status_attribute = status_attribute
+        self._output_attribute = output_attribute
+
+    def __enter__(self):
+        self._governor = _governor(self._name, self._config)
+        self._latency_metric = streamsx.ec.CustomMetric(self, name='statementLatencyMillis', kind='Gauge', description='Latency of the last statement in milliseconds')
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def __call__(self, tuple_):
+        latency = time.time() - tuple_.pop(_STAMP)
+        failed = self._status_attribute is not None and _failed(tuple_.get(self._status_attribute))
+        self._governor.observe(latency, failed)
+        self._latency_metric.value = int(latency * 1000)
+        return tuple_ if self._output_attribute is None else tuple_[self._output_attribute]
@@ -0,0 +1,227 @@
+# coding=utf-8
+# Licensed Materials - Property of IBM
+# Copyright IBM Corp. 2020
+
+import contextlib
+import hashlib
+import os
+import re
+import shutil
+import tarfile
+import tempfile
+import requests
+
+try:
+    import fcntl
+except ImportError: # Windows, the cache is not locked
+    fcntl = None
+
+_RELEASES_URL = 'https://api.github.com/repos/IBMStreams/{0}/releases'
+_ARCHIVE_VERSION = re.compile(r'-(\d+(?:\.\d+)*)(?:-[^/]*)?\.tgz$')
+_COMPLETE = '.complete'
+
+
+def _parse_version(version):
+    return tuple(int(part) for part in version.strip().lstrip('v').split('.'))
+
+
+def _format_version(version):
+    return '.'.join(str(part) for part in version)
+
+
+def _archive_version(name):
+    """Returns the version of a toolkit archive name like ``streamsx.jdbc.toolkits-1.7.1-20190703-1017.tgz``."""
+    match = _ARCHIVE_VERSION.search(name)
+    return _parse_version(match.group(1)) if match else None
+
+
+class _VersionRange(object):
+    """SPL toolkit version range like ``[1.9.0,3.0.0)``, a single version ``1.9.0`` is the minimum version."""
+    def __init__(self, spec):
+        spec = spec.strip()
+        if spec[0] in '[(':
+            low, high = spec[1:-1].split(',')
+            self._low = _parse_version(low)
+            self._high = _parse_version(high)
+            self._low_inclusive = spec[0] == '['
+            self._high_inclusive = spec[-1] == ']'
+        else:
+            self._low = _parse_version(spec)
+            self._high = None
+            self._low_inclusive = True
+            self._high_inclusive = False
+
+    def __contains__(self, version):
+        if version < self._low or (version == self._low and not self._low_inclusive):
+            return False
+        if self._high is not None and (version > self._high or (version == self._high and not self._high_inclusive)):
+            return False
+        return True
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _verify(path, sha256):
+    if sha256 is not None and _sha256(path) != sha256.lower():
+        raise ValueError('Checksum mismatch of toolkit archive ' + path)
+
+
+@contextlib.contextmanager
+def _locked(path):
+    # serializes the callers sharing a cache directory, also across processes
+    with open(path, 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class _ToolkitCache(object):
+    """Cache of unpacked toolkits keyed by toolkit name and version.
+
+    A toolkit is resolved from the cache, then from the archives in the mirror directory, then from the GitHub releases unless offline.
+    Archives are downloaded and toolkits are unpacked into temporary names and renamed when complete.
+    """
+    def __init__(self, cache_dir, toolkit_name, repository_name, mirror_dir=None, offline=False):
+        self._dir = os.path.join(cache_dir, toolkit_name)
+        self._toolkit_name = toolkit_name
+        self._repository_name = repository_name
+        self._mirror_dir = mirror_dir
+        self._offline = offline
+
+    def _location(self, version):
+        return os.path.join(self._dir, _format_version(version), self._toolkit_name)
+
+    def cached_versions(self):
+        if not os.path.isdir(self._dir):
+            return []
+        versions = []
+        for name in os.listdir(self._dir):
+            if os.path.exists(os.path.join(self._dir, name, _COMPLETE)):
+                try:
+                    versions.append(_parse_version(name))
+                except ValueError:
+                    pass
+        return versions
+
+    def _cached_sha256(self, version):
+        # checksum of the archive the cached version was unpacked from
+        with open(os.path.join(self._dir, _format_version(version), _COMPLETE)) as f:
+            return f.read().strip()
+
+    def _matches(self, version, sha256):
+        return sha256 is None or self._cached_sha256(version) == sha256.lower()
+
+    def resolve(self, version_range, url=None, sha256=None):
+        """Returns the location of the highest toolkit version in the range, downloads and unpacks it if it is not cached.
+
+        With ``sha256`` only a toolkit unpacked from an archive with this checksum is taken from the cache.
+        """
+        os.makedirs(self._dir, exist_ok=True)
+        with _locked(os.path.join(self._dir, '.lock')):
+            if url is not None:
+                version = _archive_version(url)
+                if version is None:
+                    raise ValueError('Toolkit version can not be determined from URL ' + url)
+                if version not in self.cached_versions() or not self._matches(version, sha256):
+                    self._install(version, self._download(url, sha256))
+                return self._location(version)
+
+            cached = [v for v in self.cached_versions() if v in version_range and self._matches(v, sha256)]
+            if cached:
+                return self._location(max(cached))
+            for version, archive, archive_sha256 in self._candidates(version_range):
+                if archive.startswith(('http://', 'https://')):
+                    archive = self._download(archive, sha256 or archive_sha256)
+                else:
+                    _verify(archive, sha256 or archive_sha256)
+                self._install(version, archive)
+                return self._location(version)
+        raise ValueError('No toolkit ' + self._toolkit_name + ' found in the version range' + (' (offline)' if self._offline else ''))
+
+    def _candidates(self, version_range):
+        # (version, archive path or URL, sha256) of the archives in the range, highest version first
+        candidates = []
+        if self._mirror_dir is not None and os.path.isdir(self._mirror_dir):
+            for name in os.listdir(self._mirror_dir):
+                version = _archive_version(name)
+                if version is not None and version in version_range:
+                    path = os.path.join(self._mirror_dir, name)
+                    checksum = None
+                    if os.path.exists(path + '.sha256'):
+                        with open(path + '.sha256') as f:
+                            checksum = f.read().split()[0]
+                    candidates.append((version, path, checksum))
+        if candidates or self._offline:
+            return sorted(candidates, key=lambda c: c[0], reverse=True)
+        url = _RELEASES_URL.format(self._repository_name) + '?per_page=100'
+        while url is not None:
+            r = requests.get(url)
+            r.raise_for_status()
+            for release in r.json():
+                for asset in release.get('assets', []):
+                    version = _archive_version(asset['name'])
+                    if version is not None and version in version_range:
+                        digest = asset.get('digest') or ''
+                        checksum = digest[len('sha256:'):] if digest.startswith('sha256:') else None
+                        candidates.append((version, asset['browser_download_url'], checksum))
+            # the releases are paginated, the link header contains the URL of the next page
+            url = r.links.get('next', {}).get('url')
+        return sorted(candidates, key=lambda c: c[0], reverse=True)
+
+    def _download(self, url, sha256):
+        if self._offline:
+            raise ValueError('Toolkit archive ' + url + ' can not be downloaded offline')
+        archives = os.path.join(self._dir, 'archives')
+        os.makedirs(archives, exist_ok=True)
+        path = os.path.join(archives, url.rsplit('/', 1)[-1])
+        if not os.path.exists(path):
+            print('Download: ' + url)
+            r = requests.get(url, stream=True)
+            r.raise_for_status()
+            fd, tmp = tempfile.mkstemp(dir=archives, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in r.iter_content(chunk_size=1024 * 1024):
+                    f.write(chunk)
+            os.replace(tmp, path)
+        try:
+            _verify(path, sha256)
+        except ValueError:
+            os.remove(path)
+            raise
+        return path
+
+    def _install(self, version, archive):
+        target = os.path.join(self._dir, _format_version(version))
+        tmp = tempfile.mkdtemp(dir=self._dir, prefix='.unpack-')
+        try:
+            with tarfile.open(archive, 'r:gz') as tar:
+                for member in tar.getmembers():
+                    if member.name.startswith('/') or '..' in member.name.split('/'):
+                        raise ValueError('Invalid path in toolkit archive: ' + member.name)
+                tar.extractall(tmp)
+            toolkit_dir = None
+            for root, dirs, files in os.walk(tmp):
+                if os.path.basename(root) == self._toolkit_name and 'toolkit.xml' in files:
+                    toolkit_dir = root
+                    break
+            if toolkit_dir is None:
+                raise ValueError('Toolkit ' + self._toolkit_name + ' not found in archive ' + archive)
+            staged = tempfile.mkdtemp(dir=tmp)
+            os.rename(toolkit_dir, os.path.join(staged, self._toolkit_name))
+            with open(os.path.join(staged, _COMPLETE), 'w') as f:
+                f.write(_sha256(archive))
+            if os.path.exists(target):
+                shutil.rmtree(target)
+            os.rename(staged, target)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
@@ -0,0 +1,184 @@
+# coding=utf-8
+# Licensed Materials - Property of IBM
+# Copyright IBM Corp. 2020
+
+import streamsx.ec
+import streamsx.topology.composite
+from streamsx.spl.types import Timestamp
+from streamsx.database._dbapi import _connect, _driver_error
+
+
+def _parameter(value):
+    # converts an attribute value to a DB-API parameter value
+    if isinstance(value, Timestamp):
+        return value.datetime()
+    return value
+
+
+def _param_names(sql_params):
+    if not sql_params:
+        return []
+    return [name.strip() for name in sql_params.split(',')]
+
+
+class _StatementExpander(object):
+    """Expands a record into the statements of its transaction, each a pair of the statement and its list of parameter rows.
+
+    A statement with a rows attribute has one parameter row for each element of the list attribute. Its parameters
+    are taken from the element, or from the record if the element has no attribute with the parameter name.
+    Statements without parameter rows, for an empty list attribute, are left out.
+    """
+    def __init__(self, statements):
+        self._statements = [(s['sql'], _param_names(s.get('sql_params')), s.get('rows')) for s in statements]
+
+    def __call__(self, tuple_):
+        result = []
+        for sql, params, rows in self._statements:
+            values = [tuple(_parameter(row[name] if name in row else tuple_[name]) for name in params) for row in ([tuple_] if rows is None else tuple_[rows] or [])]
+            if values:
+                result.append((sql, values))
+        return result
+
+
+class _TransactionWriter(object):
+    """Runs the statements of each record with a DB-API connection and commits them together, or rolls them back if a statement fails.
+
+    A statement with several parameter rows is run with one ``executemany`` call. Committed records are returned,
+    rolled back records are returned with the error message set to the error attribute, or are dropped if no error attribute is set.
+    If the rollback fails, the connection is lost. It is closed and the next record is run with a new connection.
+    """
+    def __init__(self, credentials, statements, error_attribute):
+        self._credentials = credentials
+        self._expander = _StatementExpander(statements)
+        self._error_attribute = error_attribute
+
+    def __enter__(self):
+        self._error = _driver_error()
+        self._open()
+        self._committed_metric = streamsx.ec.CustomMetric(self, name='nTransactionsCommitted', description='Number of records committed')
+        self._rolled_back_metric = streamsx.ec.CustomMetric(self, name='nTransactionsRolledBack', description='Number of records rolled back after a failed statement')
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._connection is not None:
+            self._connection.close()
+
+    def _open(self):
+        self._connection = _connect(self._credentials)
+        self._cursor = self._connection.cursor()
+
+    def _rollback(self):
+        try:
+            self._connection.rollback()
+        except self._error:
+            # the connection is lost, the next record opens a new connection
+            try:
+                self._connection.close()
+            except self._error:
+                pass
+            self._connection = None
+
+    def __call__(self, tuple_):
+        try:
+            if self._connection is None:
+                self._open()
+            for sql, values in self._expander(tuple_):
+                if len(values) == 1:
+                    self._cursor.execute(sql, values[0])
+                else:
+                    self._cursor.executemany(sql, values)
+            self._connection.commit()
+        except self._error as e:
+            # no statement of the record is committed
+            if self._connection is not None:
+                self._rollback()
+            self._rolled_back_metric += 1
+            return self._result(tuple_, str(e))
+        self._committed_metric += 1
+        return self._result(tuple_, '')
+
+    def _result(self, tuple_, error):
+        if self._error_attribute is None:
+            return tuple_ if not error else None
+        result = dict(tuple_)
+        result[self._error_attribute] = error
+        return result
+
+
+class JDBCTransaction(streamsx.topology.composite.Map):
+    """
+    Composite map transformation running several statements for each input tuple in one transaction
+
+    Each input tuple is a logical record, for example an order with its order items. For each record the :attr:`statements`
+    are run in the given order on a single connection and are committed together with one commit, instead of chaining
+    one :py:class:`JDBCStatement` with its own connection and commit for each table.
+    A statement with a ``rows`` entry is run once for each element of the list attribute with this name, for example once for each order item.
+
+    Each statement is a dict with the entries:
+
+    * ``sql``: the SQL statement with parameter markers
+    * ``sql_params``: comma separated names of the attributes used as statement parameters
+    * ``rows``: optional name of a list attribute, the statement is run for each element. The parameters are taken from the element, or from the record if the element has no attribute with the name.
+
+    The statements are prepared and the parameter values are bound, the statement of a ``rows`` entry is run for all elements with one ``executemany`` call.
+    If a statement fails, the transaction of the record is rolled back and none of its statements is committed.
+
+    The statements are run with the `ibm_db <https://pypi.org/project/ibm-db/>`_ package, the package is added to the application as a pip requirement.
+    Db2 credentials with a ``jdbcurl`` and the name of an application configuration created by :py:func:`configure_connection` are supported.
+    The number of committed and rolled back records are available as the custom metrics ``nTransactionsCommitted`` and ``nTransactionsRolledBack``.
+
+    The output stream contains the committed records. With :attr:`error_attribute` the rolled back records are output as well,
+    with the error message in this attribute, otherwise they are dropped.
+
+    Example writing an order and its items in one transaction::
+
+        import streamsx.database as db
+
+        order_schema = StreamSchema('tuple<int64 ORDER_ID, rstring CUSTOMER, list<tuple<int32 ITEM, int32 QUANTITY>> ITEMS>')
+        statements = [
+            {'sql': 'INSERT INTO ORDERS (ORDER_ID, CUSTOMER) VALUES (?, ?)', 'sql_params': 'ORDER_ID, CUSTOMER'},
+            {'sql': 'INSERT INTO ORDER_ITEMS (ORDER_ID, ITEM, QUANTITY) VALUES (?, ?, ?)', 'sql_params': 'ORDER_ID, ITEM, QUANTITY', 'rows': 'ITEMS'}
+        ]
+        res = orders.map(db.JDBCTransaction(credentials, statements))
+
+    .. versionadded:: 1.7
+
+    Attributes
+    ----------
+    credentials : dict|str
+        The credentials of the IBM cloud Db2 warehouse service as dict or configured external connection of kind "Db2 Warehouse" (Cloud Pak for Data only) as dict or the name of the application configuration.
+    statements : list
+        The statements run for each record, in order.
+    options : kwargs
+        The additional optional parameters as variable keyword arguments.
+    """
+
+    def __init__(self, credentials, statements, **options):
+        self.credentials = credentials
+        self.statements = statements
+        self.error_attribute = options.get('error_attribute')
+
+    @property
+    def error_attribute(self):
+        """
+            str: Name of the ``rstring`` output attribute set to the error message of a rolled back record and to an empty string for a committed record. If not set, rolled back records are dropped.
+        """
+        return self._error_attribute
+
+    @error_attribute.setter
+    def error_attribute(self, value):
+        self._error_attribute = value
+
+    def populate(self, topology, stream, schema, name, **options):
+
+        if not self.statements:
+            raise ValueError("Parameter statements must contain at least one statement.")
+        if schema is None:
+            if self.error_attribute is not None:
+                raise ValueError("An output schema with the error_attribute must be set.")
+            schema = stream.oport.schema
+        credentials = self.credentials
+        if isinstance(credentials, dict) and credentials.get('class') == 'external':
+            credentials = {'jdbcurl': credentials.get('url'), 'username': credentials.get('username'), 'password': credentials.get('password')}
+
+        topology.add_pip_package('ibm_db')
+        return stream.map(_TransactionWriter(credentials, self.statements, self.error_attribute), schema=schema, name=name)
@@ -0,0 +1,70 @@
+# coding=utf-8
+# Licensed Materials - Property of IBM
+# Copyright IBM Corp. 2020
+
+# attribute flagging the validation statement run before the first input tuple
+_WARM_UP = '__jdbc_warm_up'
+_VALIDATION = 1
+
+
+# number of input tuples held back at most while the validation statement is pending
+_MAX_PENDING = 10000
+
+
+class _WarmUpGate(object):
+    """Passes the validation statement ahead of all input tuples, input tuples received before it are held back.
+
+    The gate is colocated with the source of the validation statement and the JDBC operator, so a restart of the operator
+    restarts the gate and runs the validation statement again. When ``max_pending`` tuples are held back,
+    they are released without waiting for the validation statement.
+    """
+    def __init__(self, sql_attribute, max_pending=_MAX_PENDING):
+        self._sql_attribute = sql_attribute
+        self._max_pending = max_pending
+        self._validated = False
+        self._pending = []
+
+    def __enter__(self):
+        self._validated = False
+        self._pending = []
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def __call__(self, tagged):
+        tag, tuple_ = tagged
+        if tag == _VALIDATION:
+            result = [{self._sql_attribute: tuple_, _WARM_UP: True}] + self._pending
+            self._validated = True
+            self._pending = []
+            return result
+        tuple_ = dict(tuple_) if isinstance(tuple_, dict) else {'string': tuple_}
+        tuple_[_WARM_UP] = False
+        if self._validated:
+            return [tuple_]
+        self._pending.append(tuple_)
+        if len(self._pending) >= self._max_pending:
+            # stops holding back tuples, the validation statement is submitted when it arrives
+            self._validated = True
+            result = self._pending
+            self._pending = []
+            return result
+        return None
+
+
+def _is_warm_up(tuple_):
+    return 1 if tuple_[_WARM_UP] else 0
+
+
+def _ready(tuple_):
+    return 'ready'
+
+
+class _WarmUpStrip(object):
+    """Removes the warm-up flag from the output tuples."""
+    def __init__(self, output_attribute):
+        self._output_attribute = output_attribute
+
+    def __call__(self, tuple_):
+        tuple_.pop(_WARM_UP)
+        return tuple_ if self._output_attribute is None else tuple_[self._output_attribute]
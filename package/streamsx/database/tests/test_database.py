@@ -4,15 +4,39 @@ import streamsx.database as db
 from streamsx.topology.topology import Topology
 from streamsx.topology.tester import Tester
 from streamsx.topology.schema import CommonSchema, StreamSchema
+from streamsx.topology.state import ConsistentRegionConfig
 import streamsx.spl.op as op
+from streamsx.spl.types import Timestamp
 import streamsx.spl.toolkit
 import streamsx.rest as sr
+from streamsx.database._reference import _ColumnTable, _change_mark
+from streamsx.database._tagged import _DATA_TUPLE, _TICK
+from streamsx.database._bloom import _ScalableBloomFilter
+from streamsx.database._bulk import _FileSpooler, _LoadedFiles
+from streamsx.database._spill import _SpillQueue
+from streamsx.database._throttle import _Governor, _failed
+from streamsx.database._shard import _ShardRouter
+from streamsx.database._partition import _PartitionHash
+from streamsx.database._routing import _is_read
+from streamsx.database._transaction import _StatementExpander, _TransactionWriter
+from streamsx.database._call import _parse_parameters
+from streamsx.database._dbapi import _db2_dsn, _BatchWriter
+from streamsx.database._backoff import _Backoff, _ConnectionState, _connection_failed
+from streamsx.database._latency import _QuantileSketch
+from streamsx.database._lob import _LobWriter, _LobChunkRequests
+from streamsx.database._warmup import _WarmUpGate, _WARM_UP, _VALIDATION
+from streamsx.database._json import _JsonQuery, _json_value
+from streamsx.database._catalog import _parse_ddl
+from streamsx.database._explain import _StandIn
+from streamsx.database._rollup import _Rollup, _parse_aggregates
+from streamsx.database._toolkit_cache import _VersionRange, _archive_version
 
 import unittest
 import datetime
 import os
 import json
 import random
+import tempfile
 import time
 
 ##
@@ -146,6 +170,1190 @@ class TestComposite(unittest.TestCase):
 
         self._build_only(name, topo)
 
+    def test_reference_table(self):
+        print ('\n---------'+str(self))
+        name = 'test_reference_table'
+        creds_file = os.environ['DB2_CREDENTIALS']
+        with open(creds_file) as data_file:
+            credentials = json.load(data_file)
+        topo = Topology(name)
+        tuple_schema = StreamSchema("tuple<int64 ID, rstring NAME, int32 AGE>")
+        sample_data = topo.source(generate_data, name="GeneratedData").map(lambda tpl: (tpl["ID"], tpl["NAME"], tpl["AGE"]), schema=tuple_schema)
+        ref = db.JDBCReferenceTable(credentials, table='SAMPLE_DEMO', key='ID', reference_schema=StreamSchema('tuple<int64 ID, rstring NAME>'))
+        ref.change_column = 'LAST_UPDATE'
+        ref.refresh_period = 60.0
+        res = sample_data.map(ref, schema=tuple_schema)
+        res.print()
+
+        self._build_only(name, topo)
+
+    def test_bloom_insert(self):
+        print ('\n---------'+str(self))
+        name = 'test_bloom_insert'
+        creds_file = os.environ['DB2_CREDENTIALS']
+        with open(creds_file) as data_file:
+            credentials = json.load(data_file)
+        topo = Topology(name)
+        tuple_schema = StreamSchema("tuple<int64 ID, rstring NAME, int32 AGE>")
+        sample_data = topo.source(generate_data, name="GeneratedData").map(lambda tpl: (tpl["ID"], tpl["NAME"], tpl["AGE"]), schema=tuple_schema)
+        insert = db.JDBCStatement(credentials, batch_size=100, sql_failure_action='log')
+        insert.sql = 'INSERT INTO SAMPLE_DEMO (ID, NAME, AGE) VALUES (? , ?, ?)'
+        insert.sql_params = 'ID, NAME, AGE'
+        merge = db.JDBCStatement(credentials)
+        merge.sql = 'MERGE INTO SAMPLE_DEMO T USING (VALUES (?, ?, ?)) S (ID, NAME, AGE) ON T.ID = S.ID WHEN NOT MATCHED THEN INSERT VALUES (S.ID, S.NAME, S.AGE)'
+        merge.sql_params = 'ID, NAME, AGE'
+        res = sample_data.map(db.JDBCBloomInsert(insert, merge, key='ID', table='SAMPLE_DEMO'))
+        res.print()
+
+        self._build_only(name, topo)
+
+    def test_bulk_load(self):
+        print ('\n---------'+str(self))
+        name = 'test_bulk_load'
+        creds_file = os.environ['DB2_CREDENTIALS']
+        with open(creds_file) as data_file:
+            credentials = json.load(data_file)
+        topo = Topology(name)
+        tuple_schema = StreamSchema("tuple<int64 ID, rstring NAME, int32 AGE>")
+        sample_data = topo.source(generate_data, name="GeneratedData").map(lambda tpl: (tpl["ID"], tpl["NAME"], tpl["AGE"]), schema=tuple_schema)
+        res = sample_data.map(db.JDBCBulkLoad(credentials, table='SAMPLE_DEMO', directory='/tmp/staging', max_seconds=10.0))
+        res.print(write_punctuations=True)
+
+        self._build_only(name, topo)
+
+    def test_spill(self):
+        print ('\n---------'+str(self))
+        name = 'test_spill'
+        creds_file = os.environ['DB2_CREDENTIALS']
+        with open(creds_file) as data_file:
+            credentials = json.load(data_file)
+        topo = Topology(name)
+        tuple_schema = StreamSchema("tuple<int64 ID, rstring NAME, int32 AGE>")
+        sample_data = topo.source(generate_data, name="GeneratedData").map(lambda tpl: (tpl["ID"], tpl["NAME"], tpl["AGE"]), schema=tuple_schema)
+        statement = db.JDBCStatement(credentials)
+        statement.sql = 'INSERT INTO SAMPLE_DEMO (ID, NAME, AGE) VALUES (? , ?, ?)'
+        statement.sql_params = 'ID, NAME, AGE'
+        statement.spill_directory = '/tmp/spill'
+        statement.spill_threshold = 1000
+        sample_data.map(statement, name='INSERT')
+
+        self._build_only(name, topo)
+
+    def test_throttle(self):
+        print ('\n---------'+str(self))
+        name = 'test_throttle'
+        creds_file = os.environ['DB2_CREDENTIALS']
+        with open(creds_file) as data_file:
+            credentials = json.load(data_file)
+        topo = Topology(name)
+        tuple_schema = StreamSchema("tuple<int64 ID, rstring NAME, int32 AGE>")
+        sample_data = topo.source(generate_data, name="GeneratedData").map(lambda tpl: (tpl["ID"], tpl["NAME"], tpl["AGE"]), schema=tuple_schema)
+        throttle = db.Throttle(name='db2', rate=100.0, target_latency=0.5)
+        statement = db.JDBCStatement(credentials, throttle=throttle)
+        statement.sql = 'INSERT INTO SAMPLE_DEMO (ID, NAME, AGE) VALUES (? , ?, ?)'
+        statement.sql_params = 'ID, NAME, AGE'
+        sample_data.map(statement, name='INSERT')
+        update = db.JDBCStatement(credentials, throttle=throttle, sql_status_attr='error')
+        update.sql = 'UPDATE SAMPLE_DEMO SET AGE = ? WHERE ID = ?'
+        update.sql_params = 'AGE, ID'
+        status_schema = StreamSchema("tuple<int64 ID, tuple<int32 sqlCode, rstring sqlState, rstring sqlMessage> error>")
+        sample_data.map(update, schema=status_schema, name='UPDATE')
+
+        self._build_only(name, topo)
+
+    def test_sharded_statement(self):
+        print ('\n---------'+str(self))
+        name = 'test_sharded_statement'
+        creds_file = os.environ['DB2_CREDENTIALS']
+        with open(creds_file) as data_file:
+            credentials = json.load(data_file)
+        topo = Topology(name)
+        tuple_schema = StreamSchema("tuple<int64 ID, rstring NAME, int32 AGE>")
+        sample_data = topo.source(generate_data, name="GeneratedData").map(lambda tpl: (tpl["ID"], tpl["NAME"], tpl["AGE"]), schema=tuple_schema)
+        sharded = db.JDBCShardedStatement([credentials, credentials], key='ID', consistent_hashing=True)
+        sharded.sql = 'INSERT INTO SAMPLE_DEMO (ID, NAME, AGE) VALUES (? , ?, ?)'
+        sharded.sql_params = 'ID, NAME, AGE'
+        sample_data.map(sharded, name='INSERT')
+
+        self._build_only(name, topo)
+
+    def test_read_write_split(self):
+        print ('\n---------'+str(self))
+        name = 'test_read_write_split'
+        creds_file = os.environ['DB2_CREDENTIALS']
+        with open(creds_file) as data_file:
+            credentials = json.load(data_file)
+        topo = Topology(name)
+        statements = topo.source(['SELECT COUNT(*) AS TOTAL FROM SAMPLE_DEMO', 'DELETE FROM SAMPLE_DEMO']).as_string()
+        statements.map(db.JDBCReadWriteSplit(credentials, [credentials, credentials]), name='STATEMENTS')
+
+        self._build_only(name, topo)
+
+    def test_partitioned_statement(self):
+        print ('\n---------'+str(self))
+        name = 'test_partitioned_statement'
+        creds_file = os.environ['DB2_CREDENTIALS']
+        with open(creds_file) as data_file:
+            credentials = json.load(data_file)
+        topo = Topology(name)
+        tuple_schema = StreamSchema("tuple<int64 ID, rstring NAME, int32 AGE>")
+        sample_data = topo.source(generate_data, name="GeneratedData").map(lambda tpl: (tpl["ID"], tpl["NAME"], tpl["AGE"]), schema=tuple_schema)
+        statement = db.JDBCStatement(credentials, distribution_key='ID', partition_count=4, batch_size=100)
+        statement.sql = 'INSERT INTO SAMPLE_DEMO (ID, NAME, AGE) VALUES (? , ?, ?)'
+        statement.sql_params = 'ID, NAME, AGE'
+        sample_data.map(statement, name='INSERT')
+
+        self._build_only(name, topo)
+
+    def test_transaction(self):
+        print ('\n---------'+str(self))
+        name = 'test_transaction'
+        creds_file = os.environ['DB2_CREDENTIALS']
+        with open(creds_file) as data_file:
+            credentials = json.load(data_file)
+        topo = Topology(name)
+        order_schema = StreamSchema('tuple<int64 ORDER_ID, rstring CUSTOMER, list<tuple<int32 ITEM, int32 QUANTITY>> ITEMS>')
+        orders = topo.source([(1, 'a', [{'ITEM': 1, 'QUANTITY': 2}])]).map(schema=order_schema)
+        statements = [
+            {'sql': 'INSERT INTO ORDERS (ORDER_ID, CUSTOMER) VALUES (?, ?)', 'sql_params': 'ORDER_ID, CUSTOMER'},
+            {'sql': 'INSERT INTO ORDER_ITEMS (ORDER_ID, ITEM, QUANTITY) VALUES (?, ?, ?)', 'sql_params': 'ORDER_ID, ITEM, QUANTITY', 'rows': 'ITEMS'}
+        ]
+        orders.map(db.JDBCTransaction(credentials, statements), name='ORDERS')
+
+        self._build_only(name, topo)
+
+    def test_call(self):
+        print ('\n---------'+str(self))
+        name = 'test_call'
+        creds_file = os.environ['DB2_CREDENTIALS']
+        with open(creds_file) as data_file:
+            credentials = json.load(data_file)
+        topo = Topology(name)
+        tuple_schema = StreamSchema("tuple<int64 ID, rstring NAME, int32 AGE>")
+        sample_data = topo.source(generate_data, name="GeneratedData").map(lambda tpl: (tpl["ID"], tpl["NAME"], tpl["AGE"]), schema=tuple_schema)
+        sample_data.map(db.JDBCCall(credentials, 'SAMPLE_INSERT', 'IN ID, IN NAME, IN AGE', batch_size=100), name='CALL')
+        status_schema = StreamSchema("tuple<int64 ID, rstring NAME, int32 AGE, int32 STATUS>")
+        sample_data.map(db.JDBCCall(credentials, 'SAMPLE_CHECK', 'IN ID, OUT STATUS'), schema=status_schema, name='CHECK')
+
+        self._build_only(name, topo)
+
+    def test_warm_up(self):
+        print ('\n---------'+str(self))
+        name = 'test_warm_up'
+        creds_file = os.environ['DB2_CREDENTIALS']
+        with open(creds_file) as data_file:
+            credentials = json.load(data_file)
+        topo = Topology(name)
+        s = topo.source(['SELECT COUNT(*) AS TOTAL FROM SAMPLE_DEMO']).as_string()
+        statement = db.JDBCStatement(credentials, warm_up=True, check_connection=True)
+        res = s.map(statement, schema=StreamSchema('tuple<int32 TOTAL, rstring string>'))
+        statement.ready.print()
+
+        self._build_only(name, topo)
+
+    def test_reconnection_backoff(self):
+        print ('\n---------'+str(self))
+        name = 'test_reconnection_backoff'
+        creds_file = os.environ['DB2_CREDENTIALS']
+        with open(creds_file) as data_file:
+            credentials = json.load(data_file)
+        topo = Topology(name)
+        tuple_schema = StreamSchema("tuple<int64 ID, rstring NAME, int32 AGE>")
+        sample_data = topo.source(generate_data, name="GeneratedData").map(lambda tpl: (tpl["ID"], tpl["NAME"], tpl["AGE"]), schema=tuple_schema)
+        statement = db.JDBCStatement(credentials, reconnection_policy='BoundedRetry', reconnection_bound=1, reconnection_interval=0.5, reconnection_backoff=30.0, sql_status_attr='error')
+        statement.sql = 'INSERT INTO SAMPLE_DEMO (ID, NAME, AGE) VALUES (? , ?, ?)'
+        statement.sql_params = 'ID, NAME, AGE'
+        status_schema = StreamSchema("tuple<int64 ID, tuple<int32 sqlCode, rstring sqlState, rstring sqlMessage> error>")
+        sample_data.map(statement, schema=status_schema, name='INSERT')
+
+        self._build_only(name, topo)
+
+    def test_consistent_region(self):
+        print ('\n---------'+str(self))
+        name = 'test_consistent_region'
+        creds_file = os.environ['DB2_CREDENTIALS']
+        with open(creds_file) as data_file:
+            credentials = json.load(data_file)
+        topo = Topology(name)
+        tuple_schema = StreamSchema("tuple<int64 ID, rstring NAME, int32 AGE>")
+        generated = topo.source(generate_data, name="GeneratedData")
+        sample_data = generated.map(lambda tpl: (tpl["ID"], tpl["NAME"], tpl["AGE"]), schema=tuple_schema)
+        statement = db.JDBCStatement(credentials, consistent_region=True, batch_size=10000)
+        statement.sql = 'INSERT INTO SAMPLE_DEMO (ID, NAME, AGE) VALUES (? , ?, ?)'
+        statement.sql_params = 'ID, NAME, AGE'
+        self.assertRaises(ValueError, sample_data.map, statement)
+        generated.set_consistent(ConsistentRegionConfig.periodic(10.0))
+        sample_data.map(statement, name='INSERT')
+
+        self._build_only(name, topo)
+
+    def test_sink(self):
+        print ('\n---------'+str(self))
+        name = 'test_sink'
+        creds_file = os.environ['DB2_CREDENTIALS']
+        with open(creds_file) as data_file:
+            credentials = json.load(data_file)
+        topo = Topology(name)
+        tuple_schema = StreamSchema("tuple<int64 ID, rstring NAME, int32 AGE>")
+        sample_data = topo.source(generate_data, name="GeneratedData").map(lambda tpl: (tpl["ID"], tpl["NAME"], tpl["AGE"]), schema=tuple_schema)
+        sample_data.for_each(db.JDBCSink(credentials, sql='INSERT INTO SAMPLE_DEMO (ID, NAME, AGE) VALUES (? , ?, ?)', sql_params='ID, NAME, AGE', batch_size=100), name='INSERT')
+
+        self._build_only(name, topo)
+
+    def test_latency_tracker(self):
+        print ('\n---------'+str(self))
+        name = 'test_latency_tracker'
+        creds_file = os.environ['DB2_CREDENTIALS']
+        with open(creds_file) as data_file:
+            credentials = json.load(data_file)
+        topo = Topology(name)
+        tuple_schema = StreamSchema("tuple<int64 ID, rstring NAME, int32 AGE>")
+        sample_data = topo.source(generate_data, name="GeneratedData").map(lambda tpl: (tpl["ID"], tpl["NAME"], tpl["AGE"]), schema=tuple_schema)
+        statement = db.JDBCStatement(credentials, batch_size=10)
+        statement.sql = 'INSERT INTO SAMPLE_DEMO (ID, NAME, AGE) VALUES (? , ?, ?)'
+        statement.sql_params = 'ID, NAME, AGE'
+        sample_data.map(db.JDBCLatencyTracker(statement, window=60.0), name='INSERT')
+
+        self._build_only(name, topo)
+
+    def test_batch_statement(self):
+        print ('\n---------'+str(self))
+        name = 'test_batch_statement'
+        creds_file = os.environ['DB2_CREDENTIALS']
+        with open(creds_file) as data_file:
+            credentials = json.load(data_file)
+        topo = Topology(name)
+        tuple_schema = StreamSchema("tuple<int64 ID, rstring NAME, int32 AGE>")
+        sample_data = topo.source(generate_data, name="GeneratedData").map(lambda tpl: (tpl["ID"], tpl["NAME"], tpl["AGE"]), schema=tuple_schema)
+        sample_data.for_each(db.Db2BatchStatement(credentials, 'INSERT INTO SAMPLE_DEMO (ID, NAME, AGE) VALUES (?, ?, ?)', 'ID, NAME, AGE', batch_size=1000), name='INSERT')
+
+        self._build_only(name, topo)
+
+    def test_lob(self):
+        print ('\n---------'+str(self))
+        name = 'test_lob'
+        creds_file = os.environ['DB2_CREDENTIALS']
+        with open(creds_file) as data_file:
+            credentials = json.load(data_file)
+        topo = Topology(name)
+        documents = topo.source([(1, '/tmp/doc1.pdf')]).map(schema=StreamSchema('tuple<int64 DOC_ID, rstring PATH>'))
+        documents.map(db.JDBCLobWriter(credentials, table='DOCUMENTS', column='CONTENT', key='DOC_ID', file_attribute='PATH'), name='WRITE')
+        documents.map(db.JDBCLobReader(credentials, table='DOCUMENTS', column='CONTENT', key='DOC_ID', chunk_size=65536), name='READ')
+
+        self._build_only(name, topo)
+
+    def test_json_query(self):
+        print ('\n---------'+str(self))
+        name = 'test_json_query'
+        creds_file = os.environ['DB2_CREDENTIALS']
+        with open(creds_file) as data_file:
+            credentials = json.load(data_file)
+        topo = Topology(name)
+        queries = topo.source(['SELECT * FROM SAMPLE_DEMO']).as_string()
+        res = queries.map(db.JDBCJsonQuery(credentials, page_size=100), name='QUERY')
+        res.print()
+
+        self._build_only(name, topo)
+
+    def test_rollup(self):
+        print ('\n---------'+str(self))
+        name = 'test_rollup'
+        creds_file = os.environ['DB2_CREDENTIALS']
+        with open(creds_file) as data_file:
+            credentials = json.load(data_file)
+        topo = Topology(name)
+        tuple_schema = StreamSchema("tuple<int64 ID, rstring NAME, int32 AGE>")
+        sample_data = topo.source(generate_data, name="GeneratedData").map(lambda tpl: (tpl["ID"], tpl["NAME"], tpl["AGE"]), schema=tuple_schema)
+        rollup = db.JDBCRollup(credentials, table='SAMPLE_ROLLUP', key='NAME', aggregates='COUNT(*) AS N, MAX(AGE) AS AGE', bucket_seconds=10, merge=True)
+        sample_data.map(rollup, name='ROLLUP')
+
+        self._build_only(name, topo)
+
+class TestReferenceTable(unittest.TestCase):
+
+    def test_upsert_and_get(self):
+        table = _ColumnTable('ID', [('int64', 'ID'), ('rstring', 'NAME'), ('boolean', 'VIP'), ('float64', 'SCORE')])
+        table.upsert({'ID': 1, 'NAME': 'a', 'VIP': True, 'SCORE': 1.5})
+        table.upsert({'ID': 2, 'NAME': 'b', 'VIP': False, 'SCORE': None})
+        table.upsert({'ID': 1, 'NAME': 'c', 'VIP': False, 'SCORE': 2.5})
+        self.assertEqual(2, len(table))
+        self.assertEqual({'ID': 1, 'NAME': 'c', 'VIP': False, 'SCORE': 2.5}, table.get(1))
+        self.assertEqual({'ID': 2, 'NAME': 'b', 'VIP': False, 'SCORE': 0.0}, table.get(2))
+        self.assertIsNone(table.get(3))
+
+    def test_change_mark(self):
+        mark = _change_mark('test_change_mark')
+        self.assertIsNone(mark.value)
+        mark.advance(Timestamp(20, 0))
+        mark.advance(Timestamp(10, 500))
+        mark.advance(None)
+        self.assertEqual(Timestamp(20, 0), mark.value)
+        mark.advance(Timestamp(20, 1))
+        self.assertIs(mark, _change_mark('test_change_mark'))
+        self.assertEqual(Timestamp(20, 1), mark.value)
+
+class TestBloomFilter(unittest.TestCase):
+
+    def test_scalable_filter(self):
+        bloom = _ScalableBloomFilter(capacity=1000, error_rate=0.01)
+        added = sum(1 for i in range(10000) if bloom.add(repr(i).encode()))
+        self.assertGreater(added, 9800)
+        self.assertEqual(added, len(bloom))
+        for i in range(10000):
+            self.assertIn(repr(i).encode(), bloom)
+            self.assertFalse(bloom.add(repr(i).encode()))
+        false_positives = sum(1 for i in range(10000, 20000) if repr(i).encode() in bloom)
+        self.assertLess(false_positives, 200)
+
+    def test_batched_insert_requires_failure_action(self):
+        topo = Topology()
+        s = topo.source([(1, 'a')]).map(lambda t: t, schema=StreamSchema('tuple<int64 ID, rstring NAME>'))
+        insert = db.JDBCStatement('cfg', sql='INSERT INTO T (ID, NAME) VALUES (?, ?)', sql_params='ID, NAME', batch_size=100)
+        merge = db.JDBCStatement('cfg', sql='MERGE INTO T USING (VALUES (?, ?)) S (ID, NAME) ON T.ID = S.ID WHEN NOT MATCHED THEN INSERT VALUES (S.ID, S.NAME)', sql_params='ID, NAME')
+        self.assertRaises(ValueError, s.map, db.JDBCBloomInsert(insert, merge, key='ID', table='T'))
+
+class TestFileSpooler(unittest.TestCase):
+
+    def test_roll_on_size_and_time(self):
+        with tempfile.TemporaryDirectory() as directory:
+            load_sql = "CALL SYSPROC.ADMIN_CMD('LOAD FROM {file} OF DEL INSERT INTO T (ID, NAME)')"
+            spooler = _FileSpooler(directory, 'T', ['ID', 'NAME'], ',', 10, 0.2, load_sql)
+            spooler._files_metric = 0 # no Streams runtime
+            self.assertIsNone(spooler((0, {'ID': 1, 'NAME': 'a,b'})))
+            loads = spooler((0, {'ID': 2, 'NAME': 'c'}))
+            self.assertEqual(1, len(loads))
+            self.assertEqual(load_sql.replace('{file}', loads[0]['file']), loads[0]['string'])
+            with open(loads[0]['file']) as f:
+                self.assertEqual('1,"a,b"\n2,c\n', f.read())
+            self.assertIsNone(spooler((0, {'ID': 3, 'NAME': 'd'})))
+            self.assertIsNone(spooler((_TICK, 0)))
+            time.sleep(0.3)
+            loads = spooler((_TICK, 0))
+            self.assertEqual(1, len(loads))
+            self.assertEqual(2, len(os.listdir(directory)))
+
+    def test_recover_files_of_previous_run(self):
+        with tempfile.TemporaryDirectory() as directory:
+            load_sql = "CALL SYSPROC.ADMIN_CMD('LOAD FROM {file} OF DEL MODIFIED BY COLDEL{,} INSERT INTO T (ID)')"
+            spooler = _FileSpooler(directory, 'T', ['ID'], ',', None, 60, load_sql)
+            spooler._files_metric = 0 # no Streams runtime
+            self.assertIsNone(spooler((0, {'ID': 1})))
+            spooler.__exit__(None, None, None) # shutdown finishes the open file
+            crashed = _FileSpooler(directory, 'T', ['ID'], ',', None, 60, load_sql)
+            self.assertIsNone(crashed((0, {'ID': 2})))
+            crashed._file.close() # crash leaves the temporary file
+            restarted = _FileSpooler(directory, 'T', ['ID'], ',', None, 60, load_sql)
+            restarted._files_metric = 0
+            restarted._recover()
+            loads = restarted((_TICK, 0))
+            self.assertEqual(2, len(loads))
+            self.assertEqual(sorted(os.path.join(directory, name) for name in os.listdir(directory)), sorted(load['file'] for load in loads))
+            for load in loads:
+                self.assertEqual(load_sql.replace('{file}', load['file']), load['string'])
+            self.assertIsNone(restarted((_TICK, 0)))
+            # the loaded file is not loaded again after the next restart, the file of the failed load is
+            _LoadedFiles('status', False)({'file': loads[0]['file'], 'status': {'sqlCode': 0, 'sqlState': '', 'sqlMessage': ''}})
+            _LoadedFiles('status', False)({'file': loads[1]['file'], 'status': {'sqlCode': -3107, 'sqlState': '01H52', 'sqlMessage': ''}})
+            self.assertTrue(os.path.exists(loads[0]['file'] + '.loaded'))
+            restarted = _FileSpooler(directory, 'T', ['ID'], ',', None, 60, load_sql)
+            restarted._recover()
+            self.assertEqual([loads[1]['file']], [load['file'] for load in restarted((_TICK, 0))])
+            _LoadedFiles('status', True)({'file': loads[1]['file'], 'status': {'sqlCode': 0, 'sqlState': '', 'sqlMessage': ''}})
+            self.assertEqual([os.path.basename(loads[0]['file']) + '.loaded'], os.listdir(directory))
+
+    def test_schema_requires_file(self):
+        topo = Topology()
+        s = topo.source([(1,)]).map(lambda t: t, schema=StreamSchema('tuple<int64 ID>'))
+        self.assertRaises(ValueError, s.map, db.JDBCBulkLoad('cfg', table='T', directory='/tmp/staging'), schema=StreamSchema('tuple<rstring string>'))
+
+class TestSpillQueue(unittest.TestCase):
+
+    def test_spill_and_replay_in_order(self):
+        with tempfile.TemporaryDirectory() as directory:
+            queue = _SpillQueue(directory, 2, 64)
+            spilled = [queue.put({'ID': i, 'NAME': 'x' * i}) for i in range(10)]
+            self.assertEqual([False, False] + [True] * 8, spilled)
+            self.assertEqual(8, queue.backlog)
+            self.assertTrue(len(os.listdir(directory)) > 1)
+            result = [queue.get(0) for i in range(10)]
+            self.assertEqual(list(range(10)), [t['ID'] for t, _ in result])
+            self.assertEqual([False, False] + [True] * 8, [replayed for _, replayed in result])
+            self.assertEqual((None, False), queue.get(0))
+            self.assertEqual([], os.listdir(directory))
+            self.assertFalse(queue.put({'ID': 10, 'NAME': ''}))
+
+    def test_replay_after_restart(self):
+        with tempfile.TemporaryDirectory() as directory:
+            queue = _SpillQueue(directory, 0, 1024)
+            for i in range(5):
+                queue.put(i)
+            restarted = _SpillQueue(directory, 0, 1024)
+            self.assertEqual(5, restarted.backlog)
+            restarted.put(5)
+            self.assertEqual(list(range(6)), [restarted.get(0)[0] for i in range(6)])
+
+    def test_no_replay_of_read_tuples_after_restart(self):
+        with tempfile.TemporaryDirectory() as directory:
+            queue = _SpillQueue(directory, 0, 64)
+            for i in range(10):
+                queue.put({'ID': i, 'NAME': 'x' * i})
+            self.assertEqual(list(range(4)), [queue.get(0)[0]['ID'] for i in range(4)])
+            restarted = _SpillQueue(directory, 0, 64)
+            self.assertEqual(6, restarted.backlog)
+            self.assertEqual(list(range(4, 10)), [restarted.get(0)[0]['ID'] for i in range(6)])
+            self.assertEqual([], os.listdir(directory))
+
+class TestThrottle(unittest.TestCase):
+
+    def test_token_bucket(self):
+        governor = _Governor(10.0, 1.0, 100.0, None, 1.0, 0.5)
+        start = governor._last
+        waits = [governor.acquire(now=start) for i in range(3)]
+        self.assertEqual(0.0, waits[0])
+        self.assertAlmostEqual(0.1, waits[1])
+        self.assertAlmostEqual(0.2, waits[2])
+        self.assertEqual(0.0, governor.acquire(now=start + 1.0))
+
+    def test_aimd(self):
+        governor = _Governor(100.0, 10.0, 110.0, 0.2, 5.0, 0.5)
+        start = governor._adjusted
+        governor.observe(0.1, False, now=start + 1.0)
+        self.assertEqual(105.0, governor.rate)
+        governor.observe(0.1, False, now=start + 2.0)
+        self.assertEqual(110.0, governor.rate)
+        governor.observe(0.5, False, now=start + 2.5)
+        self.assertEqual(110.0, governor.rate)
+        governor.observe(0.1, False, now=start + 3.0)
+        self.assertEqual(55.0, governor.rate)
+        governor.observe(0.1, True, now=start + 4.0)
+        self.assertEqual(27.5, governor.rate)
+
+    def test_failed(self):
+        self.assertTrue(_failed({'sqlCode': -803, 'sqlState': '23505', 'sqlMessage': 'duplicate'}))
+        self.assertFalse(_failed({'sqlCode': 100, 'sqlState': '02000', 'sqlMessage': ''}))
+        self.assertFalse(_failed(None))
+        # the SQL code is read by name, not by the order of the attributes
+        self.assertTrue(_failed({'sqlState': '23505', 'sqlMessage': 'duplicate', 'sqlCode': -803}))
+
+class TestShardRouter(unittest.TestCase):
+
+    def test_stable_hash(self):
+        router = _ShardRouter(['ID'], ['a', 'b', 'c'], None)
+        shards = [router.shard({'ID': i}) for i in range(3000)]
+        self.assertEqual(shards, [_ShardRouter(['ID'], ['a', 'b', 'c'], None).shard({'ID': i}) for i in range(3000)])
+        for index in range(3):
+            self.assertGreater(shards.count(index), 800)
+
+    def test_consistent_hash(self):
+        router = _ShardRouter(['ID'], ['a', 'b', 'c'], 100)
+        extended = _ShardRouter(['ID'], ['a', 'b', 'c', 'd'], 100)
+        moved = 0
+        for i in range(4000):
+            before = router.shard({'ID': i})
+            after = extended.shard({'ID': i})
+            if before != after:
+                self.assertEqual(3, after)
+                moved += 1
+        self.assertGreater(moved, 500)
+        self.assertLess(moved, 1500)
+
+    def test_partition_hash(self):
+        partition_hash = _PartitionHash(['ID', 'NAME'], 4, None)
+        partitions = set(partition_hash({'ID': i, 'NAME': 'a'}) for i in range(100))
+        self.assertEqual({0, 1, 2, 3}, partitions)
+        partition_hash = _PartitionHash(['ID'], 4, lambda key: key[0] * 3)
+        self.assertEqual([0, 3, 2, 1], [partition_hash({'ID': i}) for i in range(4)])
+
+class TestStatementClassifier(unittest.TestCase):
+
+    def test_reads(self):
+        self.assertTrue(_is_read('SELECT * FROM T'))
+        self.assertTrue(_is_read('  select id from t'))
+        self.assertTrue(_is_read('-- comment\n/* block */ (SELECT 1 FROM T)'))
+        self.assertTrue(_is_read('WITH X AS (SELECT 1 FROM T) SELECT * FROM X'))
+        self.assertTrue(_is_read('VALUES CURRENT TIMESTAMP'))
+
+    def test_writes(self):
+        self.assertFalse(_is_read('INSERT INTO T VALUES (1)'))
+        self.assertFalse(_is_read('UPDATE T SET A = 1'))
+        self.assertFalse(_is_read('DROP TABLE T'))
+        self.assertFalse(_is_read('SELECT * FROM T FOR UPDATE'))
+        self.assertFalse(_is_read('SELECT ID FROM FINAL TABLE (INSERT INTO T VALUES (1))'))
+        self.assertFalse(_is_read('SELECTED'))
+
+class TestStatementExpander(unittest.TestCase):
+
+    def test_expand(self):
+        expander = _StatementExpander([
+            {'sql': 'INSERT INTO O VALUES (?, ?)', 'sql_params': 'ID, NAME'},
+            {'sql': 'INSERT INTO I VALUES (?, ?)', 'sql_params': 'ID, ITEM', 'rows': 'ITEMS'}])
+        statements = expander({'ID': 7, 'NAME': "O'Brien", 'ITEMS': [{'ITEM': 1}, {'ITEM': 2}]})
+        self.assertEqual([('INSERT INTO O VALUES (?, ?)', [(7, "O'Brien")]), ('INSERT INTO I VALUES (?, ?)', [(7, 1), (7, 2)])], statements)
+        self.assertEqual(1, len(expander({'ID': 8, 'NAME': 'b', 'ITEMS': []})))
+
+    def test_rollback_of_failed_record(self):
+        writer = _TransactionWriter(None, [
+            {'sql': 'INSERT INTO O VALUES (?)', 'sql_params': 'ID'},
+            {'sql': 'INSERT INTO I VALUES (?, ?)', 'sql_params': 'ID, ITEM', 'rows': 'ITEMS'}], 'ERROR')
+        cursor = _FailingCursor()
+        writer._connection = _FakeConnection(cursor)
+        writer._cursor = cursor
+        writer._error = ValueError
+        writer._committed_metric = 0 # no Streams runtime
+        writer._rolled_back_metric = 0
+        self.assertEqual('', writer({'ID': 1, 'ITEMS': [{'ITEM': 1}, {'ITEM': 2}]})['ERROR'])
+        self.assertEqual([('INSERT INTO O VALUES (?)', (1,)), ('INSERT INTO I VALUES (?, ?)', [(1, 1), (1, 2)])], cursor.statements)
+        self.assertEqual('duplicate', writer({'ID': 1, 'ITEMS': [{'ITEM': 3}]})['ERROR'])
+        self.assertEqual((1, 1), (writer._connection.commits, writer._connection.rollbacks))
+        self.assertEqual((1, 1), (writer._committed_metric, writer._rolled_back_metric))
+        writer._error_attribute = None
+        self.assertIsNone(writer({'ID': 1, 'ITEMS': []}))
+
+    def test_lost_connection(self):
+        writer = _TransactionWriter(None, [{'sql': 'INSERT INTO O VALUES (?)', 'sql_params': 'ID'}], 'ERROR')
+        cursor = _FailingCursor()
+        lost = _FakeConnection(cursor)
+        def fail():
+            raise ValueError('connection lost')
+        lost.rollback = fail
+        writer._connection = lost
+        writer._cursor = cursor
+        writer._error = ValueError
+        writer._committed_metric = 0 # no Streams runtime
+        writer._rolled_back_metric = 0
+        writer({'ID': 1})
+        self.assertEqual('duplicate', writer({'ID': 1})['ERROR'])
+        self.assertTrue(lost.closed)
+        self.assertIsNone(writer._connection)
+        # the next record is run with a new connection
+        reconnected = _FakeConnection(_FailingCursor())
+        def reconnect():
+            writer._connection = reconnected
+            writer._cursor = reconnected.cursor()
+        writer._open = reconnect
+        self.assertEqual('', writer({'ID': 2})['ERROR'])
+        self.assertEqual(1, reconnected.commits)
+
+class TestProcedureCall(unittest.TestCase):
+
+    def test_parameters(self):
+        self.assertEqual([('IN', 'ID'), ('OUT', 'STATUS'), ('INOUT', 'COUNT')], _parse_parameters('ID, out STATUS, INOUT COUNT'))
+        self.assertRaises(ValueError, _parse_parameters, 'IN OUT ID')
+
+    def test_reject_options_with_output_parameters(self):
+        topo = Topology('test_reject_options_with_output_parameters')
+        s = topo.source([1]).map(lambda x: {'ID': x, 'STATUS': 0}, schema=StreamSchema('tuple<int64 ID, int32 STATUS>'))
+        credentials = {'username': 'u', 'password': 'p', 'jdbcurl': 'jdbc:db2://localhost/SAMPLE'}
+        self.assertRaises(ValueError, s.map, db.JDBCCall(credentials, 'CHECK', 'IN ID, OUT STATUS', batch_size=100))
+        self.assertRaises(ValueError, s.map, db.JDBCCall(credentials, 'CHECK', 'IN ID, OUT STATUS', truststore='/tmp/truststore.jks'))
+
+    def test_dsn(self):
+        self.assertEqual('DATABASE=BLUDB;HOSTNAME=db.example.com;PORT=50001;PROTOCOL=TCPIP;UID=u;PWD=p;SECURITY=SSL;', _db2_dsn('jdbc:db2://db.example.com:50001/BLUDB:sslConnection=true;', 'u', 'p'))
+        self.assertEqual('DATABASE=SAMPLE;HOSTNAME=localhost;PORT=50000;PROTOCOL=TCPIP;UID=u;PWD=p;', _db2_dsn('jdbc:db2://localhost/SAMPLE', 'u', 'p'))
+        self.assertRaises(ValueError, _db2_dsn, 'jdbc:postgresql://localhost/db', 'u', 'p')
+
+class TestWarmUp(unittest.TestCase):
+
+    def test_gate(self):
+        gate = _WarmUpGate('string')
+        self.assertIsNone(gate((_DATA_TUPLE, 'SELECT 1 FROM T')))
+        self.assertIsNone(gate((_DATA_TUPLE, 'SELECT 2 FROM T')))
+        result = gate((_VALIDATION, 'VALUES 1'))
+        self.assertEqual(['VALUES 1', 'SELECT 1 FROM T', 'SELECT 2 FROM T'], [t['string'] for t in result])
+        self.assertEqual([True, False, False], [t[_WARM_UP] for t in result])
+        self.assertEqual([{'string': 'SELECT 3 FROM T', _WARM_UP: False}], gate((_DATA_TUPLE, 'SELECT 3 FROM T')))
+
+    def test_gate_limits_pending_and_restarts(self):
+        gate = _WarmUpGate('string', max_pending=3)
+        self.assertIsNone(gate((_DATA_TUPLE, 'SELECT 1 FROM T')))
+        self.assertIsNone(gate((_DATA_TUPLE, 'SELECT 2 FROM T')))
+        self.assertEqual(3, len(gate((_DATA_TUPLE, 'SELECT 3 FROM T'))))
+        self.assertEqual(1, len(gate((_DATA_TUPLE, 'SELECT 4 FROM T'))))
+        self.assertEqual([True], [t[_WARM_UP] for t in gate((_VALIDATION, 'VALUES 1'))])
+        gate.__enter__() # restart
+        self.assertIsNone(gate((_DATA_TUPLE, 'SELECT 5 FROM T')))
+        self.assertEqual(['VALUES 1', 'SELECT 5 FROM T'], [t['string'] for t in gate((_VALIDATION, 'VALUES 1'))])
+
+class TestReconnectionBackoff(unittest.TestCase):
+
+    def test_backoff(self):
+        backoff = _Backoff(1.0, 10.0, rand=lambda: 1.0)
+        self.assertEqual([1.0, 2.0, 4.0, 8.0, 10.0, 10.0], [backoff.delay(n) for n in range(6)])
+        backoff = _Backoff(1.0, 10.0)
+        for n in range(10):
+            self.assertTrue(0.0 <= backoff.delay(n) <= 10.0)
+
+    def test_recovery(self):
+        state = _ConnectionState(_Backoff(1.0, 10.0, rand=lambda: 1.0))
+        self.assertIsNone(state.observe(False, 100.0))
+        self.assertEqual(0.0, state.wait_time(100.0))
+        self.assertIsNone(state.observe(True, 101.0))
+        self.assertEqual(1.0, state.wait_time(101.0))
+        self.assertIsNone(state.observe(True, 102.0))
+        self.assertEqual(2.0, state.wait_time(102.0))
+        self.assertEqual(3.0, state.observe(False, 104.0))
+        self.assertEqual(0.0, state.wait_time(104.0))
+
+    def test_connection_failed(self):
+        self.assertTrue(_connection_failed({'sqlCode': -4499, 'sqlState': '08001', 'sqlMessage': ''}))
+        self.assertTrue(_connection_failed({'sqlCode': -30108, 'sqlState': '', 'sqlMessage': ''}))
+        self.assertFalse(_connection_failed({'sqlCode': -803, 'sqlState': '23505', 'sqlMessage': ''}))
+        self.assertFalse(_connection_failed({'sqlCode': 0, 'sqlState': '', 'sqlMessage': ''}))
+
+class TestQuantileSketch(unittest.TestCase):
+
+    def test_quantiles(self):
+        sketch = _QuantileSketch(0.01)
+        self.assertIsNone(sketch.quantile(0.5))
+        for i in range(1, 10001):
+            sketch.add(i / 1000.0)
+        self.assertEqual(10000, sketch.count)
+        for q in (0.5, 0.95, 0.99):
+            self.assertAlmostEqual(q * 10.0, sketch.quantile(q), delta=q * 10.0 * 0.011)
+        sketch.clear()
+        self.assertEqual(0, sketch.count)
+
+class TestBatchWriter(unittest.TestCase):
+
+    def _writer(self, cursor):
+        writer = _BatchWriter(None, 'INSERT INTO T VALUES (?, ?)', ['ID', 'NAME'], 2, 60)
+        writer._connection = _FakeConnection(cursor)
+        writer._cursor = cursor
+        writer._rows = []
+        writer._started = None
+        writer._failed = False
+        writer._batches_metric = 0 # no Streams runtime
+        writer._rows_metric = 0
+        return writer
+
+    def test_batches(self):
+        cursor = _FailingCursor()
+        writer = self._writer(cursor)
+        for i in range(3):
+            writer((_DATA_TUPLE, {'ID': i, 'NAME': 'a', 'OTHER': 0}))
+        self.assertEqual([('INSERT INTO T VALUES (?, ?)', [(0, 'a'), (1, 'a')])], cursor.statements)
+        writer.__exit__(None, None, None)
+        self.assertEqual([(2, 'a')], cursor.statements[1][1])
+        self.assertEqual((2, 0, True), (writer._connection.commits, writer._connection.rollbacks, writer._connection.closed))
+        self.assertEqual((2, 3), (writer._batches_metric, writer._rows_metric))
+        single = _BatchWriter(None, 'INSERT INTO T VALUES (?)', ['ID'], 2, 60)
+        self.assertEqual((7,), single._row({'ID': 7, 'NAME': 'a'}))
+
+    def test_rollback_of_failed_batch(self):
+        cursor = _FailingCursor()
+        writer = self._writer(cursor)
+        writer((_DATA_TUPLE, {'ID': 1, 'NAME': 'a'}))
+        writer((_DATA_TUPLE, {'ID': 2, 'NAME': 'b'}))
+        writer((_DATA_TUPLE, {'ID': 1, 'NAME': 'a'}))
+        with self.assertRaises(ValueError):
+            writer((_DATA_TUPLE, {'ID': 3, 'NAME': 'c'}))
+        writer.__exit__(ValueError, None, None)
+        self.assertEqual((1, 1, True), (writer._connection.commits, writer._connection.rollbacks, writer._connection.closed))
+
+class _FakeIbmDb(object):
+    PARAM_FILE = 11
+    SQL_PARAM_INPUT = 1
+
+    def __init__(self):
+        self.bound = []
+        self.executed = []
+
+    def bind_param(self, stmt, number, value, param_type):
+        self.bound.append((number, value, param_type))
+
+    def execute(self, stmt):
+        self.executed.append(stmt)
+
+
+class _LengthCursor(object):
+
+    def __init__(self, length):
+        self._length = length
+
+    def execute(self, sql, params):
+        self.executed = (sql, params)
+
+    def fetchone(self):
+        return (self._length,)
+
+
+class TestLobChunks(unittest.TestCase):
+
+    def test_write_file(self):
+        cursor = _LengthCursor(10)
+        writer = _LobWriter(None, 'UPDATE T SET C = ? WHERE ID = ?', 'SELECT LENGTH(C) AS LOB_LENGTH FROM T WHERE ID = ?', ['ID'], None, 'PATH')
+        writer._ibm_db = _FakeIbmDb()
+        writer._update = 'update'
+        writer._connection = _FakeConnection(cursor)
+        writer._cursor = cursor
+        writer._lobs_metric = 0 # no Streams runtime
+        self.assertEqual({'ID': 1, 'LOB_LENGTH': 10}, writer({'ID': 1, 'PATH': '/tmp/doc.pdf'}))
+        self.assertEqual([(1, '/tmp/doc.pdf', _FakeIbmDb.PARAM_FILE), (2, 1, _FakeIbmDb.SQL_PARAM_INPUT)], writer._ibm_db.bound)
+        self.assertEqual(['update'], writer._ibm_db.executed)
+        self.assertEqual(('SELECT LENGTH(C) AS LOB_LENGTH FROM T WHERE ID = ?', (1,)), cursor.executed)
+        self.assertEqual((1, 1), (writer._connection.commits, writer._lobs_metric))
+
+    def test_chunk_requests(self):
+        requests = list(_LobChunkRequests(['ID'], 4)({'ID': 1, 'LOB_LENGTH': 10}))
+        self.assertEqual([(0, 4), (4, 4), (8, 2)], [(r['LOB_OFFSET'], r['LOB_LENGTH']) for r in requests])
+        self.assertEqual([], list(_LobChunkRequests(['ID'], 4)({'ID': 1, 'LOB_LENGTH': None})))
+
+class TestToolkitCache(unittest.TestCase):
+
+    def _archive(self, directory, version):
+        import tarfile
+        toolkit_dir = os.path.join(directory, 'src-' + version, 'com.ibm.streamsx.jdbc')
+        os.makedirs(toolkit_dir)
+        with open(os.path.join(toolkit_dir, 'toolkit.xml'), 'w') as f:
+            f.write('<toolkit version="' + version + '"/>')
+        path = os.path.join(directory, 'mirror', 'streamsx.jdbc.toolkits-' + version + '-20200101-1200.tgz')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with tarfile.open(path, 'w:gz') as tar:
+            tar.add(toolkit_dir, arcname='com.ibm.streamsx.jdbc')
+        return path
+
+    def test_version_range(self):
+        self.assertEqual((1, 7, 1), _archive_version('streamsx.jdbc.toolkits-1.7.1-20190703-1017.tgz'))
+        self.assertEqual((1, 9, 0), _archive_version('https://github.com/IBMStreams/streamsx.jdbc/releases/download/v1.9.0/streamsx.jdbc.toolkits-1.9.0.tgz'))
+        r = _VersionRange('[1.9.0,3.0.0)')
+        self.assertIn((1, 9, 0), r)
+        self.assertIn((2, 10), r)
+        self.assertNotIn((1, 8, 9), r)
+        self.assertNotIn((3, 0, 0), r)
+        self.assertNotIn((1, 9, 0), _VersionRange('(1.9.0,3.0.0]'))
+        self.assertIn((3, 0, 0), _VersionRange('(1.9.0,3.0.0]'))
+        self.assertIn((4, 0), _VersionRange('1.9.0'))
+
+    def test_offline_mirror(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self._archive(directory, '1.8.0')
+            self._archive(directory, '1.9.1')
+            newest = self._archive(directory, '3.0.0')
+            cache_dir = os.path.join(directory, 'cache')
+            mirror_dir = os.path.dirname(newest)
+            location = db.download_toolkit(cache_dir=cache_dir, mirror_dir=mirror_dir, offline=True)
+            self.assertEqual(os.path.join(cache_dir, 'com.ibm.streamsx.jdbc', '1.9.1', 'com.ibm.streamsx.jdbc'), location)
+            self.assertTrue(os.path.exists(os.path.join(location, 'toolkit.xml')))
+            # cached, neither unpacked again nor read from the mirror
+            os.remove(os.path.join(mirror_dir, 'streamsx.jdbc.toolkits-1.9.1-20200101-1200.tgz'))
+            self.assertEqual(location, db.download_toolkit(cache_dir=cache_dir, mirror_dir=mirror_dir, offline=True))
+            self.assertTrue(db.download_toolkit(version='1.8.0', cache_dir=cache_dir, offline=True).endswith(os.path.join('1.9.1', 'com.ibm.streamsx.jdbc')))
+            self.assertRaises(ValueError, db.download_toolkit, version='[1.7.0,1.8.0)', cache_dir=cache_dir, mirror_dir=mirror_dir, offline=True)
+
+    def test_checksum(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = self._archive(directory, '2.0.0')
+            cache_dir = os.path.join(directory, 'cache')
+            self.assertRaises(ValueError, db.download_toolkit, cache_dir=cache_dir, mirror_dir=os.path.dirname(path), offline=True, sha256='0' * 64)
+            with open(path + '.sha256', 'w') as f:
+                f.write('0' * 64 + '  ' + os.path.basename(path))
+            self.assertRaises(ValueError, db.download_toolkit, cache_dir=cache_dir, mirror_dir=os.path.dirname(path), offline=True)
+            import hashlib
+            with open(path, 'rb') as f:
+                checksum = hashlib.sha256(f.read()).hexdigest()
+            with open(path + '.sha256', 'w') as f:
+                f.write(checksum + '  ' + os.path.basename(path))
+            location = db.download_toolkit(cache_dir=cache_dir, mirror_dir=os.path.dirname(path), offline=True)
+            self.assertTrue(os.path.exists(os.path.join(location, 'toolkit.xml')))
+            # cached toolkits are taken only with the checksum of their archive
+            os.remove(path)
+            self.assertEqual(location, db.download_toolkit(cache_dir=cache_dir, offline=True, sha256=checksum.upper()))
+            self.assertRaises(ValueError, db.download_toolkit, cache_dir=cache_dir, offline=True, sha256='1' * 64)
+            self.assertRaises(ValueError, db.download_toolkit, target_dir=directory, cache_dir=cache_dir, offline=True)
+
+class _FakeAppConfig(object):
+
+    def __init__(self, name, properties):
+        self.name = name
+        self.properties = properties
+        self.updates = 0
+
+    def update(self, properties):
+        self.properties.update(properties)
+        self.updates += 1
+
+
+class _FakeInstance(object):
+
+    def __init__(self, id, configs):
+        self.id = id
+        self.configs = dict((c.name, c) for c in configs)
+        self.requests = 0
+
+    def get_application_configurations(self, name=None):
+        self.requests += 1
+        return list(self.configs.values())
+
+    def create_application_configuration(self, name, properties, description=None):
+        self.configs[name] = _FakeAppConfig(name, dict(properties))
+
+
+class TestConfigureConnections(unittest.TestCase):
+
+    def test_diff_only(self):
+        creds = {'username': 'u', 'password': 'p', 'jdbcurl': 'jdbc:db2://h:50000/DB'}
+        current = _FakeAppConfig('a', {'credentials': json.dumps(creds)})
+        stale = _FakeAppConfig('b', {'credentials': 'old'})
+        i1 = _FakeInstance('i1', [current, stale])
+        i2 = _FakeInstance('i2', [])
+        result = db.configure_connections([i1, i2], {'a': creds, 'b': creds, 'c': 'c-json'}, max_workers=3)
+        self.assertEqual({'a': 'unchanged', 'b': 'updated', 'c': 'created'}, result['i1'])
+        self.assertEqual({'a': 'created', 'b': 'created', 'c': 'created'}, result['i2'])
+        self.assertEqual(0, current.updates)
+        self.assertEqual(1, stale.updates)
+        self.assertEqual(1, i1.requests)
+        self.assertEqual('c-json', i2.configs['c'].properties['credentials'])
+        result = db.configure_connections(i1, {'a': creds, 'b': creds, 'c': 'c-json'})
+        self.assertEqual({'i1': {'a': 'unchanged', 'b': 'unchanged', 'c': 'unchanged'}}, result)
+
+    def test_configure_connection_unchanged(self):
+        config = _FakeAppConfig('database', {'credentials': 'x', 'other': 'y'})
+        instance = _FakeInstance('i1', [config, _FakeAppConfig('database2', {})])
+        self.assertEqual('database', db.configure_connection(instance, credentials='x'))
+        self.assertEqual(0, config.updates)
+        db.configure_connection(instance, credentials='z')
+        self.assertEqual(1, config.updates)
+
+class _FakeCursor(object):
+
+    def __init__(self, rows):
+        self.description = [('ID',), ('PRICE',), ('CREATED',), ('DATA',)]
+        self.rows = rows
+        self.closed = False
+
+    def execute(self, sql, params):
+        self.executed = (sql, params)
+
+    def fetchmany(self, size):
+        rows, self.rows = self.rows[:size], self.rows[size:]
+        return rows
+
+    def close(self):
+        self.closed = True
+
+
+class _FakeConnection(object):
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.commits = 0
+        self.rollbacks = 0
+        self.closed = False
+
+    def cursor(self):
+        return self._cursor
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+class _FailingCursor(object):
+    """Cursor failing a statement with the parameters of an already inserted row."""
+
+    def __init__(self):
+        self.statements = []
+        self._inserted = set()
+
+    def execute(self, sql, params):
+        self._run(sql, params)
+        self.statements.append((sql, params))
+
+    def executemany(self, sql, rows):
+        for params in rows:
+            self._run(sql, params)
+        self.statements.append((sql, rows))
+
+    def _run(self, sql, params):
+        if (sql, params) in self._inserted:
+            raise ValueError('duplicate')
+        self._inserted.add((sql, params))
+
+
+class TestJsonQuery(unittest.TestCase):
+
+    def _query(self, rows, page_size):
+        import decimal
+        cursor = _FakeCursor([(i, decimal.Decimal('1.50'), datetime.date(2020, 1, i + 1), b'ab') for i in range(rows)])
+        query = _JsonQuery(None, 'SELECT * FROM T WHERE C = ?', None, ['C'], page_size, 2)
+        query._connection = _FakeConnection(cursor)
+        query._error = ValueError
+        query._rows_metric = 0
+        query._failed_metric = 0
+        return query, cursor
+
+    def test_rows(self):
+        query, cursor = self._query(3, None)
+        rows = list(query({'C': 'x'}))
+        self.assertEqual(('SELECT * FROM T WHERE C = ?', ('x',)), cursor.executed)
+        self.assertEqual({'ID': 0, 'PRICE': 1.5, 'CREATED': '2020-01-01', 'DATA': 'YWI='}, rows[0])
+        self.assertEqual([0, 1, 2], [r['ID'] for r in rows])
+        self.assertTrue(cursor.closed)
+        self.assertEqual(1, query._connection.commits)
+        self.assertEqual(3, query._rows_metric)
+
+    def test_pages(self):
+        query, cursor = self._query(5, 2)
+        pages = list(query({'C': 'x'}))
+        self.assertEqual([[0, 1], [2, 3], [4]], [[r['ID'] for r in p['rows']] for p in pages])
+        query, cursor = self._query(0, 2)
+        self.assertEqual([], list(query({'C': 'x'})))
+
+    def test_failed_query(self):
+        query, cursor = self._query(3, None)
+        def fail(sql, params):
+            raise ValueError('SQL0204N')
+        cursor.execute = fail
+        self.assertIsNone(query({'C': 'x'}))
+        self.assertTrue(cursor.closed)
+        self.assertEqual((0, 1, 1), (query._connection.commits, query._connection.rollbacks, query._failed_metric))
+
+    def test_decimals(self):
+        import decimal
+        self.assertEqual(12, _json_value(decimal.Decimal('12.000')))
+        self.assertEqual(1.5, _json_value(decimal.Decimal('1.50')))
+        self.assertEqual('0.12345678901234567890', _json_value(decimal.Decimal('0.12345678901234567890')))
+        self.assertEqual('NaN', _json_value(decimal.Decimal('NaN')))
+        self.assertEqual('-Infinity', _json_value(decimal.Decimal('-Infinity')))
+
+class TestSchemaFromTable(unittest.TestCase):
+
+    _DDL = '''
+        CREATE TABLE OTHER (X INT);
+        CREATE TABLE sample.demo (
+            ID BIGINT NOT NULL GENERATED ALWAYS AS IDENTITY (START WITH 1, INCREMENT BY 1),
+            name VARCHAR(32) NOT NULL DEFAULT 'a,b',
+            PRICE DECIMAL(10, 2),
+            SCORE DOUBLE PRECISION,
+            CREATED TIMESTAMP(6),
+            DIGEST CHAR(16) FOR BIT DATA,
+            "Doc" CLOB(1M),
+            CONSTRAINT PK PRIMARY KEY (ID)
+        )'''
+
+    def test_parse_ddl(self):
+        self.assertEqual([('int64', 'ID'), ('rstring', 'NAME'), ('decimal128', 'PRICE'), ('float64', 'SCORE'), ('timestamp', 'CREATED'), ('blob', 'DIGEST'), ('rstring', 'Doc')], _parse_ddl(self._DDL, 'DEMO'))
+        self.assertEqual([('int32', 'X')], _parse_ddl(self._DDL))
+        self.assertRaises(ValueError, _parse_ddl, self._DDL, 'OTHER.DEMO')
+        self.assertRaises(ValueError, _parse_ddl, 'CREATE TABLE T (P POINT)')
+        self.assertEqual([('int64', 'ID')], _parse_ddl('CREATE TABLE IF NOT EXISTS SAMPLE.T (ID BIGINT)', 'T'))
+
+    def test_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            schema = db.schema_from_table('SAMPLE.DEMO', ddl=self._DDL, cache_dir=directory)
+            self.assertEqual(StreamSchema('tuple<int64 ID, rstring NAME, decimal128 PRICE, float64 SCORE, timestamp CREATED, blob DIGEST, rstring Doc>'), schema)
+            self.assertEqual(1, len(os.listdir(directory)))
+            with open(os.path.join(directory, os.listdir(directory)[0]), 'w') as f:
+                json.dump({'attributes': [['int32', 'CACHED']]}, f)
+            self.assertEqual(StreamSchema('tuple<int32 CACHED>'), db.schema_from_table('SAMPLE.DEMO', ddl=self._DDL, cache_dir=directory))
+            self.assertEqual(schema, db.schema_from_table('SAMPLE.DEMO', ddl=self._DDL, cache_dir=directory, refresh=True))
+        self.assertRaises(ValueError, db.schema_from_table, 'DEMO')
+        self.assertRaises(ValueError, db.schema_from_table, 'DEMO', credentials='db2_app_config')
+
+class TestQueryPlan(unittest.TestCase):
+
+    _DDL = '''
+        CREATE TABLE SAMPLE.ORDERS (ID BIGINT NOT NULL, CUSTOMER VARCHAR(20), STATUS INTEGER, CONSTRAINT PK PRIMARY KEY (ID));
+        CREATE INDEX SAMPLE.IX_CUSTOMER ON SAMPLE.ORDERS (CUSTOMER ASC);
+        CREATE TABLE ITEMS (ORDER_ID BIGINT, SKU VARCHAR(10) NOT NULL UNIQUE)'''
+
+    def test_indexed(self):
+        stand_in = _StandIn(self._DDL)
+        self.assertEqual([], stand_in.explain('UPDATE SAMPLE.ORDERS SET STATUS = ? WHERE ID = ?'))
+        self.assertEqual([], stand_in.explain('SELECT * FROM SAMPLE.ORDERS WHERE CUSTOMER = ? WITH UR'))
+        self.assertEqual([], stand_in.explain('SELECT * FROM ITEMS WHERE SKU = ? FETCH FIRST 1 ROW ONLY'))
+        self.assertEqual([], stand_in.explain('INSERT INTO ITEMS (ORDER_ID, SKU) VALUES (?, ?)'))
+
+    def test_full_scan(self):
+        stand_in = _StandIn(self._DDL)
+        messages = stand_in.explain('UPDATE SAMPLE.ORDERS SET CUSTOMER = ? WHERE STATUS = ?')
+        self.assertEqual(2, len(messages))
+        self.assertIn('scans all rows', messages[0])
+        self.assertIn('STATUS of table ORDERS', messages[1])
+        messages = stand_in.explain('SELECT SKU FROM ITEMS i WHERE i.ORDER_ID = ?')
+        self.assertEqual(2, len(messages))
+        self.assertIn('ORDER_ID of table ITEMS', messages[1])
+        self.assertIn('can not be explained', stand_in.explain('SELECT * FROM MISSING WHERE ID = ?')[0])
+
+    def test_merge(self):
+        stand_in = _StandIn(self._DDL)
+        self.assertEqual([], stand_in.explain('MERGE INTO SAMPLE.ORDERS AS T USING (VALUES (?, ?)) AS S (ID, STATUS) ON T.ID = S.ID WHEN MATCHED THEN UPDATE SET T.STATUS = S.STATUS'))
+        self.assertEqual([], stand_in.explain('MERGE INTO ITEMS USING (VALUES (?, ?)) S (ORDER_ID, SKU) ON ITEMS.SKU = S.SKU WHEN NOT MATCHED THEN INSERT VALUES (S.ORDER_ID, S.SKU)'))
+        messages = stand_in.explain('MERGE INTO ITEMS T USING (VALUES (?, ?)) S (ORDER_ID, SKU) ON T.ORDER_ID = S.ORDER_ID WHEN NOT MATCHED THEN INSERT VALUES (S.ORDER_ID, S.SKU)')
+        self.assertEqual(1, len(messages))
+        self.assertIn('merge columns ORDER_ID of table ITEMS', messages[0])
+
+    def test_statement_warning(self):
+        driver = tempfile.NamedTemporaryFile(suffix='.jar')
+        self.addCleanup(driver.close)
+        topo = Topology()
+        s = topo.source([(1, 2)]).map(lambda t: t, schema=StreamSchema('tuple<int32 STATUS, int64 ID>'))
+        statement = db.JDBCStatement('cfg', sql='UPDATE SAMPLE.ORDERS SET STATUS = ? WHERE STATUS = ?', sql_params='STATUS, STATUS', explain_ddl=self._DDL, jdbc_driver_lib=driver.name)
+        with self.assertWarns(UserWarning) as warning:
+            s.map(statement)
+        self.assertEqual(__file__, warning.filename)
+        self.assertRaises(ValueError, s.map, db.JDBCStatement('cfg', sql_attribute='STATUS', explain_ddl=self._DDL, jdbc_driver_lib=driver.name))
+
+class TestVmArgEstimate(unittest.TestCase):
+
+    def test_estimate(self):
+        schema = StreamSchema('tuple<int64 ID, rstring[20] NAME, int32 AGE>')
+        vm_arg, report = db.estimate_vm_arg(schema)
+        self.assertEqual(['-Xmx192m', '-Xgcpolicy:gencon'], vm_arg)
+        self.assertIn('row width: 192 bytes for 3 attributes', report)
+        vm_arg, report = db.estimate_vm_arg(schema, batch_size=500000)
+        # 128 MB + 192 bytes x 3 copies x 500000 rows x 2 = 677 MB
+        self.assertEqual(['-Xmx704m', '-Xgcpolicy:gencon'], vm_arg)
+        self.assertEqual(vm_arg, db.estimate_vm_arg(schema, batch_size=1000, fetch_size=500000)[0])
+        wide, _ = db.estimate_vm_arg(StreamSchema('tuple<int64 ID, rstring NAME>'), batch_size=500000, string_length=1000)
+        self.assertGreater(int(wide[0][4:-1]), 704)
+        # query results wider than the input rows
+        result = StreamSchema('tuple<int64 ID, rstring[20] NAME, int32 AGE, rstring[1000] DOC>')
+        vm_arg, report = db.estimate_vm_arg(StreamSchema('tuple<int64 ID>'), fetch_size=500000, result_schema=result)
+        self.assertGreater(int(vm_arg[0][4:-1]), 704)
+        self.assertIn('result row width: ', report)
+
+    def test_statement_auto(self):
+        driver = tempfile.NamedTemporaryFile(suffix='.jar')
+        self.addCleanup(driver.close)
+        topo = Topology()
+        s = topo.source([(1, 'a')]).map(lambda t: t, schema=StreamSchema('tuple<int64 ID, rstring NAME>'))
+        with self.assertLogs('streamsx.database._database', level='INFO') as logs:
+            s.map(db.JDBCStatement('cfg', sql='INSERT INTO T (ID, NAME) VALUES (?, ?)', sql_params='ID, NAME', batch_size=500000, vm_arg='auto', jdbc_driver_lib=driver.name))
+        self.assertIn('result row width', logs.output[0])
+        run = [o for o in topo.graph.generateSPLGraph()['operators'] if o['kind'] == 'com.ibm.streamsx.jdbc::JDBCRun'][0]
+        self.assertIn('-Xgcpolicy:gencon', str(run['parameters']['vmArg']))
+
+class TestConsistentRegion(unittest.TestCase):
+
+    def test_disabled(self):
+        driver = tempfile.NamedTemporaryFile(suffix='.jar')
+        self.addCleanup(driver.close)
+        topo = Topology()
+        s = topo.source([(1, 'a')]).map(lambda t: t, schema=StreamSchema('tuple<int64 ID, rstring NAME>'))
+        s.map(db.JDBCStatement('cfg', sql='INSERT INTO T (ID, NAME) VALUES (?, ?)', sql_params='ID, NAME', transaction_size=100, consistent_region=False, jdbc_driver_lib=driver.name))
+        run = [o for o in topo.graph.generateSPLGraph()['operators'] if o['kind'] == 'com.ibm.streamsx.jdbc::JDBCRun'][0]
+        self.assertIn('100', str(run['parameters']['transactionSize']))
+
+class TestOutputAttributes(unittest.TestCase):
+
+    def _statement(self, **options):
+        driver = tempfile.NamedTemporaryFile(suffix='.jar')
+        self.addCleanup(driver.close)
+        return db.JDBCStatement('cfg', sql='INSERT INTO T (ID, NAME, DOC) VALUES (?, ?, ?)', sql_params='ID, NAME, DOC', jdbc_driver_lib=driver.name, **options)
+
+    def test_projection(self):
+        topo = Topology()
+        s = topo.source([(1, 'a', 'b')]).map(lambda t: t, schema=StreamSchema('tuple<int64 ID, rstring NAME, rstring DOC>'))
+        res = s.map(self._statement(output_attributes='ID'))
+        self.assertEqual(StreamSchema('tuple<int64 ID>'), res.oport.schema)
+        res = s.map(self._statement(output_attributes=['ID', 'NAME'], sql_status_attr='status'))
+        self.assertEqual(StreamSchema('tuple<int64 ID, rstring NAME, tuple<int32 sqlCode, rstring sqlState, rstring sqlMessage> status>'), res.oport.schema)
+        self.assertRaises(ValueError, s.map, self._statement(output_attributes='KEY'))
+        self.assertRaises(ValueError, s.map, self._statement(output_attributes='ID'), schema=StreamSchema('tuple<int64 ID>'))
+
+class TestSink(unittest.TestCase):
+
+    def _operators(self, topo):
+        return [o for o in topo.graph.generateSPLGraph()['operators'] if o['kind'] != 'spl.control::JobControlPlane']
+
+    def test_sink(self):
+        driver = tempfile.NamedTemporaryFile(suffix='.jar')
+        self.addCleanup(driver.close)
+        topo = Topology()
+        s = topo.source([(1, 'a')]).map(lambda t: t, schema=StreamSchema('tuple<int64 ID, rstring NAME>'))
+        sink = s.for_each(db.JDBCSink('cfg', sql='INSERT INTO T (ID, NAME) VALUES (?, ?)', sql_params='ID, NAME', jdbc_driver_lib=driver.name))
+        self.assertIsInstance(sink, streamsx.topology.topology.Sink)
+        run = self._operators(topo)[-1]
+        self.assertEqual('com.ibm.streamsx.jdbc::JDBCRun', run['kind'])
+        self.assertEqual('tuple<boolean __jdbc_sink>', run['outputs'][0]['type'])
+        self.assertEqual([], run['outputs'][0]['connections'])
+
+        s.for_each(db.JDBCSink('cfg', sql='INSERT INTO T (ID, NAME) VALUES (?, ?)', sql_params='ID, NAME', jdbc_driver_lib=driver.name, sql_status_attr='status', reconnection_backoff=10.0))
+        self.assertEqual('com.ibm.streamsx.topology.functional.python::ForEach', self._operators(topo)[-1]['kind'])
+
+    def test_run_statement_sink(self):
+        driver = tempfile.NamedTemporaryFile(suffix='.jar')
+        self.addCleanup(driver.close)
+        topo = Topology()
+        s = topo.source([(1, 'a')]).map(lambda t: t, schema=StreamSchema('tuple<int64 ID, rstring NAME>'))
+        sink = db.run_statement(s, 'cfg', sql='INSERT INTO T (ID, NAME) VALUES (?, ?)', sql_params='ID, NAME', jdbc_driver_lib=driver.name, sink=True)
+        self.assertIsInstance(sink, streamsx.topology.topology.Sink)
+        self.assertEqual('tuple<boolean __jdbc_sink>', self._operators(topo)[-1]['outputs'][0]['type'])
+
+class TestRollup(unittest.TestCase):
+
+    def _rollup(self, time_attribute='TS', merge=False):
+        rollup = _Rollup(['HOST'], _parse_aggregates('SUM(VALUE) AS TOTAL, COUNT(*) AS N, MIN(VALUE) AS LOW, MAX(VALUE) AS HIGH'), 60, time_attribute, 'BUCKET', merge)
+        rollup._buckets = {}
+        rollup._clock = 0.0
+        rollup._received_clock = 0.0
+        rollup._received = time.time()
+        rollup._tuples_metric = 0
+        rollup._rows_metric = 0
+        rollup._late_metric = 0
+        return rollup
+
+    def test_parse_aggregates(self):
+        self.assertEqual([('SUM', 'VALUE', 'TOTAL'), ('COUNT', None, 'N')], _parse_aggregates('sum(VALUE) AS TOTAL, COUNT(*) as N'))
+        self.assertRaises(ValueError, _parse_aggregates, 'AVG(VALUE) AS A')
+        self.assertRaises(ValueError, _parse_aggregates, 'SUM(*) AS A')
+
+    def test_buckets(self):
+        rollup = self._rollup()
+        self.assertEqual([], rollup((_DATA_TUPLE, {'HOST': 'a', 'VALUE': 1.0, 'TS': 120.0})))
+        self.assertEqual([], rollup((_DATA_TUPLE, {'HOST': 'a', 'VALUE': 3.0, 'TS': 130.0})))
+        self.assertEqual([], rollup((_DATA_TUPLE, {'HOST': 'b', 'VALUE': None, 'TS': 179.0})))
+        rows = rollup((_DATA_TUPLE, {'HOST': 'a', 'VALUE': 5.0, 'TS': 185.0}))
+        self.assertEqual(2, len(rows))
+        a = [r for r in rows if r['HOST'] == 'a'][0]
+        self.assertEqual((4.0, 2, 1.0, 3.0), (a['TOTAL'], a['N'], a['LOW'], a['HIGH']))
+        self.assertEqual(120.0, a['BUCKET'].time())
+        b = [r for r in rows if r['HOST'] == 'b'][0]
+        self.assertEqual((None, 1), (b['TOTAL'], b['N']))
+        self.assertEqual([False, True], [r['__rollup_last'] for r in rows])
+        self.assertEqual([], rollup((_TICK, 0)))
+        rollup._received -= 60
+        rows = rollup((_TICK, 0))
+        self.assertEqual([(5.0, True)], [(r['TOTAL'], r['__rollup_last']) for r in rows])
+        # tuples after the idle time are aggregated again, a tuple of a written bucket is dropped
+        self.assertEqual([], rollup((_DATA_TUPLE, {'HOST': 'a', 'VALUE': 2.0, 'TS': 250.0})))
+        self.assertEqual([], rollup((_DATA_TUPLE, {'HOST': 'a', 'VALUE': 4.0, 'TS': 260.0})))
+        self.assertEqual([], rollup((_DATA_TUPLE, {'HOST': 'a', 'VALUE': 9.0, 'TS': 200.0})))
+        rows = rollup((_DATA_TUPLE, {'HOST': 'a', 'VALUE': 1.0, 'TS': 300.0}))
+        self.assertEqual([(6.0, 2)], [(r['TOTAL'], r['N']) for r in rows])
+        self.assertEqual(240.0, rows[0]['BUCKET'].time())
+        self.assertEqual(7, rollup._tuples_metric)
+        self.assertEqual(4, rollup._rows_metric)
+        self.assertEqual(1, rollup._late_metric)
+
+    def test_late_tuples_merged(self):
+        rollup = self._rollup(merge=True)
+        self.assertEqual([], rollup((_DATA_TUPLE, {'HOST': 'a', 'VALUE': 1.0, 'TS': 120.0})))
+        self.assertEqual(1, len(rollup((_DATA_TUPLE, {'HOST': 'a', 'VALUE': 2.0, 'TS': 185.0}))))
+        rows = rollup((_DATA_TUPLE, {'HOST': 'a', 'VALUE': 3.0, 'TS': 130.0}))
+        self.assertEqual([(3.0, 120.0)], [(r['TOTAL'], r['BUCKET'].time()) for r in rows])
+        self.assertEqual(0, rollup._late_metric)
+
+    def test_statement(self):
+        driver = tempfile.NamedTemporaryFile(suffix='.jar')
+        self.addCleanup(driver.close)
+        topo = Topology()
+        s = topo.source([('a', 1.0, 2)]).map(lambda t: t, schema=StreamSchema('tuple<rstring HOST, float64 VALUE, int32 CODE>'))
+        res = s.map(db.JDBCRollup('cfg', table='METRICS', key='HOST', aggregates='SUM(VALUE) AS TOTAL, COUNT(*) AS N, MAX(CODE) AS CODE', merge=True, jdbc_driver_lib=driver.name))
+        self.assertEqual(StreamSchema('tuple<rstring HOST, timestamp BUCKET, float64 TOTAL, int64 N, int32 CODE>'), res.oport.schema)
+        run = [o for o in topo.graph.generateSPLGraph()['operators'] if o['kind'] == 'com.ibm.streamsx.jdbc::JDBCRun'][0]
+        sql = str(run['parameters']['statement'])
+        self.assertIn('MERGE INTO METRICS AS T USING (VALUES (CAST(? AS VARCHAR(32672)), CAST(? AS TIMESTAMP), CAST(? AS DOUBLE), CAST(? AS BIGINT), CAST(? AS INTEGER)))', sql)
+        self.assertIn('ON T.HOST = S.HOST AND T.BUCKET = S.BUCKET', sql)
+        self.assertIn('T.CODE = COALESCE(GREATEST(T.CODE, S.CODE), T.CODE, S.CODE)', sql)
+        self.assertRaises(ValueError, s.map, db.JDBCRollup('cfg', table='METRICS', key='HOST', aggregates='SUM(HOST) AS H', jdbc_driver_lib=driver.name))
+
 class TestCommit(unittest.TestCase):
 
     def setUp(self):